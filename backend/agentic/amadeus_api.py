@@ -1,37 +1,120 @@
 
-import requests
-import time
 import logging
 
-def mask_pii(data):
-    # Mask passport, name, CC (stub)
-    return str(data).replace('passport', '***').replace('name', '***').replace('card', '****')
+from backend.config import Config
+from backend.utils.amadeus_auth import get_amadeus_token_manager
+from backend.utils.hedging import get_hedge_policy
+from backend.utils.http_client import UpstreamError, get_http_client, using_stand_in
+from backend.utils.ndpr_logger import MaskedPayload
+from backend.utils.search_cache import get_search_cache
 
 class AmadeusAPI:
-    def __init__(self, config=None):
-        self.config = config or {"api_key": "YOUR_AMADEUS_KEY", "api_secret": "YOUR_AMADEUS_SECRET"}
-
-    def search_flights(self, params):
-        for attempt in range(3):
-            try:
-                # Real API call placeholder
-                # response = requests.get('https://api.amadeus.com/v1/flight-search', headers={...}, params=params)
-                # if response.status_code in [429, 500]: raise Exception
-                logging.info(f"AmadeusAPI.search_flights params: {mask_pii(params)}")
-                return {"flights": ["flight1", "flight2"]}
-            except Exception as e:
-                logging.error(f"AmadeusAPI.search_flights error: {str(e)}")
-                time.sleep(2)
-        return {"error": "Amadeus API unavailable"}
-
-    def search_cars(self, params):
-        for attempt in range(3):
-            try:
-                # Real API call placeholder
-                # response = requests.get('https://api.amadeus.com/v1/car-search', headers={...}, params=params)
-                logging.info(f"AmadeusAPI.search_cars params: {mask_pii(params)}")
-                return {"cars": ["car1", "car2"]}
-            except Exception as e:
-                logging.error(f"AmadeusAPI.search_cars error: {str(e)}")
-                time.sleep(2)
-        return {"error": "Amadeus API unavailable"}
+    def __init__(self, config=None, http_client=None, search_cache=None):
+        self.config = config or {
+            "api_key": Config.AMADEUS_API_KEY,
+            "api_secret": Config.AMADEUS_API_SECRET,
+            "base_url": Config.AMADEUS_BASE_URL,
+        }
+        self.http = http_client or get_http_client()
+        self.cache = search_cache or get_search_cache()
+        # Searches are idempotent, so slow ones may be hedged
+        self.hedge = get_hedge_policy("amadeus")
+        self.token_manager = get_amadeus_token_manager(
+            self.config.get("api_key"),
+            self.config.get("api_secret"),
+            self.config.get("base_url"),
+        )
+
+    @property
+    def live(self):
+        # Without credentials we serve sandbox fixtures instead of calling out,
+        # unless a local stand-in (simulator or replay) is answering upstream calls
+        return bool(self.config.get("api_key")) or using_stand_in()
+
+    async def _auth_headers(self):
+        return await self.token_manager.auth_headers()
+
+    async def search_flights(self, params):
+        logging.info("AmadeusAPI.search_flights params: %s", MaskedPayload(params))
+        if not self.live:
+            return {"flights": self._sandbox_flights(params)}
+        return await self.cache.get_or_fetch("amadeus_flights", params, lambda: self._fetch_flights(params))
+
+    async def _fetch_flights(self, params):
+        try:
+            headers = await self._auth_headers()
+            response = await self.hedge.run(lambda: self.http.request(
+                "GET",
+                f"{self.config['base_url']}/v2/shopping/flight-offers",
+                provider="amadeus",
+                params=params,
+                headers=headers,
+            ))
+            return {"flights": response.json().get("data", [])}
+        except UpstreamError as e:
+            logging.error(f"AmadeusAPI.search_flights error: {str(e)}")
+            return {"error": "Amadeus API unavailable"}
+
+    async def search_cars(self, params):
+        logging.info("AmadeusAPI.search_cars params: %s", MaskedPayload(params))
+        if not self.live:
+            return {"cars": self._sandbox_cars(params)}
+        return await self.cache.get_or_fetch("amadeus_cars", params, lambda: self._fetch_cars(params))
+
+    async def _fetch_cars(self, params):
+        try:
+            headers = await self._auth_headers()
+            response = await self.hedge.run(lambda: self.http.request(
+                "GET",
+                f"{self.config['base_url']}/v1/shopping/availability/car-rental",
+                provider="amadeus",
+                params=params,
+                headers=headers,
+            ))
+            return {"cars": response.json().get("data", [])}
+        except UpstreamError as e:
+            logging.error(f"AmadeusAPI.search_cars error: {str(e)}")
+            return {"error": "Amadeus API unavailable"}
+
+    def _sandbox_flights(self, params):
+        """Sandbox flight offers shaped like Amadeus flight-offers"""
+        origin = params.get("originLocationCode", "LOS")
+        destination = params.get("destinationLocationCode", "LHR")
+        date = params.get("departureDate", "2026-02-15")
+        return [
+            {
+                "id": "1",
+                "itineraries": [{"duration": "PT6H30M", "segments": [{
+                    "departure": {"iataCode": origin, "at": f"{date}T07:25:00"},
+                    "arrival": {"iataCode": destination, "at": f"{date}T13:55:00"},
+                    "carrierCode": "BA",
+                    "number": "112",
+                }]}],
+                "price": {"currency": "USD", "total": "800.00", "grandTotal": "800.00"},
+            },
+            {
+                "id": "2",
+                "itineraries": [{"duration": "PT6H20M", "segments": [{
+                    "departure": {"iataCode": origin, "at": f"{date}T10:15:00"},
+                    "arrival": {"iataCode": destination, "at": f"{date}T16:35:00"},
+                    "carrierCode": "VS",
+                    "number": "412",
+                }]}],
+                "price": {"currency": "USD", "total": "735.50", "grandTotal": "735.50"},
+            },
+        ]
+
+    def _sandbox_cars(self, params):
+        """Sandbox car offers shaped like Amadeus car-rental availability"""
+        return [
+            {
+                "id": "CAR1",
+                "vehicle": {"category": "Economy", "make": "Toyota", "model": "Corolla"},
+                "price": {"currency": "USD", "total": "150.00"},
+            },
+            {
+                "id": "CAR2",
+                "vehicle": {"category": "SUV", "make": "Toyota", "model": "RAV4"},
+                "price": {"currency": "USD", "total": "240.00"},
+            },
+        ]
@@ -1,11 +1,47 @@
+import asyncio
+import logging
+from dataclasses import asdict
+
 from backend.agentic.viator_api import ViatorAPI
+from backend.booking.tours_service import ToursService
+from backend.config import Config
+
+logger = logging.getLogger(__name__)
+
+# Scheduling fields taken from the tours catalogue when Viator does not carry them
+TOUR_FIELDS = ("duration_hours", "available_dates", "rating")
+
 
 class CultureAgent:
-    def __init__(self):
+    def __init__(self, tours_service=None):
         self.viator = ViatorAPI()
+        self.tours = tours_service or ToursService(Config)
 
-    def process(self, payload):
-        activities = self.viator.search_activities(payload)
+    async def process(self, payload):
+        activities, tours = await asyncio.gather(
+            self.viator.search_activities(payload),
+            self._tour_catalogue(payload),
+        )
+        if isinstance(activities.get("activities"), list) and tours:
+            activities = {**activities, "activities": [self._enrich(a, tours) for a in activities["activities"]]}
         return {
             "activities": activities
         }
+
+    async def _tour_catalogue(self, payload):
+        destination = payload.get("destination") or payload.get("destinationLocationCode")
+        if not destination:
+            return {}
+        try:
+            tours = await asyncio.to_thread(self.tours.search_tours, destination, max_results=500)
+        except Exception as e:
+            logger.error(f"Tour catalogue lookup failed for {destination}: {str(e)}")
+            return {}
+        return {tour.tour_id: asdict(tour) for tour in tours}
+
+    @staticmethod
+    def _enrich(activity, tours):
+        tour = tours.get(activity.get("productCode")) if isinstance(activity, dict) else None
+        if tour is None:
+            return activity
+        return {**{field: tour[field] for field in TOUR_FIELDS}, **activity}
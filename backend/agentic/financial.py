@@ -1,17 +1,110 @@
-import requests
+import logging
+from decimal import InvalidOperation
+
+import numpy as np
+
+from backend.agentic.fx import format_minor, get_fx_rate_cache, to_minor, whole_units
+from backend.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+def _price_of(item):
+    """Return (amount, currency) for a provider offer, or None if it carries no price"""
+    if not isinstance(item, dict):
+        return None
+    price = item.get("price")
+    if isinstance(price, dict):
+        amount = price.get("grandTotal") or price.get("total")
+        if amount is not None:
+            return amount, price.get("currency") or item.get("currency") or "USD"
+    pricing = item.get("pricing")
+    if isinstance(pricing, dict):
+        amount = (pricing.get("summary") or {}).get("fromPrice")
+        if amount is not None:
+            return amount, pricing.get("currency") or "USD"
+    for field in ("pricePerSeat", "price_per_person", "total_price"):
+        if item.get(field) is not None:
+            return item[field], item.get("currency") or "USD"
+    return None
+
 
 class FinancialAgent:
-    def convert_prices(self, logistics_result, culture_result):
-        # Fetch live exchange rates (stub)
-        rates = {
-            "NGN": 1,
-            "USD": 0.001,
-            "EUR": 0.0009
+    def __init__(self, rate_cache=None, currencies=None):
+        self.rates = rate_cache or get_fx_rate_cache()
+        self.currencies = list(currencies or Config.PRICING_CURRENCIES)
+
+    def line_items(self, logistics_result, culture_result):
+        """Flatten every priced offer in the agent results into (section, id, amount_minor, currency)"""
+        sections = {
+            "flights": (logistics_result.get("flights") or {}).get("flights"),
+            "cars": (logistics_result.get("cars") or {}).get("cars"),
+            "buses": (logistics_result.get("buses") or {}).get("buses"),
+            "activities": (culture_result.get("activities") or {}).get("activities"),
         }
-        # Example: sum all item prices and convert
-        total_price_ngn = 100000  # stub value
+        known = set(self.rates.current().currencies)
+        items = []
+        for section, offers in sections.items():
+            for offer in offers if isinstance(offers, list) else []:
+                priced = _price_of(offer)
+                if priced is None:
+                    continue
+                amount, currency = priced
+                if currency not in known:
+                    logger.warning(f"No FX rate for {currency}; skipping {section} item")
+                    continue
+                offer_id = offer.get("id") or offer.get("productCode")
+                try:
+                    amount_minor = to_minor(amount, currency)
+                except (InvalidOperation, TypeError, ValueError):
+                    logger.warning(f"Malformed {currency} amount {amount!r}; skipping {section} item {offer_id}")
+                    continue
+                items.append((section, offer_id, amount_minor, currency))
+        return items
+
+    def price_itinerary(self, logistics_result, culture_result):
+        """Convert every line item into all pricing currencies in one batched operation.
+
+        Amounts are integer minor units end to end. Flights, cars and buses are
+        alternatives, so totals take the cheapest offer of each of those plus
+        every activity; totals are exact sums of the converted items.
+        """
+        items = self.line_items(logistics_result, culture_result)
+        targets = self.currencies
+        if items:
+            amounts = np.fromiter((item[2] for item in items), dtype=np.int64, count=len(items))
+            converted = self.rates.convert_minor(amounts, [item[3] for item in items], targets)
+        else:
+            converted = np.zeros((0, len(targets)), dtype=np.int64)
+
+        sections = np.array([item[0] for item in items], dtype=object)
+        included = sections == "activities"
+        for section in ("flights", "cars", "buses"):
+            rows = np.flatnonzero(sections == section)
+            if rows.size:
+                included[rows[np.argmin(converted[rows, 0])]] = True
+        totals_minor = converted[included].sum(axis=0)
         return {
-            "NGN": total_price_ngn,
-            "USD": int(total_price_ngn * rates["USD"]),
-            "EUR": int(total_price_ngn * rates["EUR"])
+            "currencies": targets,
+            "rates_as_of": self.rates.current().as_of,
+            "line_items": [
+                {
+                    "section": section,
+                    "id": offer_id,
+                    "currency": currency,
+                    "amount_minor": amount_minor,
+                    "converted_minor": dict(zip(targets, row.tolist())),
+                    "included": bool(chosen),
+                }
+                for (section, offer_id, amount_minor, currency), row, chosen in zip(items, converted, included)
+            ],
+            "totals_minor": dict(zip(targets, totals_minor.tolist())),
+            "totals": {c: format_minor(m, c) for c, m in zip(targets, totals_minor.tolist())},
         }
+
+    def convert_prices(self, logistics_result, culture_result):
+        # Itinerary totals per pricing currency as whole major-unit ints, the
+        # shape the "prices" field has always had; exact minor-unit totals and
+        # per-item conversions are available from price_itinerary()
+        totals_minor = self.price_itinerary(logistics_result, culture_result)["totals_minor"]
+        return {currency: whole_units(amount, currency) for currency, amount in totals_minor.items()}
@@ -0,0 +1,211 @@
+"""
+FX rates and integer minor-unit money helpers for the pricing engine.
+Rates come from a pluggable source, are cached in memory and refreshed in
+the background; conversion of many amounts is a single vectorized operation.
+"""
+
+import asyncio
+import json
+import logging
+import os
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from decimal import Decimal, ROUND_HALF_EVEN
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from backend.config import Config
+from backend.utils.http_client import get_http_client
+
+logger = logging.getLogger(__name__)
+
+# ISO 4217 minor-unit exponents (anything not listed uses 2)
+MINOR_UNIT_EXPONENTS = {"JPY": 0, "XOF": 0, "XAF": 0, "KRW": 0, "BHD": 3, "KWD": 3}
+
+DEFAULT_RATES_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "fx_rates.json")
+
+
+def minor_exponent(currency: str) -> int:
+    return MINOR_UNIT_EXPONENTS.get(currency, 2)
+
+
+def to_minor(amount, currency: str) -> int:
+    """Exact conversion of a major-unit amount (str/int/float/Decimal) to integer minor units"""
+    quantized = Decimal(str(amount)).scaleb(minor_exponent(currency)).quantize(Decimal(1), rounding=ROUND_HALF_EVEN)
+    return int(quantized)
+
+
+def format_minor(amount_minor: int, currency: str) -> str:
+    """Render integer minor units as a major-unit decimal string"""
+    return str(Decimal(int(amount_minor)).scaleb(-minor_exponent(currency)))
+
+
+def whole_units(amount_minor: int, currency: str) -> int:
+    """Round integer minor units to whole major units (banker's rounding)"""
+    return int(Decimal(int(amount_minor)).scaleb(-minor_exponent(currency)).quantize(Decimal(1), rounding=ROUND_HALF_EVEN))
+
+
+@dataclass(frozen=True)
+class RateSnapshot:
+    """Immutable set of rates expressed as units of each currency per 1 base unit"""
+    base: str
+    as_of: str
+    currencies: tuple
+    rates: np.ndarray  # float64, aligned with currencies
+    exponents: np.ndarray  # int64 minor-unit exponents, aligned with currencies
+
+    @classmethod
+    def from_mapping(cls, base: str, rates: Dict[str, float], as_of: str = "") -> "RateSnapshot":
+        currencies = tuple(sorted(rates))
+        return cls(
+            base=base,
+            as_of=as_of,
+            currencies=currencies,
+            rates=np.array([float(rates[c]) for c in currencies], dtype=np.float64),
+            exponents=np.array([minor_exponent(c) for c in currencies], dtype=np.int64),
+        )
+
+
+class RateSource(ABC):
+    """Pluggable provider of FX rates"""
+
+    @abstractmethod
+    async def fetch(self) -> RateSnapshot:
+        ...
+
+
+class FileRateSource(RateSource):
+    """Reads rates from a local JSON file: {"base", "as_of", "rates": {ccy: rate}}"""
+
+    def __init__(self, path: str = DEFAULT_RATES_FILE):
+        self.path = path
+
+    def load(self) -> RateSnapshot:
+        with open(self.path) as f:
+            data = json.load(f)
+        return RateSnapshot.from_mapping(data["base"], data["rates"], data.get("as_of", ""))
+
+    async def fetch(self) -> RateSnapshot:
+        return await asyncio.to_thread(self.load)
+
+
+class HTTPRateSource(RateSource):
+    """Fetches rates from an HTTP endpoint returning the same JSON shape as FileRateSource"""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.http = get_http_client()
+
+    async def fetch(self) -> RateSnapshot:
+        response = await self.http.request("GET", self.url, provider="fx")
+        data = response.json()
+        return RateSnapshot.from_mapping(data["base"], data["rates"], data.get("as_of", data.get("date", "")))
+
+
+class FXRateCache:
+    """Holds the latest rate snapshot and refreshes it in the background"""
+
+    def __init__(
+        self,
+        source: RateSource,
+        refresh_interval: float = 900.0,
+        fallback: Optional[FileRateSource] = None,
+        required_currencies: Optional[Sequence[str]] = None,
+    ):
+        """
+        Initialize FXRateCache
+        Args:
+            source: Where fresh rates come from
+            refresh_interval: Seconds between background refreshes
+            fallback: Local file used until the first successful refresh
+            required_currencies: Currencies every snapshot must quote (the pricing targets)
+        """
+        self.source = source
+        self.refresh_interval = refresh_interval
+        self.fallback = fallback or FileRateSource()
+        self.required_currencies = tuple(required_currencies or ())
+        self._snapshot: Optional[RateSnapshot] = None
+        self._refresher: Optional[asyncio.Task] = None
+
+    def validate(self, snapshot: RateSnapshot) -> RateSnapshot:
+        """Reject snapshots missing a required currency or carrying unusable rates"""
+        missing = [c for c in self.required_currencies if c not in snapshot.currencies]
+        if missing:
+            raise ValueError(f"FX snapshot as of {snapshot.as_of or 'unknown'} has no rate for {', '.join(missing)}")
+        if not (np.isfinite(snapshot.rates).all() and (snapshot.rates > 0).all()):
+            raise ValueError(f"FX snapshot as of {snapshot.as_of or 'unknown'} has non-positive or non-finite rates")
+        return snapshot
+
+    def current(self) -> RateSnapshot:
+        if self._snapshot is None:
+            self._snapshot = self.validate(self.fallback.load())
+        return self._snapshot
+
+    async def refresh(self) -> RateSnapshot:
+        # A snapshot that fails validation raises here, leaving the previous one in place
+        self._snapshot = self.validate(await self.source.fetch())
+        logger.info(f"FX rates refreshed ({len(self._snapshot.currencies)} currencies, as of {self._snapshot.as_of})")
+        return self._snapshot
+
+    async def start(self) -> None:
+        """Load rates now and keep them fresh in the background (call at startup)"""
+        try:
+            await self.refresh()
+        except Exception as e:
+            logger.error(f"Initial FX refresh failed, using fallback rates: {str(e)}")
+        if self._refresher is None or self._refresher.done():
+            self._refresher = asyncio.get_running_loop().create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        if self._refresher and not self._refresher.done():
+            self._refresher.cancel()
+        self._refresher = None
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                # Keep serving the last good snapshot
+                logger.error(f"FX refresh failed: {str(e)}")
+
+    def convert_minor(self, amounts_minor: np.ndarray, source_currencies: Sequence[str], targets: Sequence[str]) -> np.ndarray:
+        """
+        Convert many minor-unit amounts into several target currencies at once
+        Args:
+            amounts_minor: int64 array of amounts, one per item
+            source_currencies: Currency of each item
+            targets: Target currencies
+        Returns:
+            int64 array of shape (items, targets), rounded half-to-even to the
+            target's minor unit (exact for amounts below 2**53 minor units)
+        """
+        snapshot = self.current()
+        index = {c: i for i, c in enumerate(snapshot.currencies)}
+        src = np.fromiter((index[c] for c in source_currencies), dtype=np.intp, count=len(source_currencies))
+        tgt = np.array([index[c] for c in targets], dtype=np.intp)
+        # Minor units of each target per minor unit of each item's currency
+        factor = (snapshot.rates[tgt][None, :] / snapshot.rates[src][:, None]) * np.power(
+            10.0, (snapshot.exponents[tgt][None, :] - snapshot.exponents[src][:, None])
+        )
+        return np.rint(np.asarray(amounts_minor, dtype=np.int64)[:, None] * factor).astype(np.int64)
+
+
+_fx_rate_cache: Optional[FXRateCache] = None
+
+
+def get_fx_rate_cache() -> FXRateCache:
+    """Process-wide rate cache; uses FX_RATES_URL when set, else the local rates file"""
+    global _fx_rate_cache
+    if _fx_rate_cache is None:
+        fallback = FileRateSource(Config.FX_RATES_FILE or DEFAULT_RATES_FILE)
+        source = HTTPRateSource(Config.FX_RATES_URL) if Config.FX_RATES_URL else fallback
+        _fx_rate_cache = FXRateCache(
+            source,
+            refresh_interval=Config.FX_REFRESH_SECONDS,
+            fallback=fallback,
+            required_currencies=Config.PRICING_CURRENCIES,
+        )
+    return _fx_rate_cache
@@ -0,0 +1,209 @@
+"""
+Dependency-graph executor for the agentic pipeline.
+Each node runs as soon as all of its inputs are available, independent nodes
+run concurrently, per-node wall time is recorded, and nodes whose exact
+inputs were seen recently are served from a result cache instead of re-run.
+A per-session checkpoint lets a later run resume from earlier node outputs.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from backend.utils.deadline import remaining_timeout
+from backend.utils.singleflight import request_key
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Node:
+    """A unit of work; ``func`` receives a dict of its dependencies' outputs.
+
+    ``select`` optionally projects those outputs down to what the node really
+    uses; the projection is what ``func`` receives and what cache/checkpoint
+    keys are computed from, so unrelated upstream changes do not force a re-run.
+    """
+    name: str
+    func: Callable[[Dict[str, Any]], Any]
+    deps: Tuple[str, ...] = ()
+    timeout: Optional[float] = None
+    cacheable: bool = True
+    select: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None
+
+
+@dataclass
+class GraphRun:
+    """Outputs and bookkeeping of one graph execution"""
+    outputs: Dict[str, Any] = field(default_factory=dict)
+    timings_ms: Dict[str, float] = field(default_factory=dict)
+    cached: List[str] = field(default_factory=list)
+    resumed: List[str] = field(default_factory=list)
+    degraded: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def executed(self) -> List[str]:
+        """Nodes that actually ran (not served from cache or checkpoint)"""
+        skipped = set(self.cached) | set(self.resumed)
+        return [name for name in self.timings_ms if name not in skipped]
+
+
+class NodeCache:
+    """Small TTL + LRU cache of node outputs keyed on (node, inputs)"""
+
+    def __init__(self, ttl: float = 120.0, max_entries: int = 2000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        stored_at, value = entry
+        if time.time() - stored_at > self.ttl:
+            del self._entries[key]
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def put(self, key: str, value: Any) -> None:
+        self._entries[key] = (time.time(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class GraphExecutor:
+    """Schedules nodes in dependency order with maximal parallelism"""
+
+    def __init__(self, nodes: Iterable[Node], cache: Optional[NodeCache] = None):
+        """
+        Initialize GraphExecutor
+        Args:
+            nodes: Graph nodes; dependencies may also name initial inputs passed to run()
+            cache: Optional node output cache used to skip nodes with unchanged inputs
+        """
+        self.nodes: Dict[str, Node] = {}
+        for node in nodes:
+            if node.name in self.nodes:
+                raise ValueError(f"Duplicate graph node {node.name}")
+            self.nodes[node.name] = node
+        self.cache = cache
+        self._check_acyclic()
+
+    def _check_acyclic(self) -> None:
+        indegree = {name: sum(dep in self.nodes for dep in node.deps) for name, node in self.nodes.items()}
+        ready = [name for name, count in indegree.items() if count == 0]
+        visited = 0
+        while ready:
+            current = ready.pop()
+            visited += 1
+            for name, node in self.nodes.items():
+                if current in node.deps:
+                    indegree[name] -= 1
+                    if indegree[name] == 0:
+                        ready.append(name)
+        if visited != len(self.nodes):
+            raise ValueError("Graph contains a dependency cycle")
+
+    async def run(
+        self,
+        initial: Dict[str, Any],
+        on_node_done: Optional[Callable[[str, Any], None]] = None,
+        checkpoint: Optional[Dict[str, Dict[str, Any]]] = None,
+    ) -> GraphRun:
+        """
+        Execute the graph
+        Args:
+            initial: Pre-resolved values (graph inputs) addressable as dependencies
+            on_node_done: Optional callback invoked with (node name, output) on completion
+            checkpoint: Mutable per-session map of node -> {"key", "output"}; nodes whose
+                input key matches are resumed from it, and fresh outputs are written back
+        Returns:
+            GraphRun with every node's output, timings, cache hits and degraded nodes
+        """
+        missing = {dep for node in self.nodes.values() for dep in node.deps} - set(self.nodes) - set(initial)
+        if missing:
+            raise ValueError(f"Unresolved graph inputs: {sorted(missing)}")
+
+        run = GraphRun(outputs=dict(initial))
+        waiting = {name: {dep for dep in node.deps if dep in self.nodes} for name, node in self.nodes.items()}
+        running: Dict[asyncio.Task, str] = {}
+
+        def launch_ready() -> None:
+            for name in [n for n, deps in waiting.items() if not deps]:
+                del waiting[name]
+                task = asyncio.ensure_future(self._run_node(self.nodes[name], run, checkpoint))
+                running[task] = name
+
+        launch_ready()
+        try:
+            while running:
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    name = running.pop(task)
+                    run.outputs[name] = task.result()
+                    if on_node_done is not None:
+                        on_node_done(name, run.outputs[name])
+                    for deps in waiting.values():
+                        deps.discard(name)
+                launch_ready()
+        finally:
+            for task in running:
+                task.cancel()
+        return run
+
+    async def _run_node(self, node: Node, run: GraphRun, checkpoint: Optional[Dict[str, Dict[str, Any]]]) -> Any:
+        inputs = {dep: run.outputs[dep] for dep in node.deps}
+        if node.select is not None:
+            inputs = node.select(inputs)
+        started = time.perf_counter()
+        cache_key = request_key(f"graph:{node.name}", inputs) if node.cacheable else None
+        if cache_key is not None:
+            saved = (checkpoint or {}).get(node.name)
+            if saved is not None and saved["key"] == cache_key:
+                run.resumed.append(node.name)
+                run.timings_ms[node.name] = round((time.perf_counter() - started) * 1000, 2)
+                return saved["output"]
+            if self.cache is not None:
+                hit, value = self.cache.get(cache_key)
+                if hit:
+                    run.cached.append(node.name)
+                    run.timings_ms[node.name] = round((time.perf_counter() - started) * 1000, 2)
+                    if checkpoint is not None:
+                        checkpoint[node.name] = {"key": cache_key, "output": value}
+                    return value
+
+        if asyncio.iscoroutinefunction(node.func):
+            call = node.func(inputs)
+        else:
+            call = asyncio.to_thread(node.func, inputs)
+        # Agent nodes are cut short by whatever is left of the request budget; composition
+        # nodes (no timeout of their own) still run so a partial answer can be returned
+        timeout = remaining_timeout(node.timeout) if node.timeout is not None else None
+        if timeout is not None:
+            timeout = round(timeout, 3)
+        try:
+            output = await asyncio.wait_for(call, timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Graph node {node.name} missed its {timeout}s deadline")
+            output = {"degraded": True, "reason": "timeout", "timeout_seconds": timeout}
+        except Exception as e:
+            logger.error(f"Graph node {node.name} failed: {str(e)}")
+            output = {"degraded": True, "reason": "error", "error": type(e).__name__}
+        run.timings_ms[node.name] = round((time.perf_counter() - started) * 1000, 2)
+
+        if isinstance(output, dict) and output.get("degraded"):
+            run.degraded[node.name] = output
+            if checkpoint is not None:
+                checkpoint.pop(node.name, None)
+        elif cache_key is not None:
+            if self.cache is not None:
+                self.cache.put(cache_key, output)
+            if checkpoint is not None:
+                checkpoint[node.name] = {"key": cache_key, "output": output}
+        return output
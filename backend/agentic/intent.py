@@ -0,0 +1,152 @@
+"""
+Natural-language trip intent.
+Turns the many phrasings of one trip ("Lagos to London next Friday",
+"LOS-LHR on Friday") into the same structured fields: city names become
+IATA codes, relative dates become ISO dates and party size and cabin become
+Amadeus adults/travelClass values. The orchestrator parses
+queries with it, and the semantic cache keys on what it returns.
+"""
+
+import re
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+# City / airport names -> the IATA code the providers are searched with
+CITY_CODES = {
+    "lagos": "LOS", "abuja": "ABV", "port harcourt": "PHC", "kano": "KAN", "enugu": "ENU",
+    "accra": "ACC", "nairobi": "NBO", "kigali": "KGL", "addis ababa": "ADD", "johannesburg": "JNB",
+    "cape town": "CPT", "cairo": "CAI", "casablanca": "CMN", "marrakech": "RAK", "dakar": "DSS",
+    "zanzibar": "ZNZ", "london": "LHR", "heathrow": "LHR", "gatwick": "LGW", "manchester": "MAN",
+    "paris": "CDG", "amsterdam": "AMS", "frankfurt": "FRA", "rome": "FCO", "madrid": "MAD",
+    "barcelona": "BCN", "istanbul": "IST", "dubai": "DXB", "doha": "DOH", "new york": "JFK",
+    "atlanta": "ATL", "houston": "IAH", "washington": "IAD", "toronto": "YYZ",
+}
+KNOWN_CODES = frozenset(CITY_CODES.values())
+# Code -> one canonical spelling, so "LHR", "Heathrow" and "London" read the same
+CITY_NAMES = {code: name for name, code in reversed(list(CITY_CODES.items()))}
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+MONTHS = ["january", "february", "march", "april", "may", "june", "july",
+          "august", "september", "october", "november", "december"]
+NUMBER_WORDS = {"one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7, "eight": 8, "nine": 9}
+# Cabin phrases -> Amadeus travelClass
+CABINS = {"premium economy": "PREMIUM_ECONOMY", "economy": "ECONOMY", "business": "BUSINESS", "first": "FIRST"}
+STOPWORDS = {
+    "a", "an", "the", "i", "me", "my", "we", "us", "our", "want", "need", "would", "like", "to",
+    "from", "on", "for", "in", "at", "and", "please", "book", "find", "get", "show", "trip",
+    "travel", "travelling", "traveling", "go", "going", "fly", "flying", "flight", "flights",
+}
+
+IATA_PAIR = re.compile(r"\b([A-Z]{3})\s*(?:-|to|→)\s*([A-Z]{3})\b")
+TO_IATA = re.compile(r"\b(?:to|in)\s+([A-Z]{3})\b")
+ISO_DATE = re.compile(r"\b(\d{4}-\d{2}-\d{2})\b")
+PARTY = re.compile(
+    r"\b(\d{1,2}|" + "|".join(NUMBER_WORDS) + r")\s+(?:adults?|people|persons?|passengers?|pax|travell?ers?|guests?)\b",
+    re.IGNORECASE,
+)
+# "business"/"first" only count with "class" ("business trip", "first week" are not cabins)
+CABIN = re.compile(r"\b(premium economy|economy|business(?=\s+class)|first(?=\s+class))\b", re.IGNORECASE)
+_CITY = re.compile(r"\b(" + "|".join(sorted(map(re.escape, CITY_CODES), key=len, reverse=True)) + r")\b", re.IGNORECASE)
+_MONTH = "|".join(m[:3] + f"(?:{m[3:]})?" for m in MONTHS)
+_RELATIVE = re.compile(
+    r"\b(?:(today|tonight)|(tomorrow)|in\s+(\d+)\s+(day|week)s?"
+    r"|(?:(?:next|this|on|coming)\s+)?(" + "|".join(WEEKDAYS) + r")"
+    r"|(\d{1,2})(?:st|nd|rd|th)?\s+(?:of\s+)?(" + _MONTH + r")|(" + _MONTH + r")\s+(\d{1,2})(?:st|nd|rd|th)?)\b",
+    re.IGNORECASE,
+)
+
+# ISO dates first (non-capturing, so match groups line up with _RELATIVE's)
+_DATE = re.compile(r"\b\d{4}-\d{2}-\d{2}\b|" + _RELATIVE.pattern, re.IGNORECASE)
+
+
+def _month_day(month: str, day: int, today: date) -> Optional[date]:
+    number = next(i for i, m in enumerate(MONTHS, 1) if m.startswith(month.lower()[:3]))
+    try:
+        candidate = date(today.year, number, day)
+        return candidate if candidate >= today else date(today.year + 1, number, day)
+    except ValueError:
+        return None
+
+
+def _resolve(match: re.Match, today: date) -> Optional[date]:
+    now, tomorrow, count, unit, weekday, day_a, month_a, month_b, day_b = match.groups()
+    if now:
+        return today
+    if tomorrow:
+        return today + timedelta(days=1)
+    if count:
+        return today + timedelta(days=int(count) * (7 if unit.lower() == "week" else 1))
+    if weekday:
+        # "Friday", "on Friday" and "next Friday" all mean the first Friday after today
+        ahead = (WEEKDAYS.index(weekday.lower()) - today.weekday()) % 7
+        return today + timedelta(days=ahead or 7)
+    if day_a:
+        return _month_day(month_a, int(day_a), today)
+    return _month_day(month_b, int(day_b), today)
+
+
+def extract_dates(query: str, today: Optional[date] = None) -> Tuple[List[str], str]:
+    """ISO dates in the order mentioned, and the query with every date rewritten as ISO"""
+    today = today or date.today()
+    dates: List[str] = []
+
+    def rewrite(match: re.Match) -> str:
+        if ISO_DATE.fullmatch(match.group(0)):
+            dates.append(match.group(0))
+            return match.group(0)
+        resolved = _resolve(match, today)
+        if resolved is None:
+            return match.group(0)
+        dates.append(resolved.isoformat())
+        return resolved.isoformat()
+
+    return dates, _DATE.sub(rewrite, query)
+
+
+def parse_intent(query: str, today: Optional[date] = None) -> Dict[str, Any]:
+    """
+    Structured search fields for a natural-language trip query
+    Args:
+        query: Free text, e.g. "Lagos to London next Friday, back on the 14th of March"
+        today: Reference date for relative dates (defaults to today)
+    Returns:
+        Any of originLocationCode, destinationLocationCode, departureDate, returnDate,
+        adults and travelClass
+    """
+    dates, text = extract_dates(query or "", today)
+    text = _CITY.sub(lambda m: CITY_CODES[m.group(1).lower()], text)
+    parsed: Dict[str, Any] = {}
+    pair = IATA_PAIR.search(text)
+    if pair:
+        parsed["originLocationCode"], parsed["destinationLocationCode"] = pair.groups()
+    else:
+        single = TO_IATA.search(text)
+        # A lone "to XYZ" / "in XYZ" is only trusted for known codes ("to USA" is not an airport)
+        if single and single.group(1) in KNOWN_CODES:
+            parsed["destinationLocationCode"] = single.group(1)
+    if dates:
+        parsed["departureDate"] = dates[0]
+        if len(dates) > 1:
+            parsed["returnDate"] = dates[1]
+    party = PARTY.search(text)
+    if party:
+        count = party.group(1).lower()
+        adults = NUMBER_WORDS[count] if count in NUMBER_WORDS else int(count)
+        if adults > 0:
+            parsed["adults"] = adults
+    cabin = CABIN.search(text)
+    if cabin:
+        parsed["travelClass"] = CABINS[cabin.group(1).lower()]
+    return parsed
+
+
+def canonical_text(query: str, today: Optional[date] = None) -> str:
+    """
+    Lower-cased query for similarity matching: dates as ISO, known places under
+    one canonical city name (unknown or misspelt ones kept as written) and
+    filler words dropped
+    """
+    _, text = extract_dates(query or "", today)
+    text = _CITY.sub(lambda m: CITY_CODES[m.group(1).lower()], text)
+    text = re.sub(r"\b[A-Z]{3}\b", lambda m: CITY_NAMES.get(m.group(0), m.group(0)), text).lower()
+    tokens = re.findall(r"[a-z0-9]+(?:-[0-9]+)*", text)
+    return " ".join(token for token in tokens if token not in STOPWORDS)
@@ -1,11 +1,307 @@
-# Placeholder for LangGraph orchestration logic
-# This would orchestrate SupervisorAgent, LogisticsAgent, and CultureAgent
+import asyncio
+import time
+
+from backend.agentic.graph import GraphExecutor, Node, NodeCache
+from backend.agentic.intent import parse_intent
+from backend.agentic.semantic_cache import SemanticCache
+from backend.config import Config
+from backend.utils.deadline import deadline_scope
+from backend.utils.singleflight import batch_scope, request_key
+
+# Request fields that only steer the API call, never an agent
+REQUEST_META = ("query", "format", "session_id")
+# Fields read by the visa check; no other agent depends on them
+VISA_FIELDS = (
+    "citizenCountry", "citizen_country", "passportCountry",
+    "destinationCountry", "destination_country", "to", "passportNumber", "travelers",
+)
+# Trip dates the day-by-day schedule is built around
+TRIP_FIELDS = ("departureDate", "returnDate", "checkInDate", "checkOutDate")
+# Transport-only fields that do not affect activity search
+TRANSPORT_FIELDS = (
+    "originLocationCode", "pickupLocationCode", "dropoffLocationCode",
+    "travelClass", "nonStop", "maxPrice", "includedAirlineCodes",
+)
+
+
+def _usable(result):
+    # Degraded upstream sections are treated as empty by downstream nodes
+    return {} if not isinstance(result, dict) or result.get("degraded") else result
+
+
+def _only(fields):
+    def select(inputs):
+        return {"parsing": {k: v for k, v in inputs["parsing"].items() if k in fields}}
+    return select
+
+
+def _without(*excluded):
+    dropped = {field for group in excluded for field in group}
+
+    def select(inputs):
+        return {"parsing": {k: v for k, v in inputs["parsing"].items() if k not in dropped}}
+    return select
+
+
+# Graph nodes whose outputs are streamed, in the order a cached plan replays them
+STREAMED_NODES = ("logistics", "culture", "visa", "financial", "itinerary")
+
+
+def _sections(node, output):
+    """Streamed (section, data) pairs for a finished graph node"""
+    degraded = isinstance(output, dict) and output.get("degraded")
+    if node == "logistics":
+        for section in ("flights", "cars", "buses"):
+            yield section, output if degraded else output.get(section)
+    elif node == "culture":
+        yield "activities", output if degraded else output.get("activities")
+    elif node == "visa":
+        yield "visa", output
+    elif node == "financial":
+        yield "prices", output
+    elif node == "itinerary":
+        yield "itinerary", output
+
+
+def _summary(response):
+    """Closing section of a stream: everything in the response except the streamed sections"""
+    return {k: v for k, v in response.items() if k not in ("itinerary", "prices", "visa")}
+
 
 class LangGraphOrchestrator:
-    def __init__(self, supervisor_agent):
+    """Runs the agentic pipeline as a dependency graph.
+
+    parsing -> (logistics | culture | visa) -> (financial | itinerary)
+    Independent agents run in parallel; each node starts as soon as its
+    inputs are ready and nodes whose inputs are unchanged come from cache.
+    Every run belongs to a session whose node outputs are checkpointed, so
+    approving or editing a plan only re-runs agents whose inputs changed.
+    """
+
+    def __init__(self, supervisor_agent, node_cache=None, semantic_cache=None):
         self.supervisor_agent = supervisor_agent
+        timeouts = supervisor_agent.agent_timeouts
+        self.graph = GraphExecutor(
+            [
+                Node("parsing", self._parse, deps=("request", "intent"), cacheable=False),
+                Node("logistics", self._logistics, deps=("parsing",), timeout=timeouts["logistics"],
+                     select=_without(REQUEST_META, VISA_FIELDS)),
+                Node("culture", self._culture, deps=("parsing",), timeout=timeouts["culture"],
+                     select=_without(REQUEST_META, VISA_FIELDS, TRANSPORT_FIELDS)),
+                Node("visa", self._visa, deps=("parsing",), timeout=timeouts["visa"], select=_only(VISA_FIELDS)),
+                Node("financial", self._financial, deps=("logistics", "culture")),
+                Node("itinerary", self._itinerary, deps=("logistics", "culture", "parsing"),
+                     select=lambda inputs: {**inputs, **_only(TRIP_FIELDS)(inputs)}),
+            ],
+            cache=node_cache or NodeCache(),
+        )
+        self.state = supervisor_agent.state_machine
+        if semantic_cache is None and Config.SEMANTIC_CACHE_ENABLED:
+            semantic_cache = SemanticCache(
+                ttl_seconds=Config.SEMANTIC_CACHE_TTL_SECONDS,
+                max_entries=Config.SEMANTIC_CACHE_MAX_ENTRIES,
+                threshold=Config.SEMANTIC_CACHE_THRESHOLD,
+            )
+        # Differently phrased requests for the same trip skip the pipeline (None disables)
+        self.semantic_cache = semantic_cache
+
+    async def run(self, query: str, context=None):
+        request = {k: v for k, v in {"query": query, **(context or {})}.items() if k not in ("format", "session_id")}
+        if self.semantic_cache is not None:
+            hit = self.semantic_cache.lookup(request)
+            if hit is not None:
+                return self._from_semantic_cache(request, hit)
+        session = self.state.sessions.create(request)
+        response = await self._execute(session)
+        if self.semantic_cache is not None and not response["degraded"]:
+            self.semantic_cache.store(request, response, session.checkpoints)
+        return response
+
+    def _from_semantic_cache(self, request, hit):
+        """Answer from a cached plan; the new session adopts its checkpoints so approve/edit resume from it"""
+        # The session takes on the matched intent, so a later edit re-plans the same trip
+        session = self.state.sessions.create({**hit.fields, **request})
+        session.checkpoints = dict(hit.checkpoints)
+        session.intent = dict(hit.fields)
+        response = {
+            **hit.response,
+            "session_id": session.session_id,
+            "status": session.status,
+            "timings": {},
+            "cached": list(hit.checkpoints),
+            "resumed": [],
+            "rerun": [],
+            "semantic_cache": {"match": hit.match, "similarity": hit.similarity, "age_seconds": hit.age_seconds},
+        }
+        session.response = response
+        self.state.sessions.save(session)
+        return response
+
+    async def run_batch(self, requests, concurrency: int = 16, deadline=None):
+        """
+        Plan many trips at once, sharing provider searches across them
+        Args:
+            requests: Request dicts, each with a "query" and optional structured fields
+            concurrency: Maximum number of queries planned at the same time
+            deadline: Budget in seconds for each query, counted from when it starts planning
+        Returns:
+            {"results": one response per request (in order), "stats": dedup and timing figures}
+        """
+        started = time.perf_counter()
+        first_of = {}
+        for index, request in enumerate(requests):
+            first_of.setdefault(request_key("agentic_query", request), index)
+        distinct = sorted(set(first_of.values()))
+        duplicates = [i for i in range(len(requests)) if i not in first_of.values()]
+        limit = asyncio.Semaphore(max(1, concurrency))
+        results = [None] * len(requests)
+
+        async def plan(index):
+            async with limit:
+                request = requests[index]
+                with deadline_scope(deadline):
+                    results[index] = await self.run(request.get("query", ""), request)
+
+        with batch_scope() as memo:
+            await asyncio.gather(*(plan(i) for i in distinct))
+            # Repeats get their own session but resolve from the node cache
+            await asyncio.gather(*(plan(i) for i in duplicates))
+        return {
+            "results": results,
+            "stats": {
+                "queries": len(requests),
+                "distinct_queries": len(distinct),
+                **memo.stats(),
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+            },
+        }
+
+    async def resume(self, session_id: str, changes=None, approve: bool = False):
+        """
+        Continue a session from its checkpoints
+        Args:
+            session_id: Session returned by run()
+            changes: Request fields to change (e.g. a new departureDate); None clears a field
+            approve: Mark the resulting plan approved
+        Returns:
+            The same response shape as run(); "rerun" lists the agents that actually executed
+        Raises:
+            KeyError: Unknown or expired session
+        """
+        session = self.state.sessions.get(session_id)
+        if session is None:
+            raise KeyError(session_id)
+        if changes:
+            self.state.edit(session, changes)
+        # Degraded nodes were never checkpointed, so they are retried here
+        response = await self._execute(session)
+        if approve:
+            self.state.approve(session)
+            response = {
+                **response,
+                "itinerary": {**response["itinerary"], "status": "approved"},
+                "approval_required": False,
+                "status": session.status,
+            }
+            session.response = response
+        return response
+
+    def session(self, session_id: str):
+        return self.state.sessions.get(session_id)
+
+    async def _execute(self, session, on_node_done=None):
+        if session.intent is None:
+            # Parsed once per session: "next Friday" must not move when the plan is resumed days later
+            session.intent = parse_intent(session.request.get("query", ""))
+        run = await self.graph.run(
+            {"request": session.request, "intent": session.intent},
+            on_node_done=on_node_done,
+            checkpoint=session.checkpoints,
+        )
+        response = {
+            "session_id": session.session_id,
+            "status": session.status,
+            "itinerary": run.outputs["itinerary"],
+            "prices": run.outputs["financial"],
+            "visa": run.outputs["visa"],
+            "approval_required": True,
+            "degraded": run.degraded,
+            "timings": run.timings_ms,
+            "cached": run.cached,
+            "resumed": run.resumed,
+            "rerun": [name for name in run.executed if name != "parsing"],
+            "semantic_cache": None,
+        }
+        session.response = response
+        self.state.sessions.save(session)
+        return response
+
+    async def stream(self, query: str, context=None):
+        """
+        Plan like run(), yielding ``(section, data)`` pairs as each node finishes
+        Sections are flights, cars, buses, activities and visa in completion order,
+        then prices and itinerary; a final ``done`` section carries the session id
+        and anything degraded. Parsing, caches and the session are shared with run().
+        """
+        request = {k: v for k, v in {"query": query, **(context or {})}.items() if k not in ("format", "session_id")}
+        if self.semantic_cache is not None:
+            hit = self.semantic_cache.lookup(request)
+            if hit is not None:
+                response = self._from_semantic_cache(request, hit)
+                for node in STREAMED_NODES:
+                    saved = hit.checkpoints.get(node)
+                    if saved is not None:
+                        for section in _sections(node, saved["output"]):
+                            yield section
+                yield "done", _summary(response)
+                return
+
+        session = self.state.sessions.create(request)
+        finished: asyncio.Queue = asyncio.Queue()
+        execution = asyncio.ensure_future(self._execute(session, on_node_done=lambda name, output: finished.put_nowait((name, output))))
+        execution.add_done_callback(lambda _: finished.put_nowait(None))
+        try:
+            while True:
+                item = await finished.get()
+                if item is None:
+                    break
+                for section in _sections(*item):
+                    yield section
+            response = execution.result()
+        finally:
+            # Client went away mid-stream: stop the remaining upstream work
+            execution.cancel()
+        if self.semantic_cache is not None and not response["degraded"]:
+            self.semantic_cache.store(request, response, session.checkpoints)
+        yield "done", _summary(response)
+
+    def _parse(self, inputs):
+        """Extract structured search fields from the natural language query.
+
+        City names and relative dates are resolved (see backend.agentic.intent)
+        once per session and pinned there; explicit fields in the request always
+        win over what is parsed.
+        """
+        return {**inputs["intent"], **inputs["request"]}
+
+    async def _logistics(self, inputs):
+        return await self.supervisor_agent.logistics_agent.process(inputs["parsing"])
+
+    async def _culture(self, inputs):
+        return await self.supervisor_agent.culture_agent.process(inputs["parsing"])
+
+    def _visa(self, inputs):
+        return self.supervisor_agent.visa_agent.assess_trip(inputs["parsing"])
+
+    def _financial(self, inputs):
+        return self.supervisor_agent.financial_agent.convert_prices(
+            _usable(inputs["logistics"]),
+            _usable(inputs["culture"]),
+        )
 
-    def run(self, query: str):
-        # Parse query, route to agents, manage state
-        # ...LangGraph orchestration logic...
-        return self.supervisor_agent.handle_query({"query": query})
+    def _itinerary(self, inputs):
+        return self.supervisor_agent.state_machine.create_itinerary(
+            _usable(inputs["logistics"]),
+            _usable(inputs["culture"]),
+            inputs["parsing"],
+        )
@@ -1,3 +1,6 @@
+import asyncio
+import time
+
 from backend.agentic.amadeus_api import AmadeusAPI
 from backend.agentic.travu_api import TravuAPI
 
@@ -6,12 +9,28 @@ class LogisticsAgent:
         self.amadeus = AmadeusAPI()
         self.travu = TravuAPI()
 
-    def process(self, payload):
-        flights = self.amadeus.search_flights(payload)
-        cars = self.amadeus.search_cars(payload)
-        buses = self.travu.search_buses(payload)
-        return {
-            "flights": flights,
-            "cars": cars,
-            "buses": buses
+    async def process(self, payload):
+        """Issue the flight, car and bus searches together.
+
+        Results are collected as each provider answers, and ``timings`` records
+        the wall time (ms) of every leg so the dominant provider is visible.
+        """
+        searches = {
+            "flights": self.amadeus.search_flights,
+            "cars": self.amadeus.search_cars,
+            "buses": self.travu.search_buses,
         }
+        result = {}
+        timings = {}
+        pending = [self._timed_search(name, search, payload) for name, search in searches.items()]
+        for next_done in asyncio.as_completed(pending):
+            name, data, elapsed_ms = await next_done
+            result[name] = data
+            timings[name] = elapsed_ms
+        result["timings"] = timings
+        return result
+
+    async def _timed_search(self, name, search, payload):
+        started = time.perf_counter()
+        data = await search(payload)
+        return name, data, round((time.perf_counter() - started) * 1000, 2)
@@ -1,16 +1,126 @@
-from fastapi import APIRouter
+import json
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from backend.agentic.supervisor import SupervisorAgent
 from backend.agentic.langgraph_orchestrator import LangGraphOrchestrator
+from backend.config import Config
+from backend.utils.deadline import with_deadline
+from backend.utils.hedging import hedge_stats
+from backend.utils.http_client import get_http_client
 
 router = APIRouter()
 supervisor_agent = SupervisorAgent()
 langgraph_orchestrator = LangGraphOrchestrator(supervisor_agent)
 
 @router.post("/agentic-query")
-def agentic_query(payload: dict):
+@with_deadline(Config.AGENTIC_REQUEST_DEADLINE)
+async def agentic_query(payload: dict):
     """
     Accepts a natural language query and returns orchestrated itinerary and pricing in NGN, USD, EUR.
+    The pipeline runs as a dependency graph; per-node timings are returned under "timings" and
+    sections whose agent missed its deadline are listed under "degraded". The returned
+    "session_id" can be passed to the itinerary approve/edit endpoints. Requests for a trip
+    planned recently (however phrased) are answered from the semantic cache; "semantic_cache"
+    then reports how the match was made.
     """
     query = payload.get("query", "")
-    response = langgraph_orchestrator.run(query)
+    response = await langgraph_orchestrator.run(query, payload)
     return response
+
+@router.post("/agentic-query/batch")
+async def agentic_query_batch(payload: dict):
+    """
+    Plan many trips in one call (B2B bulk planning). Accepts {"queries": [...]} where each item
+    is a query string or an /agentic-query payload. Provider searches shared between queries
+    (same flight search, same activities search) run once; "stats" reports how many were shared.
+    """
+    queries = payload.get("queries") or []
+    if not isinstance(queries, list) or not queries:
+        raise HTTPException(status_code=422, detail="queries must be a non-empty list")
+    if len(queries) > Config.AGENTIC_BATCH_MAX_QUERIES:
+        raise HTTPException(status_code=413, detail=f"At most {Config.AGENTIC_BATCH_MAX_QUERIES} queries per batch")
+    if not all(isinstance(item, (str, dict)) for item in queries):
+        raise HTTPException(status_code=422, detail="Each query must be a string or an object")
+    requests = [{"query": item} if isinstance(item, str) else dict(item) for item in queries]
+    return await langgraph_orchestrator.run_batch(
+        requests,
+        concurrency=Config.AGENTIC_BATCH_CONCURRENCY,
+        deadline=Config.AGENTIC_REQUEST_DEADLINE,
+    )
+
+@router.post("/agentic-query/stream")
+async def agentic_query_stream(payload: dict, request: Request):
+    """
+    Streaming variant of /agentic-query: each section (flights, cars, buses, activities, visa,
+    prices, itinerary) is sent as soon as it is ready, followed by a "done" section carrying the
+    "session_id" for the itinerary approve/edit endpoints. Responds with Server-Sent Events when
+    the client accepts text/event-stream (or payload "format" is "sse"), NDJSON otherwise.
+    """
+    query = payload.get("query", "")
+    use_sse = payload.get("format") == "sse" or "text/event-stream" in request.headers.get("accept", "")
+
+    async def events():
+        async for section, data in langgraph_orchestrator.stream(query, payload):
+            if use_sse:
+                yield f"event: {section}\ndata: {json.dumps(data, default=str)}\n\n"
+            else:
+                yield json.dumps({"section": section, "data": data}, default=str) + "\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream" if use_sse else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/itinerary/{session_id}")
+def get_itinerary(session_id: str):
+    """
+    Last planned itinerary for a session, without running any agent.
+    """
+    session = langgraph_orchestrator.session(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Itinerary session not found or expired")
+    return session.response
+
+@router.post("/itinerary/{session_id}/approve")
+@with_deadline(Config.AGENTIC_REQUEST_DEADLINE)
+async def approve_itinerary(session_id: str):
+    """
+    Approve a planned itinerary. Served from the session checkpoint; only agents whose
+    earlier run was degraded are called again.
+    """
+    try:
+        return await langgraph_orchestrator.resume(session_id, approve=True)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Itinerary session not found or expired")
+
+@router.post("/itinerary/{session_id}/edit")
+@with_deadline(Config.AGENTIC_REQUEST_DEADLINE)
+async def edit_itinerary(session_id: str, payload: dict):
+    """
+    Change request fields (e.g. {"changes": {"departureDate": "2026-03-02"}}) and re-plan.
+    Only agents whose inputs changed are re-run; "rerun" in the response lists them.
+    """
+    changes = payload.get("changes", payload)
+    if not isinstance(changes, dict):
+        raise HTTPException(status_code=400, detail="changes must be an object of request fields")
+    try:
+        return await langgraph_orchestrator.resume(session_id, changes=changes)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Itinerary session not found or expired")
+
+@router.get("/upstream-stats")
+def upstream_stats():
+    """
+    Connection pool and retry statistics for the shared provider HTTP client, plus the
+    per-provider hedging rate and current hedge delay.
+    """
+    return {**get_http_client().stats(), "hedging": hedge_stats()}
+
+
+@router.get("/semantic-cache")
+def semantic_cache_stats():
+    """Hit/miss counts of the agentic semantic cache (exact intent vs near-duplicate matches)"""
+    cache = langgraph_orchestrator.semantic_cache
+    return cache.stats() if cache is not None else {"enabled": False}
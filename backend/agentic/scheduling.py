@@ -0,0 +1,346 @@
+"""
+Itinerary scheduling engine.
+Packs candidate activities into trip days around the flight arrival and
+departure, hotel check-in/check-out and each activity's opening window.
+Selection is weighted interval scheduling solved by dynamic programming over
+end-sorted candidates (bisect finds the last compatible predecessor). The DP
+may place one activity in several slots; a single greedy pass then keeps each
+activity's first use and refills the freed time with the best unused
+candidates, so a trip with hundreds of activities is planned in O(n log n).
+"""
+
+import bisect
+import logging
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+MINUTES_PER_DAY = 24 * 60
+
+
+def _minutes(clock: str) -> int:
+    """'HH:MM' -> minutes after midnight"""
+    hours, _, minutes = clock.partition(":")
+    return int(hours) * 60 + int(minutes or 0)
+
+
+def _parse_datetime(value: Any) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).replace(tzinfo=None)
+    except ValueError:
+        return None
+
+
+def _parse_date(value: Any) -> Optional[date]:
+    parsed = _parse_datetime(value)
+    return parsed.date() if parsed else None
+
+
+def _offer_price(offer: Dict[str, Any]) -> Optional[float]:
+    """Grand total of a flight offer (0 when unpriced), or None if the price is malformed"""
+    price = offer.get("price") or {}
+    if not isinstance(price, dict):
+        return None
+    try:
+        return float(price.get("grandTotal") or price.get("total") or 0)
+    except (TypeError, ValueError):
+        return None
+
+
+def _segment_time(itinerary: Any, position: int, field: str) -> Optional[datetime]:
+    """`field` ("arrival"/"departure") time of the segment at `position`, tolerating malformed offers"""
+    segments = itinerary.get("segments") if isinstance(itinerary, dict) else None
+    if not isinstance(segments, list) or not segments or not isinstance(segments[position], dict):
+        return None
+    point = segments[position].get(field)
+    return _parse_datetime(point.get("at")) if isinstance(point, dict) else None
+
+
+def activity_id(activity: Dict[str, Any]) -> str:
+    return str(activity.get("productCode") or activity.get("tour_id") or activity.get("id") or activity.get("title"))
+
+
+def activity_duration_minutes(activity: Dict[str, Any], default: int = 120) -> int:
+    """Duration from ToursService (duration_hours) or Viator (duration.fixedDurationInMinutes)"""
+    if activity.get("duration_hours") is not None:
+        return max(1, int(round(float(activity["duration_hours"]) * 60)))
+    duration = activity.get("duration")
+    if isinstance(duration, dict) and duration.get("fixedDurationInMinutes"):
+        return int(duration["fixedDurationInMinutes"])
+    return default
+
+
+def activity_rating(activity: Dict[str, Any], default: float = 4.0) -> float:
+    if activity.get("rating") is not None:
+        return float(activity["rating"])
+    reviews = activity.get("reviews")
+    if isinstance(reviews, dict) and reviews.get("combinedAverageRating") is not None:
+        return float(reviews["combinedAverageRating"])
+    return default
+
+
+@dataclass
+class TripFrame:
+    """Fixed points of the trip the activities are scheduled around"""
+    start: date
+    end: date
+    arrival: Optional[datetime] = None
+    departure: Optional[datetime] = None
+
+    @property
+    def days(self) -> List[date]:
+        return [self.start + timedelta(days=i) for i in range((self.end - self.start).days + 1)]
+
+
+class ItineraryScheduler:
+    """Builds a day-by-day plan from flights and activities"""
+
+    def __init__(
+        self,
+        day_start: str = "08:00",
+        day_end: str = "21:00",
+        check_in: str = "15:00",
+        check_out: str = "11:00",
+        opening_window: Tuple[str, str] = ("09:00", "18:00"),
+        arrival_buffer_minutes: int = 90,
+        departure_buffer_minutes: int = 180,
+        transition_minutes: int = 30,
+        slot_minutes: int = 30,
+        default_nights: int = 3,
+        max_days: int = 30,
+    ):
+        """
+        Initialize ItineraryScheduler
+        Args:
+            day_start: Earliest start of any activity
+            day_end: Latest end of any activity
+            check_in: Hotel check-in time (a 30 minute block on arrival day)
+            check_out: Hotel check-out time (a 30 minute block on departure day)
+            opening_window: Opening hours for activities that do not state their own
+            arrival_buffer_minutes: Immigration and transfer time after landing
+            departure_buffer_minutes: Time needed at the airport before departure
+            transition_minutes: Travel gap kept between consecutive activities
+            slot_minutes: Granularity of candidate start times
+            default_nights: Trip length when no return date or flight is known
+            max_days: Longest trip planned; later days are left out of the schedule
+        """
+        self.day_start = _minutes(day_start)
+        self.day_end = _minutes(day_end)
+        self.check_in = _minutes(check_in)
+        self.check_out = _minutes(check_out)
+        self.opening_window = (_minutes(opening_window[0]), _minutes(opening_window[1]))
+        self.arrival_buffer = arrival_buffer_minutes
+        self.departure_buffer = departure_buffer_minutes
+        self.transition = transition_minutes
+        self.slot = slot_minutes
+        self.default_nights = default_nights
+        self.max_days = max(1, max_days)
+
+    def frame(self, flights: Sequence[Dict[str, Any]], trip: Optional[Dict[str, Any]] = None) -> Optional[TripFrame]:
+        """Derive trip dates and fixed times from the chosen flight offer and the request"""
+        trip = trip or {}
+        arrival = departure = None
+        priced = [(price, offer) for price, offer in ((_offer_price(f), f) for f in flights or () if isinstance(f, dict)) if price is not None]
+        if priced:
+            offer = min(priced, key=lambda p: p[0])[1]
+            itineraries = offer.get("itineraries")
+            if isinstance(itineraries, list) and itineraries:
+                arrival = _segment_time(itineraries[0], -1, "arrival")
+                if len(itineraries) > 1:
+                    departure = _segment_time(itineraries[1], 0, "departure")
+
+        start = arrival.date() if arrival else _parse_date(trip.get("checkInDate") or trip.get("departureDate"))
+        if start is None:
+            return None
+        end = departure.date() if departure else _parse_date(trip.get("checkOutDate") or trip.get("returnDate"))
+        if end is None or end < start:
+            end = start + timedelta(days=self.default_nights)
+        # Work grows with days x activities, so the trip length from the request is capped
+        last = start + timedelta(days=self.max_days - 1)
+        if end > last:
+            logger.warning(f"Trip of {(end - start).days + 1} days planned as its first {self.max_days}")
+            end, departure = last, None
+        return TripFrame(start=start, end=end, arrival=arrival, departure=departure)
+
+    def _free_windows(self, frame: TripFrame) -> Tuple[List[List[Tuple[int, int]]], List[Dict[str, Any]]]:
+        """Per-day free (start, end) minute ranges, plus the fixed events that shape them"""
+        days = frame.days
+        windows: List[List[Tuple[int, int]]] = []
+        fixed: List[Dict[str, Any]] = []
+        late_check_in = None
+        for index, day in enumerate(days):
+            lo, hi = self.day_start, self.day_end
+            blocks = []
+            if index == 0:
+                if frame.arrival is not None:
+                    arrival = frame.arrival.hour * 60 + frame.arrival.minute
+                    fixed.append({"day": index, "type": "flight_arrival", "start": arrival, "end": arrival})
+                    lo = max(lo, arrival + self.arrival_buffer)
+                check_in = max(self.check_in, lo)
+                if check_in + 30 > MINUTES_PER_DAY and len(days) > 1:
+                    # Landed too late to check in today: the block moves past midnight
+                    late_check_in = check_in - MINUTES_PER_DAY
+                else:
+                    check_in = min(check_in, MINUTES_PER_DAY - 30)
+                    fixed.append({"day": index, "type": "hotel_check_in", "start": check_in, "end": check_in + 30})
+                    blocks.append((check_in, check_in + 30))
+            if index == 1 and late_check_in is not None:
+                fixed.append({"day": index, "type": "hotel_check_in", "start": late_check_in, "end": late_check_in + 30})
+                blocks.append((late_check_in, late_check_in + 30))
+            if index == len(days) - 1 and len(days) > 1:
+                fixed.append({"day": index, "type": "hotel_check_out", "start": self.check_out - 30, "end": self.check_out})
+                blocks.append((self.check_out - 30, self.check_out))
+                if frame.departure is not None:
+                    departure = frame.departure.hour * 60 + frame.departure.minute
+                    fixed.append({"day": index, "type": "flight_departure", "start": departure, "end": departure})
+                    hi = min(hi, departure - self.departure_buffer)
+
+            free = []
+            cursor = lo
+            for block_start, block_end in sorted(blocks):
+                if block_start > cursor:
+                    free.append((cursor, min(block_start, hi)))
+                cursor = max(cursor, block_end)
+            if cursor < hi:
+                free.append((cursor, hi))
+            windows.append([(a, b) for a, b in free if b > a])
+        return windows, fixed
+
+    def _candidates(self, activities: Sequence[Dict[str, Any]], frame: TripFrame, windows: List[List[Tuple[int, int]]]):
+        """Every feasible (start, end, weight, activity) placement on the trip timeline"""
+        days = frame.days
+        candidates = []
+        for index, activity in enumerate(activities):
+            duration = activity_duration_minutes(activity)
+            weight = duration * activity_rating(activity)
+            hours = activity.get("opening_hours") or {}
+            open_at = _minutes(hours["open"]) if hours.get("open") else self.opening_window[0]
+            close_at = _minutes(hours["close"]) if hours.get("close") else self.opening_window[1]
+            available = {d for d in (_parse_date(v) for v in activity.get("available_dates") or []) if d}
+            for day_index, day in enumerate(days):
+                if available and day not in available:
+                    continue
+                offset = day_index * MINUTES_PER_DAY
+                for free_start, free_end in windows[day_index]:
+                    lo, hi = max(free_start, open_at), min(free_end, close_at)
+                    start = -(-lo // self.slot) * self.slot
+                    while start + duration <= hi:
+                        candidates.append((offset + start, offset + start + duration, weight, index))
+                        start += self.slot
+        return candidates
+
+    def _select(self, candidates: List[Tuple[int, int, float, int]]) -> List[Tuple[int, int, float, int]]:
+        """Maximum-weight set of non-overlapping candidates (transition gap included)"""
+        candidates = sorted(candidates, key=lambda c: c[1])
+        ends = [c[1] + self.transition for c in candidates]
+        best = [0.0] * (len(candidates) + 1)
+        previous = [0] * len(candidates)
+        for i, (start, _, weight, _) in enumerate(candidates):
+            # Candidates whose end (plus transition) is at or before this start
+            previous[i] = bisect.bisect_right(ends, start, 0, i)
+            best[i + 1] = max(best[i], weight + best[previous[i]])
+        chosen = []
+        i = len(candidates)
+        while i > 0:
+            if best[i] != best[i - 1]:
+                chosen.append(candidates[i - 1])
+                i = previous[i - 1]
+            else:
+                i -= 1
+        chosen.reverse()
+        return chosen
+
+    def _dedupe(self, chosen: List[Tuple[int, int, float, int]], candidates: List[Tuple[int, int, float, int]]):
+        """Keep each activity's first use, then refill freed time greedily (heaviest unused candidate first)"""
+        starts: List[int] = []
+        kept: List[Tuple[int, int, float, int]] = []
+        used = set()
+        for candidate in chosen:
+            if candidate[3] not in used:
+                used.add(candidate[3])
+                starts.append(candidate[0])
+                kept.append(candidate)
+        if len(kept) == len(chosen):
+            return kept, 0
+        refilled = 0
+        for candidate in sorted(candidates, key=lambda c: (-c[2], c[0])):
+            start, end, _, index = candidate
+            if index in used:
+                continue
+            position = bisect.bisect_right(starts, start)
+            if position and kept[position - 1][1] + self.transition > start:
+                continue
+            if position < len(kept) and end + self.transition > kept[position][0]:
+                continue
+            used.add(index)
+            starts.insert(position, start)
+            kept.insert(position, candidate)
+            refilled += 1
+        return kept, refilled
+
+    def schedule(
+        self,
+        flights: Sequence[Dict[str, Any]],
+        activities: Sequence[Dict[str, Any]],
+        trip: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Plan the trip
+        Args:
+            flights: Flight offers (Amadeus flight-offers shape); the cheapest is planned around
+            activities: Activity offers, optionally carrying duration_hours, available_dates,
+                rating and opening_hours {"open", "close"}
+            trip: Request fields (departureDate/returnDate or checkInDate/checkOutDate)
+        Returns:
+            {"days": [{"date", "events"}], "unscheduled": [activity ids],
+             "stats": {"candidates", "passes", "refilled"}}
+        """
+        frame = self.frame(flights, trip)
+        if frame is None:
+            return {
+                "days": [],
+                "unscheduled": [activity_id(a) for a in activities],
+                "stats": {"candidates": 0, "passes": 0, "refilled": 0},
+            }
+
+        windows, fixed = self._free_windows(frame)
+        candidates = self._candidates(activities, frame, windows)
+        # Interval scheduling may reuse one activity in several slots; one DP
+        # solve plus one greedy pass (never repeated re-solves) makes them unique
+        chosen, refilled = self._dedupe(self._select(candidates), candidates)
+        logger.debug(f"Scheduled {len(chosen)} of {len(activities)} activities ({refilled} slots refilled)")
+
+        days = frame.days
+        events: List[List[Dict[str, Any]]] = [[] for _ in days]
+        for event in fixed:
+            events[event["day"]].append(self._event(days[event["day"]], event["type"], event["start"], event["end"]))
+        for start, end, _, index in chosen:
+            day_index = start // MINUTES_PER_DAY
+            activity = activities[index]
+            events[day_index].append(self._event(
+                days[day_index], "activity", start % MINUTES_PER_DAY, end % MINUTES_PER_DAY or MINUTES_PER_DAY,
+                id=activity_id(activity), title=activity.get("title") or activity.get("tour_name"),
+            ))
+        scheduled = {index for _, _, _, index in chosen}
+        return {
+            "days": [
+                {"date": day.isoformat(), "events": sorted(day_events, key=lambda e: e["start"])}
+                for day, day_events in zip(days, events)
+            ],
+            "unscheduled": [activity_id(a) for i, a in enumerate(activities) if i not in scheduled],
+            "stats": {"candidates": len(candidates), "passes": 1, "refilled": refilled},
+        }
+
+    @staticmethod
+    def _event(day: date, kind: str, start: int, end: int, **extra) -> Dict[str, Any]:
+        base = datetime.combine(day, datetime.min.time())
+        return {
+            "type": kind,
+            "start": (base + timedelta(minutes=start)).isoformat(timespec="minutes"),
+            "end": (base + timedelta(minutes=end)).isoformat(timespec="minutes"),
+            **extra,
+        }
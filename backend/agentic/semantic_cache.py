@@ -0,0 +1,203 @@
+"""
+Semantic cache in front of the agentic pipeline.
+Queries are reduced to a canonical intent (structured fields from
+backend.agentic.intent plus the request's own fields), so differently
+phrased requests for the same trip share one cached response. Only an intent
+that pins origin, destination and date is keyed on its fields alone; any
+other query also keys on its normalized text, and queries whose intent could
+not be fully extracted (typos, unknown phrasing) fall back to
+a local MinHash/LSH index over character shingles of the normalized text;
+a near-duplicate is only reused when none of its fields contradict what was
+extracted from the new query. Entries expire after a freshness window so
+prices and availability do not go stale.
+"""
+
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from backend.agentic.intent import canonical_text, parse_intent
+from backend.utils.singleflight import request_key
+
+logger = logging.getLogger(__name__)
+
+# Request fields that never change the orchestrated answer
+IGNORED_FIELDS = ("query", "format", "session_id")
+# An intent missing any of these says too little to identify the trip by its fields alone
+KEY_FIELDS = ("originLocationCode", "destinationLocationCode", "departureDate")
+_PRIME = (1 << 31) - 1  # a*x + b stays below 2**63 for 32-bit shingle hashes
+
+
+@dataclass
+class CacheEntry:
+    key: str
+    fields: Dict[str, Any]  # canonical intent: parsed fields merged with the request's own
+    text: str
+    signature: np.ndarray
+    response: Dict[str, Any]
+    checkpoints: Dict[str, Dict[str, Any]]
+    stored_at: float = field(default_factory=time.time)
+
+
+@dataclass
+class CacheHit:
+    response: Dict[str, Any]
+    checkpoints: Dict[str, Dict[str, Any]]
+    fields: Dict[str, Any]
+    match: str  # "exact" or "similar"
+    similarity: float
+    age_seconds: float
+
+
+class MinHasher:
+    """MinHash signatures over character shingles, with LSH banding"""
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, shingle: int = 3, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle = shingle
+        self._a = rng.integers(1, _PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _PRIME, size=num_perm, dtype=np.uint64)
+
+    def shingles(self, text: str) -> Set[str]:
+        padded = f" {text} "
+        return {padded[i:i + self.shingle] for i in range(max(1, len(padded) - self.shingle + 1))}
+
+    def signature(self, text: str) -> np.ndarray:
+        hashes = np.fromiter(
+            (int.from_bytes(hashlib.blake2b(s.encode(), digest_size=4).digest(), "little") for s in self.shingles(text)),
+            dtype=np.uint64,
+        )
+        # One universal hash (a*x + b) mod p per permutation, minimum over the shingles
+        return ((np.outer(self._a, hashes) + self._b[:, None]) % _PRIME).min(axis=1)
+
+    def band_keys(self, signature: np.ndarray) -> List[Tuple[int, bytes]]:
+        return [(band, signature[band * self.rows:(band + 1) * self.rows].tobytes()) for band in range(self.bands)]
+
+    @staticmethod
+    def similarity(a: np.ndarray, b: np.ndarray) -> float:
+        return float(np.mean(a == b))
+
+
+class SemanticCache:
+    """Response cache for agentic queries keyed on canonical intent, with near-duplicate matching"""
+
+    def __init__(self, ttl_seconds: float = 600.0, max_entries: int = 2000, threshold: float = 0.8, hasher: Optional[MinHasher] = None):
+        """
+        Initialize SemanticCache
+        Args:
+            ttl_seconds: Freshness window; older entries are never served
+            max_entries: LRU bound on cached responses
+            threshold: Minimum estimated Jaccard similarity for a near-duplicate match
+            hasher: MinHash/LSH settings (defaults to MinHasher())
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.hasher = hasher or MinHasher()
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._buckets: Dict[Tuple[int, bytes], Set[str]] = {}
+        self.hits = {"exact": 0, "similar": 0}
+        self.misses = 0
+
+    def intent(self, request: Dict[str, Any], today: Optional[date] = None) -> Tuple[str, Dict[str, Any], str]:
+        """Cache key, canonical fields and normalized text for a request"""
+        query = request.get("query", "")
+        fields = {**parse_intent(query, today), **{k: v for k, v in request.items() if k not in IGNORED_FIELDS}}
+        text = canonical_text(query, today)
+        if all(fields.get(k) for k in KEY_FIELDS):
+            return request_key("semantic", fields), fields, text
+        # e.g. "what visa do nigerians need" and "beach weekend in bali" both parse to {}
+        return request_key("semantic", {**fields, "_text": text}), fields, text
+
+    def lookup(self, request: Dict[str, Any]) -> Optional[CacheHit]:
+        key, fields, text = self.intent(request)
+        entry = self._fresh(key)
+        if entry is not None:
+            return self._hit(entry, "exact", 1.0)
+        if text:
+            signature = self.hasher.signature(text)
+            best, best_score = None, self.threshold
+            candidates = set().union(*(self._buckets.get(band, ()) for band in self.hasher.band_keys(signature)))
+            for candidate_key in candidates:
+                candidate = self._fresh(candidate_key)
+                if candidate is None or not self._compatible(fields, candidate.fields):
+                    continue
+                score = self.hasher.similarity(signature, candidate.signature)
+                if score >= best_score:
+                    best, best_score = candidate, score
+            if best is not None:
+                return self._hit(best, "similar", best_score)
+        self.misses += 1
+        return None
+
+    def store(self, request: Dict[str, Any], response: Dict[str, Any], checkpoints: Dict[str, Dict[str, Any]]) -> None:
+        key, fields, text = self.intent(request)
+        self._remove(key)
+        entry = CacheEntry(key, fields, text, self.hasher.signature(text), response, dict(checkpoints))
+        self._entries[key] = entry
+        for band in self.hasher.band_keys(entry.signature):
+            self._buckets.setdefault(band, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    @staticmethod
+    def _compatible(fields: Dict[str, Any], cached: Dict[str, Any]) -> bool:
+        # Whatever the new query does pin down must agree with the cached intent
+        return all(cached.get(k) == v for k, v in fields.items())
+
+    def _fresh(self, key: str) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.time() - entry.stored_at > self.ttl_seconds:
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for band in self.hasher.band_keys(entry.signature):
+            bucket = self._buckets.get(band)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band]
+
+    def _hit(self, entry: CacheEntry, match: str, similarity: float) -> CacheHit:
+        self.hits[match] += 1
+        return CacheHit(
+            response=entry.response,
+            checkpoints=entry.checkpoints,
+            fields=entry.fields,
+            match=match,
+            similarity=round(similarity, 3),
+            age_seconds=round(time.time() - entry.stored_at, 1),
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.misses + sum(self.hits.values())
+        return {
+            "entries": len(self._entries),
+            "hits": dict(self.hits),
+            "misses": self.misses,
+            "hit_rate": round(sum(self.hits.values()) / lookups, 3) if lookups else None,
+            "ttl_seconds": self.ttl_seconds,
+            "threshold": self.threshold,
+        }
@@ -1,8 +1,93 @@
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from backend.agentic.scheduling import ItineraryScheduler
+from backend.config import Config
+
+
+@dataclass
+class ItinerarySession:
+    """One planning conversation: the request so far and each agent's checkpointed output"""
+    session_id: str
+    request: Dict[str, Any]
+    checkpoints: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    # Fields parsed from the query on the first run, so later resumes keep its dates
+    intent: Optional[Dict[str, Any]] = None
+    response: Optional[Dict[str, Any]] = None
+    status: str = "pending_approval"
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+
+
+class ItineraryStore:
+    """Session-keyed in-memory store of itinerary checkpoints (TTL + LRU bounded)"""
+
+    def __init__(self, ttl_seconds: float = 86400.0, max_sessions: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, ItinerarySession]" = OrderedDict()
+
+    def create(self, request: Dict[str, Any]) -> ItinerarySession:
+        session = ItinerarySession(session_id=uuid.uuid4().hex, request=dict(request))
+        self.save(session)
+        return session
+
+    def get(self, session_id: str) -> Optional[ItinerarySession]:
+        session = self._sessions.get(session_id)
+        if session is None:
+            return None
+        if time.time() - session.updated_at > self.ttl_seconds:
+            del self._sessions[session_id]
+            return None
+        self._sessions.move_to_end(session_id)
+        return session
+
+    def save(self, session: ItinerarySession) -> None:
+        session.updated_at = time.time()
+        self._sessions[session.session_id] = session
+        self._sessions.move_to_end(session.session_id)
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+
 class ItineraryState:
-    def create_itinerary(self, logistics_result, culture_result):
+    def __init__(self, store: Optional[ItineraryStore] = None, scheduler: Optional[ItineraryScheduler] = None):
+        self.sessions = store or ItineraryStore()
+        self.scheduler = scheduler or ItineraryScheduler(max_days=Config.ITINERARY_MAX_DAYS)
+
+    def create_itinerary(self, logistics_result, culture_result, trip=None):
         # Compose itinerary, require user approval before booking
-        # ...state machine logic...
+        flights = (logistics_result.get("flights") or {}).get("flights")
+        activities = (culture_result.get("activities") or {}).get("activities")
+        plan = self.scheduler.schedule(
+            flights if isinstance(flights, list) else [],
+            activities if isinstance(activities, list) else [],
+            trip,
+        )
         return {
-            "days": [],
+            "days": plan["days"],
+            "unscheduled": plan["unscheduled"],
             "status": "pending_approval"
         }
+
+    def edit(self, session: ItinerarySession, changes: Dict[str, Any]) -> ItinerarySession:
+        # Any edit sends the plan back for approval; checkpoints are kept so
+        # only agents whose inputs changed run again. A None value clears a field.
+        if "query" in changes and changes["query"] != session.request.get("query"):
+            session.intent = None  # a new query is parsed afresh on the next run
+        merged = {**session.request, **changes}
+        session.request = {key: value for key, value in merged.items() if value is not None}
+        session.status = "pending_approval"
+        self.sessions.save(session)
+        return session
+
+    def approve(self, session: ItinerarySession) -> ItinerarySession:
+        session.status = "approved"
+        self.sessions.save(session)
+        return session
@@ -1,33 +1,87 @@
+import asyncio
+import logging
+
 from backend.agentic.logistics import LogisticsAgent
 from backend.agentic.culture import CultureAgent
 from backend.agentic.financial import FinancialAgent
 from backend.agentic.state import ItineraryState
 from backend.agentic.visa import VisaAgent
+from backend.config import Config
+from backend.utils.deadline import remaining_timeout
+
+logger = logging.getLogger(__name__)
+
 
 class SupervisorAgent:
-    def __init__(self):
+    def __init__(self, agent_timeouts=None):
         self.logistics_agent = LogisticsAgent()
         self.culture_agent = CultureAgent()
         self.financial_agent = FinancialAgent()
         self.state_machine = ItineraryState()
         self.visa_agent = VisaAgent()
+        # Per-agent deadlines (seconds) for the concurrent fan-out
+        self.agent_timeouts = {
+            "logistics": Config.AGENTIC_LOGISTICS_TIMEOUT,
+            "culture": Config.AGENTIC_CULTURE_TIMEOUT,
+            "visa": Config.AGENTIC_VISA_TIMEOUT,
+            **(agent_timeouts or {}),
+        }
+
+    async def handle_query(self, payload):
+        """Run the logistics, culture and visa agents concurrently.
+
+        Each agent gets its own deadline from ``agent_timeouts``. An agent that
+        misses its deadline (or fails) does not sink the response: its section
+        is replaced by a degraded marker and reported under ``degraded``, and
+        pricing/itinerary are composed from whatever did finish.
+        """
+        logistics_result, culture_result, visa_result = await asyncio.gather(
+            self._run_agent("logistics", self.logistics_agent.process, payload),
+            self._run_agent("culture", self.culture_agent.process, payload),
+            self._run_agent("visa", self.visa_agent.assess_trip, payload),
+        )
+        sections = {
+            "logistics": logistics_result,
+            "culture": culture_result,
+            "visa": visa_result,
+        }
+        degraded = {name: result for name, result in sections.items() if result.get("degraded")}
 
-    def handle_query(self, payload):
-        # Step 1: Parse natural language query
-        # Step 2: Query logistics, culture and visa agents
-        logistics_result = self.logistics_agent.process(payload)
-        culture_result = self.culture_agent.process(payload)
-        visa_result = self.visa_agent.assess_trip(payload)
-        # Step 3: Calculate pricing in multiple currencies
         price_info = self.financial_agent.convert_prices(
-            logistics_result,
-            culture_result,
+            {} if "logistics" in degraded else logistics_result,
+            {} if "culture" in degraded else culture_result,
+        )
+        itinerary = self.state_machine.create_itinerary(
+            {} if "logistics" in degraded else logistics_result,
+            {} if "culture" in degraded else culture_result,
+            payload,
         )
-        # Step 4: Human-in-the-loop approval
-        itinerary = self.state_machine.create_itinerary(logistics_result, culture_result)
         return {
             "itinerary": itinerary,
             "prices": price_info,
             "visa": visa_result,
-            "approval_required": True
+            "approval_required": True,
+            "degraded": degraded,
         }
+
+    async def _run_agent(self, name, func, payload):
+        """Run an agent call bounded by its deadline.
+
+        Coroutine agents are awaited directly and cancelled on timeout. Blocking
+        agents run off the event loop; worker threads cannot be interrupted, so
+        a timed-out blocking agent keeps running and only its result is dropped.
+        """
+        # Never outlive the request that is waiting for the answer
+        timeout = remaining_timeout(self.agent_timeouts.get(name))
+        if asyncio.iscoroutinefunction(func):
+            call = func(payload)
+        else:
+            call = asyncio.to_thread(func, payload)
+        try:
+            return await asyncio.wait_for(call, timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"{name} agent missed its {timeout}s deadline")
+            return {"degraded": True, "reason": "timeout", "timeout_seconds": timeout}
+        except Exception as e:
+            logger.error(f"{name} agent failed: {str(e)}")
+            return {"degraded": True, "reason": "error", "error": type(e).__name__}
@@ -1,23 +1,46 @@
 
-import requests
-import time
 import logging
 
-def mask_pii(data):
-    return str(data).replace('passport', '***').replace('name', '***').replace('card', '****')
+from backend.config import Config
+from backend.utils.http_client import UpstreamError, get_http_client, using_stand_in
+from backend.utils.ndpr_logger import MaskedPayload
+from backend.utils.search_cache import get_search_cache
 
 class TravuAPI:
-    def __init__(self, config=None):
-        self.config = config or {"api_key": "YOUR_TRAVU_KEY"}
+    def __init__(self, config=None, http_client=None, search_cache=None):
+        self.config = config or {"api_key": Config.TRAVU_API_KEY, "base_url": Config.TRAVU_BASE_URL}
+        self.http = http_client or get_http_client()
+        self.cache = search_cache or get_search_cache()
 
-    def search_buses(self, params):
-        for attempt in range(3):
-            try:
-                # Real API call placeholder
-                # response = requests.get('https://api.travu.africa/v1/bus-search', headers={...}, params=params)
-                logging.info(f"TravuAPI.search_buses params: {mask_pii(params)}")
-                return {"buses": ["bus1", "bus2"]}
-            except Exception as e:
-                logging.error(f"TravuAPI.search_buses error: {str(e)}")
-                time.sleep(2)
-        return {"error": "Travu API unavailable"}
+    @property
+    def live(self):
+        # Without credentials we serve sandbox fixtures instead of calling out,
+        # unless a local stand-in (simulator or replay) is answering upstream calls
+        return bool(self.config.get("api_key")) or using_stand_in()
+
+    async def search_buses(self, params):
+        logging.info("TravuAPI.search_buses params: %s", MaskedPayload(params))
+        if not self.live:
+            return {"buses": self._sandbox_buses(params)}
+        return await self.cache.get_or_fetch("travu_buses", params, lambda: self._fetch_buses(params))
+
+    async def _fetch_buses(self, params):
+        try:
+            response = await self.http.request(
+                "GET",
+                f"{self.config['base_url']}/v1/bus-search",
+                provider="travu",
+                params=params,
+                headers={"Authorization": f"Bearer {self.config['api_key']}"},
+            )
+            return {"buses": response.json().get("data", [])}
+        except UpstreamError as e:
+            logging.error(f"TravuAPI.search_buses error: {str(e)}")
+            return {"error": "Travu API unavailable"}
+
+    def _sandbox_buses(self, params):
+        """Sandbox bus departures shaped like Travu bus-search results"""
+        return [
+            {"id": "BUS001", "operator": "ABC Transport", "departureTime": "08:00", "arrivalTime": "14:30", "pricePerSeat": "15000.00", "currency": "NGN"},
+            {"id": "BUS002", "operator": "GIGM", "departureTime": "13:00", "arrivalTime": "19:15", "pricePerSeat": "13500.00", "currency": "NGN"},
+        ]
@@ -1,23 +1,49 @@
 
-import requests
-import time
 import logging
 
-def mask_pii(data):
-    return str(data).replace('passport', '***').replace('name', '***').replace('card', '****')
+from backend.config import Config
+from backend.utils.hedging import get_hedge_policy
+from backend.utils.http_client import UpstreamError, get_http_client, using_stand_in
+from backend.utils.ndpr_logger import MaskedPayload
+from backend.utils.search_cache import get_search_cache
 
 class ViatorAPI:
-    def __init__(self, config=None):
-        self.config = config or {"api_key": "YOUR_VIATOR_KEY"}
+    def __init__(self, config=None, http_client=None, search_cache=None):
+        self.config = config or {"api_key": Config.VIATOR_API_KEY, "base_url": Config.VIATOR_BASE_URL}
+        self.http = http_client or get_http_client()
+        self.cache = search_cache or get_search_cache()
+        # Searches are idempotent, so slow ones may be hedged
+        self.hedge = get_hedge_policy("viator")
 
-    def search_activities(self, params):
-        for attempt in range(3):
-            try:
-                # Real API call placeholder
-                # response = requests.get('https://api.viator.com/v1/activities-search', headers={...}, params=params)
-                logging.info(f"ViatorAPI.search_activities params: {mask_pii(params)}")
-                return {"activities": ["activity1", "activity2"]}
-            except Exception as e:
-                logging.error(f"ViatorAPI.search_activities error: {str(e)}")
-                time.sleep(2)
-        return {"error": "Viator API unavailable"}
+    @property
+    def live(self):
+        # Without credentials we serve sandbox fixtures instead of calling out,
+        # unless a local stand-in (simulator or replay) is answering upstream calls
+        return bool(self.config.get("api_key")) or using_stand_in()
+
+    async def search_activities(self, params):
+        logging.info("ViatorAPI.search_activities params: %s", MaskedPayload(params))
+        if not self.live:
+            return {"activities": self._sandbox_activities(params)}
+        return await self.cache.get_or_fetch("viator_activities", params, lambda: self._fetch_activities(params))
+
+    async def _fetch_activities(self, params):
+        try:
+            response = await self.hedge.run(lambda: self.http.request(
+                "POST",
+                f"{self.config['base_url']}/partner/products/search",
+                provider="viator",
+                json=params,
+                headers={"exp-api-key": self.config["api_key"], "Accept-Language": "en-US"},
+            ))
+            return {"activities": response.json().get("products", [])}
+        except UpstreamError as e:
+            logging.error(f"ViatorAPI.search_activities error: {str(e)}")
+            return {"error": "Viator API unavailable"}
+
+    def _sandbox_activities(self, params):
+        """Sandbox products shaped like Viator products/search results"""
+        return [
+            {"productCode": "VIATOR_001", "title": "City Highlights Walking Tour", "pricing": {"summary": {"fromPrice": 49.99}, "currency": "USD"}},
+            {"productCode": "VIATOR_003", "title": "Local Cuisine Food Tour", "pricing": {"summary": {"fromPrice": 89.99}, "currency": "USD"}},
+        ]
@@ -24,6 +24,9 @@ class VisaAgent:
         instead of raising.
         """
 
+        if payload.get("travelers"):
+            return self.assess_group(payload)
+
         citizen = (
             payload.get("citizenCountry")
             or payload.get("citizen_country")
@@ -48,22 +51,64 @@ class VisaAgent:
                 destination_country=destination,
                 passport_number=payload.get("passportNumber"),
             )
+            return self._summary(eligibility)
+        except Exception:
+            # Defer to a generic advisory in case of upstream failure.
+            return {
+                "eligible": False,
+                "advisory_only": True,
+                "reason": "Visa service temporarily unavailable; please retry or contact support.",
+            }
+
+    def assess_group(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Visa check for a group with mixed nationalities in one batched lookup.
+
+        The trip is only marked eligible when every traveler is.
+        """
 
+        destination = (
+            payload.get("destinationCountry")
+            or payload.get("destination_country")
+            or payload.get("to")
+        )
+        travelers = [
+            {
+                "citizen_country": t.get("citizenCountry") or t.get("citizen_country") or t.get("passportCountry"),
+                "destination_country": t.get("destinationCountry") or t.get("destination_country"),
+            }
+            for t in payload["travelers"]
+            if isinstance(t, dict)
+        ]
+        if not destination and not all(t["destination_country"] for t in travelers):
+            return {
+                "eligible": False,
+                "advisory_only": True,
+                "reason": "Missing destination context for group visa check",
+            }
+
+        try:
+            results = [self._summary(e) for e in self._service.batch_eligibility_check(travelers, destination)]
             return {
-                "citizen_country": eligibility.citizen_country,
-                "destination_country": eligibility.destination_country,
-                "eligible": eligibility.eligible,
-                "visa_type": eligibility.visa_type,
-                "processing_time_days": eligibility.processing_time_days,
-                "visa_fee": eligibility.visa_fee,
-                "currency": eligibility.currency,
-                "requirements": eligibility.requirements,
-                "exemptions": eligibility.exemptions,
+                "eligible": all(r["eligible"] for r in results),
+                "travelers": results,
             }
         except Exception:
-            # Defer to a generic advisory in case of upstream failure.
             return {
                 "eligible": False,
                 "advisory_only": True,
                 "reason": "Visa service temporarily unavailable; please retry or contact support.",
             }
+
+    @staticmethod
+    def _summary(eligibility: VisaEligibility) -> Dict[str, Any]:
+        return {
+            "citizen_country": eligibility.citizen_country,
+            "destination_country": eligibility.destination_country,
+            "eligible": eligibility.eligible,
+            "visa_type": eligibility.visa_type,
+            "processing_time_days": eligibility.processing_time_days,
+            "visa_fee": eligibility.visa_fee,
+            "currency": eligibility.currency,
+            "requirements": eligibility.requirements,
+            "exemptions": eligibility.exemptions,
+        }
@@ -0,0 +1,205 @@
+"""
+End-to-end benchmark for the agentic pipeline.
+
+    python -m backend.benchmarks.agentic_bench --concurrency 1 8 32 --requests 200 --out bench.json
+
+Drives POST /agentic/agentic-query in-process (httpx over ASGI, no sockets)
+with every upstream answered by the local simulator (UPSTREAM_MODE=simulate),
+so runs are repeatable offline. For each concurrency level it reports
+end-to-end and per-stage (logistics, culture, visa, financial, itinerary)
+p50/p95/p99 latency and throughput, plus the simulator's per-provider
+request/throttle/error counts. Results are written as JSON so runs can be
+diffed; use --profile to apply simulator latency/error/429 overrides.
+
+Only the agentic router is mounted: the app's request-body middleware is not
+part of the pipeline being measured.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import platform
+import random
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+import httpx
+from fastapi import FastAPI
+
+from backend.config import Config
+
+STAGES = ("logistics", "culture", "visa", "financial", "itinerary")
+AIRPORTS = [
+    ("LOS", "NG"), ("ABV", "NG"), ("LHR", "GB"), ("CDG", "FR"), ("JFK", "US"), ("DXB", "AE"),
+    ("NBO", "KE"), ("JNB", "ZA"), ("ACC", "GH"), ("FRA", "DE"), ("AMS", "NL"), ("IST", "TR"),
+]
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile (q in 0-100)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)], 2)
+
+
+def summarize(samples: List[float], wall_seconds: float) -> Dict[str, Any]:
+    return {
+        "count": len(samples),
+        "p50_ms": percentile(samples, 50),
+        "p95_ms": percentile(samples, 95),
+        "p99_ms": percentile(samples, 99),
+        "mean_ms": round(sum(samples) / len(samples), 2) if samples else None,
+        "throughput_per_s": round(len(samples) / wall_seconds, 2) if wall_seconds else None,
+    }
+
+
+def synthetic_payloads(count: int, rng: random.Random, repeat_ratio: float = 0.0) -> List[Dict[str, Any]]:
+    """Distinct trip requests (random route and dates); repeat_ratio re-sends earlier ones"""
+    payloads: List[Dict[str, Any]] = []
+    start = date.today() + timedelta(days=30)
+    for _ in range(count):
+        if payloads and rng.random() < repeat_ratio:
+            payloads.append(dict(rng.choice(payloads)))
+            continue
+        (origin, citizen), (destination, country) = rng.sample(AIRPORTS, 2)
+        departure = start + timedelta(days=rng.randint(0, 180))
+        back = departure + timedelta(days=rng.randint(2, 10))
+        payloads.append({
+            "query": f"Trip {origin} to {destination} from {departure.isoformat()} to {back.isoformat()}",
+            "citizenCountry": citizen,
+            "destinationCountry": country,
+            "adults": rng.randint(1, 4),
+        })
+    return payloads
+
+
+def build_app() -> FastAPI:
+    # Imported late: the routes build provider clients, which read UPSTREAM_MODE once
+    from backend.agentic.routes import router
+
+    app = FastAPI()
+    app.include_router(router, prefix="/agentic")
+    return app
+
+
+async def run_level(client: httpx.AsyncClient, payloads: List[Dict[str, Any]], concurrency: int) -> Dict[str, Any]:
+    """Send every payload with at most `concurrency` requests in flight"""
+    queue: asyncio.Queue = asyncio.Queue()
+    for payload in payloads:
+        queue.put_nowait(payload)
+    latencies: List[float] = []
+    stages: Dict[str, List[float]] = {stage: [] for stage in STAGES}
+    statuses: Dict[str, int] = {}
+    degraded: Dict[str, int] = {}
+    cached = 0
+
+    async def worker():
+        nonlocal cached
+        while not queue.empty():
+            payload = queue.get_nowait()
+            began = time.perf_counter()
+            response = await client.post("/agentic/agentic-query", json=payload)
+            latencies.append((time.perf_counter() - began) * 1000)
+            statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+            if response.status_code != 200:
+                continue
+            body = response.json()
+            for stage in STAGES:
+                # Stages served from the node cache did no work; keep them out of the distribution
+                if stage in body.get("timings", {}) and stage not in body.get("cached", []):
+                    stages[stage].append(body["timings"][stage])
+            cached += len(set(body.get("cached", [])) & set(STAGES))
+            for stage in body.get("degraded", {}):
+                degraded[stage] = degraded.get(stage, 0) + 1
+
+    began = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - began
+    return {
+        "concurrency": concurrency,
+        "requests": len(payloads),
+        "wall_seconds": round(wall, 3),
+        "statuses": statuses,
+        "end_to_end": summarize(latencies, wall),
+        "stages": {stage: summarize(samples, wall) for stage, samples in stages.items()},
+        "cached_stages": cached,
+        "degraded": degraded,
+    }
+
+
+async def run(levels: List[int], requests: int, warmup: int, seed: int, repeat_ratio: float) -> Dict[str, Any]:
+    from backend.agentic.fx import get_fx_rate_cache
+    from backend.booking.visa_matrix import get_visa_matrix
+    from backend.utils.http_client import get_http_client
+
+    app = build_app()
+    rng = random.Random(seed)
+    simulator = get_http_client().transport.app.simulator
+    await get_fx_rate_cache().start()
+    await get_visa_matrix().start()
+    results = []
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=120) as client:
+            if warmup:
+                await run_level(client, synthetic_payloads(warmup, rng), min(warmup, max(levels)))
+            for concurrency in levels:
+                simulator.reset_stats()
+                level = await run_level(client, synthetic_payloads(requests, rng, repeat_ratio), concurrency)
+                level["upstream"] = simulator.snapshot()["stats"]
+                results.append(level)
+    finally:
+        await get_fx_rate_cache().stop()
+        await get_visa_matrix().stop()
+        await get_http_client().aclose()
+    return {
+        "benchmark": "agentic_pipeline",
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "config": {
+            "requests": requests,
+            "warmup": warmup,
+            "seed": seed,
+            "repeat_ratio": repeat_ratio,
+            "sim_profile": Config.UPSTREAM_SIM_PROFILE or None,
+            "profiles": simulator.snapshot()["profiles"],
+            "hedging": Config.UPSTREAM_HEDGING_ENABLED,
+        },
+        "levels": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the agentic pipeline against simulated upstreams")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=100, help="Requests per concurrency level")
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--profile", default=None, help="Simulator profile overrides (JSON)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--repeat-ratio", type=float, default=0.0, help="Fraction of requests repeating an earlier trip")
+    parser.add_argument("--out", default=None, help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    # Must be set before the routes (and their HTTP client) are imported
+    Config.UPSTREAM_MODE = "simulate"
+    Config.UPSTREAM_SIM_PROFILE = args.profile or Config.UPSTREAM_SIM_PROFILE
+    Config.UPSTREAM_SIM_SEED = args.seed
+
+    report = asyncio.run(run(args.concurrency, args.requests, args.warmup, args.seed, args.repeat_ratio))
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+    print(f"{'conc':>5} {'req/s':>8} {'e2e p50':>8} {'p95':>8} {'p99':>8}  " + " ".join(f"{s[:9]:>10}" for s in STAGES))
+    for level in report["levels"]:
+        e2e = level["end_to_end"]
+        stage_p95 = " ".join(f"{str(level['stages'][s]['p95_ms']):>10}" for s in STAGES)
+        print(f"{level['concurrency']:>5} {e2e['throughput_per_s']:>8} {e2e['p50_ms']:>8} {e2e['p95_ms']:>8} {e2e['p99_ms']:>8}  {stage_p95}")
+    print("(stage columns are p95 ms)")
+    if args.out:
+        print(f"Results written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
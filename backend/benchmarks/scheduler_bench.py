@@ -0,0 +1,101 @@
+"""
+Scaling benchmark for the itinerary scheduler.
+
+    python -m backend.benchmarks.scheduler_bench --sizes 50 100 200 400 800 --days 7
+
+Generates synthetic activities (random durations, ratings, opening hours and
+available dates) around a fixed flight pair and reports the median wall time
+of ItineraryScheduler.schedule per catalogue size, with the DP passes per run
+and the slots refilled by the uniqueness pass.
+"""
+
+import argparse
+import json
+import random
+import statistics
+import time
+from datetime import date, timedelta
+
+from backend.agentic.scheduling import ItineraryScheduler
+
+
+def synthetic_trip(days: int, start: date = date(2026, 3, 1)):
+    end = start + timedelta(days=days - 1)
+    flights = [{
+        "id": "1",
+        "itineraries": [
+            {"segments": [{"arrival": {"at": f"{start.isoformat()}T10:40:00"}}]},
+            {"segments": [{"departure": {"at": f"{end.isoformat()}T19:15:00"}}]},
+        ],
+        "price": {"currency": "USD", "grandTotal": "800.00"},
+    }]
+    return flights, start
+
+
+def synthetic_activities(count: int, start: date, days: int, rng: random.Random):
+    activities = []
+    for i in range(count):
+        open_hour = rng.randint(7, 11)
+        activities.append({
+            "productCode": f"ACT{i:05d}",
+            "title": f"Activity {i}",
+            "duration_hours": rng.choice([1, 1.5, 2, 3, 4, 5, 6]),
+            "rating": round(rng.uniform(3.0, 5.0), 1),
+            "opening_hours": {"open": f"{open_hour:02d}:00", "close": f"{open_hour + rng.randint(6, 11):02d}:00"},
+            "available_dates": [
+                (start + timedelta(days=d)).isoformat()
+                for d in range(days) if rng.random() < 0.7
+            ],
+        })
+    return activities
+
+
+def run(sizes, days: int, repeats: int, seed: int):
+    scheduler = ItineraryScheduler()
+    flights, start = synthetic_trip(days)
+    results = []
+    for size in sizes:
+        activities = synthetic_activities(size, start, days, random.Random(seed))
+        samples, passes = [], []
+        for _ in range(repeats):
+            began = time.perf_counter()
+            plan = scheduler.schedule(flights, activities)
+            samples.append((time.perf_counter() - began) * 1000)
+            passes.append(plan["stats"]["passes"])
+        scheduled = sum(1 for day in plan["days"] for event in day["events"] if event["type"] == "activity")
+        results.append({
+            "activities": size,
+            "days": days,
+            "scheduled": scheduled,
+            "candidates": plan["stats"]["candidates"],
+            "passes": max(passes),
+            "refilled": plan["stats"]["refilled"],
+            "median_ms": round(statistics.median(samples), 2),
+            "max_ms": round(max(samples), 2),
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ItineraryScheduler scaling")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 100, 200, 400, 800])
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.days, args.repeats, args.seed)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'activities':>10} {'days':>5} {'candidates':>10} {'scheduled':>9} {'passes':>6} {'refilled':>8} {'median ms':>10} {'max ms':>9}")
+    for row in results:
+        print(
+            f"{row['activities']:>10} {row['days']:>5} {row['candidates']:>10} {row['scheduled']:>9} "
+            f"{row['passes']:>6} {row['refilled']:>8} {row['median_ms']:>10} {row['max_ms']:>9}"
+        )
+
+
+if __name__ == "__main__":
+    main()
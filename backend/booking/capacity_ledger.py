@@ -0,0 +1,93 @@
+"""
+Per-date tour capacity ledger.
+One record per (tour, date) holds the participants booked for that
+departure, so remaining spots are a single read rather than a scan of every
+booking, and reserve/release are single compare-and-set updates on the
+shared state backend: two workers can never sell the same last spot.
+"""
+
+import calendar
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+from backend.utils.state_backend import StateBackend, get_state_backend
+
+LEDGER = "tour_capacity"
+
+
+class CapacityExceeded(ValueError):
+    """A reservation asked for more spots than the departure has left"""
+
+
+def departure_day(tour_date: str) -> str:
+    """ISO date of a departure (times of day share the date's capacity)"""
+    if not isinstance(tour_date, str):
+        raise ValueError(f"Expected an ISO tour date, got {tour_date!r}")
+    return date.fromisoformat(tour_date[:10]).isoformat()
+
+
+class CapacityLedger:
+    """Participants booked per (tour_id, date), with atomic reserve and release"""
+
+    def __init__(self, backend: Optional[StateBackend] = None):
+        """
+        Initialize CapacityLedger
+        Args:
+            backend: Shared state backend (defaults to get_state_backend())
+        """
+        self.state = backend or get_state_backend()
+
+    @staticmethod
+    def _key(tour_id: str, day: str) -> str:
+        return f"{tour_id}|{day}"
+
+    def booked(self, tour_id: str, tour_date: str) -> int:
+        record = self.state.get(LEDGER, self._key(tour_id, departure_day(tour_date)))
+        return record.value["booked"] if record else 0
+
+    def remaining(self, tour_id: str, tour_date: str, capacity: int) -> int:
+        return max(0, capacity - self.booked(tour_id, tour_date))
+
+    def reserve(self, tour_id: str, tour_date: str, participants: int, capacity: int) -> int:
+        """
+        Take spots on a departure, all or nothing
+        Args:
+            tour_id: Tour ID
+            tour_date: Departure date (ISO 8601)
+            participants: Spots to take
+            capacity: Departure capacity
+        Returns:
+            Spots remaining afterwards
+        Raises:
+            CapacityExceeded: Fewer than `participants` spots are left
+        """
+        if not isinstance(participants, int) or participants < 1:
+            raise ValueError("participants must be at least 1")
+        day = departure_day(tour_date)
+
+        def take(entry: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+            booked = entry["booked"] if entry else 0
+            if booked + participants > capacity:
+                raise CapacityExceeded(f"Not enough spots available for {tour_id} on {day} ({max(0, capacity - booked)} left)")
+            return {"booked": booked + participants}
+
+        entry = self.state.update(LEDGER, self._key(tour_id, day), take)
+        return capacity - entry["booked"]
+
+    def release(self, tour_id: str, tour_date: str, participants: int) -> None:
+        def give_back(entry: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+            booked = (entry["booked"] if entry else 0) - participants
+            return {"booked": booked} if booked > 0 else None
+
+        self.state.update(LEDGER, self._key(tour_id, departure_day(tour_date)), give_back)
+
+    def month(self, tour_id: str, year: int, month: int, capacity: int) -> List[Dict[str, Any]]:
+        """Remaining spots for every departure day of a month, read in one bulk lookup"""
+        days = [date(year, month, d).isoformat() for d in range(1, calendar.monthrange(year, month)[1] + 1)]
+        records = self.state.get_many(LEDGER, [self._key(tour_id, day) for day in days])
+        calendar_view = []
+        for day in days:
+            record = records.get(self._key(tour_id, day))
+            booked = record.value["booked"] if record else 0
+            calendar_view.append({"date": day, "booked": booked, "spots_available": max(0, capacity - booked)})
+        return calendar_view
@@ -1,17 +1,46 @@
 import logging
 from typing import Dict, List
 
+from backend.utils.amadeus_auth import get_amadeus_token_manager
+from backend.utils.http_client import get_http_client, using_stand_in
+from backend.utils.singleflight import get_singleflight, request_key
+
 class CarRentalService:
     """Car Rental service with Amadeus Car API integration"""
     
     def __init__(self, amadeus_config: Dict):
         self.amadeus_config = amadeus_config
+        self.token_manager = get_amadeus_token_manager(
+            getattr(amadeus_config, "AMADEUS_API_KEY", None),
+            getattr(amadeus_config, "AMADEUS_API_SECRET", None),
+            getattr(amadeus_config, "AMADEUS_BASE_URL", None),
+        )
+        self.http = get_http_client()
+        self.singleflight = get_singleflight()
         self.logger = logging.getLogger(__name__)
 
+    @property
+    def live(self) -> bool:
+        return bool(getattr(self.amadeus_config, "AMADEUS_API_KEY", None)) or using_stand_in()
+
     async def search_cars(self, params: Dict) -> Dict:
-        """Search available cars"""
+        """Search available cars (concurrent identical searches share one upstream call)"""
+        key = request_key("booking_cars", params)
+        return await self.singleflight.do(key, lambda: self._search_cars(params))
+
+    async def _search_cars(self, params: Dict) -> Dict:
         try:
             self.logger.info(f"Car search: {params['pickupLocationCode']} -> {params.get('dropoffLocationCode', params['pickupLocationCode'])}")
+            if self.live:
+                # Amadeus Car Search API (auth via the shared token manager)
+                response = await self.http.request(
+                    "GET",
+                    f"{self.amadeus_config.AMADEUS_BASE_URL}/v1/shopping/availability/car-rental",
+                    provider="amadeus",
+                    params=params,
+                    headers=await self.token_manager.auth_headers(),
+                )
+                return {"data": [{"id": "1", "offerItems": response.json().get("data", [])}]}
             return {
                 "data": [
                     {
@@ -1,5 +1,6 @@
 import asyncio
 import logging
+import time
 from typing import Optional, Dict, Any
 
 class CircuitBreaker:
@@ -20,9 +21,7 @@ class CircuitBreaker:
 
         try:
             result = await func(*args, **kwargs)
-            if self.state == "half-open":
-                self.state = "closed"
-                self.failures = 0
+            self.record_success()
             return result
         except Exception as e:
             self.failures += 1
@@ -31,3 +30,25 @@ class CircuitBreaker:
                 self.state = "open"
                 logging.error(f"Circuit breaker opened: {str(e)}")
             raise
+
+    # Synchronous API used by the booking services that guard calls inline
+
+    def is_available(self) -> bool:
+        if self.state == "open":
+            if time.monotonic() - self.last_failure_time > self.timeout:
+                self.state = "half-open"
+            else:
+                return False
+        return True
+
+    def record_success(self) -> None:
+        # Only consecutive failures count towards opening the breaker
+        self.state = "closed"
+        self.failures = 0
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self.last_failure_time = time.monotonic()
+        if self.failures >= self.failure_threshold and self.state != "open":
+            self.state = "open"
+            logging.error("Circuit breaker opened")
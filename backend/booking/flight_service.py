@@ -1,6 +1,10 @@
 import logging
 from typing import Dict, List, Optional
 
+from backend.utils.amadeus_auth import get_amadeus_token_manager
+from backend.utils.http_client import get_http_client, using_stand_in
+from backend.utils.singleflight import get_singleflight, request_key
+
 class FlightBookingService:
     """
     Flight booking service with Amadeus Enterprise API integration.
@@ -9,14 +13,37 @@ class FlightBookingService:
     
     def __init__(self, amadeus_config: Dict):
         self.amadeus_config = amadeus_config
+        self.token_manager = get_amadeus_token_manager(
+            getattr(amadeus_config, "AMADEUS_API_KEY", None),
+            getattr(amadeus_config, "AMADEUS_API_SECRET", None),
+            getattr(amadeus_config, "AMADEUS_BASE_URL", None),
+        )
+        self.http = get_http_client()
+        self.singleflight = get_singleflight()
         self.logger = logging.getLogger(__name__)
 
+    @property
+    def live(self) -> bool:
+        return bool(getattr(self.amadeus_config, "AMADEUS_API_KEY", None)) or using_stand_in()
+
     async def search_flights(self, params: Dict) -> Dict:
-        """Search available flights"""
+        """Search available flights (concurrent identical searches share one upstream call)"""
+        key = request_key("booking_flights", params)
+        return await self.singleflight.do(key, lambda: self._search_flights(params))
+
+    async def _search_flights(self, params: Dict) -> Dict:
         try:
-            # Amadeus Flight Search API
-            # response = requests.get("https://test.api.amadeus.com/v2/shopping/flight-offers", ...)
             self.logger.info(f"Flight search: {params['originLocationCode']} -> {params['destinationLocationCode']}")
+            if self.live:
+                # Amadeus Flight Search API
+                response = await self.http.request(
+                    "GET",
+                    f"{self.amadeus_config.AMADEUS_BASE_URL}/v2/shopping/flight-offers",
+                    provider="amadeus",
+                    params=params,
+                    headers=await self.token_manager.auth_headers(),
+                )
+                return response.json()
             return {
                 "data": [
                     {
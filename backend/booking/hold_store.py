@@ -0,0 +1,193 @@
+"""
+Room hold store.
+Holds live in the shared state backend, so a hold placed on one worker can
+be claimed (once) on any other. Placing a hold takes its rooms from the
+RoomInventory for every night of the stay; an expired or released hold
+gives them back, while a claimed hold keeps them for the booking it became.
+Lookups enforce each hold's TTL. Each worker also keeps the holds it placed
+in a min-heap keyed on expiry; its background sweeper releases lapsed ones
+in O(log n) each, and an occasional scan picks up holds whose worker went
+away before releasing them.
+"""
+
+import asyncio
+import heapq
+import logging
+import threading
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from backend.booking.room_inventory import RoomInventory
+from backend.utils.state_backend import StateBackend, get_state_backend
+
+logger = logging.getLogger(__name__)
+
+HOLDS = "hotel_holds"
+# Records outlive their holds by this much, so a sweeper still finds (and
+# releases the rooms of) lapsed holds; must exceed the orphan scan interval
+RECORD_GRACE = 300.0
+
+
+@dataclass(frozen=True)
+class RoomHold:
+    hold_id: str
+    hotel_id: str
+    room_type: str
+    check_in_date: str
+    check_out_date: str
+    number_of_rooms: int
+    expires_at: float  # time.time() value
+
+    @property
+    def expiration(self) -> str:
+        return datetime.fromtimestamp(self.expires_at).isoformat()
+
+
+class HoldStore:
+    """Expiry-ordered room holds backed by the room inventory"""
+
+    def __init__(
+        self,
+        sweep_interval: float = 5.0,
+        orphan_scan_interval: float = 60.0,
+        backend: Optional[StateBackend] = None,
+        inventory: Optional[RoomInventory] = None,
+    ):
+        """
+        Initialize HoldStore
+        Args:
+            sweep_interval: Seconds between background sweeps for this worker's lapsed holds
+            orphan_scan_interval: Seconds between scans for lapsed holds of any worker
+            backend: Shared state backend (defaults to get_state_backend())
+            inventory: Room inventory holds take rooms from
+        """
+        self.sweep_interval = sweep_interval
+        self.orphan_scan_interval = orphan_scan_interval
+        self.state = backend or get_state_backend()
+        self.inventory = inventory or RoomInventory(self.state)
+        # (expires_at, hold_id, hold) for holds placed by this worker
+        self._heap: List[Tuple[float, str, RoomHold]] = []
+        # Holds are placed from route handlers and swept from a worker thread
+        self._lock = threading.Lock()
+        self._sweeper: Optional[asyncio.Task] = None
+        self._last_orphan_scan = time.time()
+        self.expired_total = 0
+
+    def add(self, hold: RoomHold) -> None:
+        """
+        Place a hold, taking its rooms on every night of the stay
+        Raises:
+            InsufficientInventory: Some night does not have the rooms
+        """
+        self.inventory.reserve(hold.hotel_id, hold.room_type, hold.check_in_date, hold.check_out_date, hold.number_of_rooms)
+        try:
+            self.restore(hold)
+        except Exception:
+            self._give_back(hold)
+            raise
+
+    def restore(self, hold: RoomHold) -> None:
+        """Put back a claimed hold whose rooms are still taken (e.g. a booking that failed)"""
+        ttl = hold.expires_at - time.time() + RECORD_GRACE
+        if not self.state.create(HOLDS, hold.hold_id, asdict(hold), ttl=ttl):
+            raise ValueError(f"Hold ID {hold.hold_id} already exists")
+        with self._lock:
+            heapq.heappush(self._heap, (hold.expires_at, hold.hold_id, hold))
+
+    def get(self, hold_id: str) -> Optional[RoomHold]:
+        """The hold, or None if it does not exist or has expired"""
+        record = self.state.get(HOLDS, hold_id)
+        if record is None:
+            return None
+        hold = RoomHold(**record.value)
+        return hold if hold.expires_at > time.time() else None
+
+    def claim(self, hold_id: str) -> Optional[RoomHold]:
+        """
+        Remove and return a live hold; of two concurrent claims (on any workers)
+        only one succeeds. The rooms stay taken, now by the caller's booking.
+        """
+        record = self.state.get(HOLDS, hold_id)
+        if record is None:
+            return None
+        hold = RoomHold(**record.value)
+        if hold.expires_at <= time.time() or not self.state.delete(HOLDS, hold_id, record.version):
+            return None
+        return hold
+
+    def release(self, hold_id: str) -> bool:
+        """Drop a live hold and give its rooms back"""
+        hold = self.claim(hold_id)
+        if hold is None:
+            return False
+        self._give_back(hold)
+        return True
+
+    def expire(self, now: Optional[float] = None) -> List[RoomHold]:
+        """Release every hold this worker placed whose TTL has lapsed"""
+        now = time.time() if now is None else now
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                due.append(heapq.heappop(self._heap)[2])
+        return self._expire_holds(due)
+
+    def expire_orphans(self, now: Optional[float] = None) -> List[RoomHold]:
+        """Release lapsed holds placed by any worker (O(holds); run occasionally)"""
+        now = time.time() if now is None else now
+        self._last_orphan_scan = now
+        lapsed = [RoomHold(**value) for _, value in self.state.items(HOLDS) if value["expires_at"] <= now]
+        return self._expire_holds(lapsed)
+
+    def _expire_holds(self, holds: List[RoomHold]) -> List[RoomHold]:
+        expired = []
+        for hold in holds:
+            record = self.state.get(HOLDS, hold.hold_id)
+            if record is None or record.value["expires_at"] != hold.expires_at:
+                continue  # claimed (possibly on another worker) or re-placed
+            # Whichever sweeper deletes the record gives the rooms back
+            if self.state.delete(HOLDS, hold.hold_id, record.version):
+                self._give_back(hold)
+                expired.append(hold)
+        self.expired_total += len(expired)
+        for hold in expired:
+            logger.info(f"Room hold expired: {hold.hold_id}, released {hold.number_of_rooms} {hold.room_type} room(s) at {hold.hotel_id}")
+        return expired
+
+    def _give_back(self, hold: RoomHold) -> None:
+        self.inventory.release(hold.hotel_id, hold.room_type, hold.check_in_date, hold.check_out_date, hold.number_of_rooms)
+
+    async def start(self) -> None:
+        """Start the background sweeper (call at startup)"""
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.get_running_loop().create_task(self._sweep())
+
+    async def stop(self) -> None:
+        if self._sweeper and not self._sweeper.done():
+            self._sweeper.cancel()
+        self._sweeper = None
+
+    async def _sweep(self) -> None:
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            try:
+                await asyncio.to_thread(self.expire)
+                if time.time() - self._last_orphan_scan >= self.orphan_scan_interval:
+                    await asyncio.to_thread(self.expire_orphans)
+            except Exception as e:
+                logger.error(f"Room hold sweep failed: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.time()
+        holds = [value for _, value in self.state.items(HOLDS) if value["expires_at"] > now]
+        with self._lock:
+            local = len(self._heap)
+        return {
+            "active_holds": len(holds),
+            "rooms_held": sum(value["number_of_rooms"] for value in holds),
+            "tracked_by_worker": local,
+            "expired_total": self.expired_total,
+            "next_expiry_in": round(min(value["expires_at"] for value in holds) - now, 1) if holds else None,
+        }
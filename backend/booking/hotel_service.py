@@ -4,16 +4,30 @@ Handles hotel search, hold management, booking creation, and cancellation.
 Integrates with Amadeus Hotel API and circuit breaker pattern.
 """
 
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Dict, List, Optional, Any
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, replace
 from enum import Enum
 import logging
+import time
+import uuid
 
-from circuit_breaker import CircuitBreaker
+from anyio import from_thread
+
+from backend.booking.circuit_breaker import CircuitBreaker
+from backend.booking.hold_store import HoldStore, RoomHold
+from backend.booking.room_inventory import RoomInventory
+from backend.utils.amadeus_auth import get_amadeus_token_manager
+from backend.utils.deadline import Deadline, current_deadline, use_deadline
+from backend.utils.http_client import get_http_client, using_stand_in
+from backend.utils.singleflight import get_singleflight, request_key
+from backend.utils.state_backend import get_state_backend
 
 logger = logging.getLogger(__name__)
 
+# State backend namespace
+RESERVATIONS = "hotel_reservations"
+
 
 class HotelBookingState(Enum):
     """Hotel booking state machine"""
@@ -84,8 +98,24 @@ class HotelBookingService:
         self.config = config
         self.amadeus_api_key = config.AMADEUS_API_KEY
         self.amadeus_api_secret = config.AMADEUS_API_SECRET
+        # Shared with every other Amadeus caller; refreshed in the background
+        self.token_manager = get_amadeus_token_manager(
+            self.amadeus_api_key,
+            self.amadeus_api_secret,
+            getattr(config, "AMADEUS_BASE_URL", None),
+        )
+        self.http = get_http_client()
         self.circuit_breaker = CircuitBreaker(failure_threshold=5, timeout=60)
-        self.held_rooms: Dict[str, Dict] = {}  # TTL-based room holds
+        self.singleflight = get_singleflight()
+        self.state = get_state_backend()
+        # Rooms per night per (hotel, room type); holds and bookings take from it
+        self.inventory = RoomInventory(self.state, horizon_days=getattr(config, "HOTEL_INVENTORY_HORIZON_DAYS", 730))
+        # TTL-based room holds; expired holds are swept and their rooms returned to inventory
+        self.holds = HoldStore(
+            sweep_interval=getattr(config, "HOTEL_HOLD_SWEEP_SECONDS", 5.0),
+            backend=self.state,
+            inventory=self.inventory,
+        )
         logger.info("HotelBookingService initialized")
     
     def search_hotels(
@@ -109,6 +139,52 @@ class HotelBookingService:
         Returns:
             List of HotelOffer objects
         """
+        key = request_key("booking_hotels", {
+            "city_code": city_code,
+            "check_in_date": check_in_date,
+            "check_out_date": check_out_date,
+            "adults": adults,
+            "children": children,
+            "max_results": max_results,
+        })
+        offers = self.singleflight.do_sync(key, lambda: self._search_hotels(city_code, check_in_date, check_out_date, adults, children, max_results))
+        return self._apply_inventory(offers)
+    
+    def _apply_inventory(self, offers: List[HotelOffer]) -> List[HotelOffer]:
+        """Seed inventory from a search snapshot and report what is left after our holds and bookings"""
+        try:
+            self.inventory.observe(offers)
+        except ValueError as e:
+            logger.warning(f"Hotel inventory not seeded: {str(e)}")
+        stays: Dict[tuple, List[int]] = {}
+        for i, offer in enumerate(offers):
+            stays.setdefault((offer.check_in_date, offer.check_out_date), []).append(i)
+        free: Dict[int, Optional[int]] = {}
+        for (check_in_date, check_out_date), indices in stays.items():
+            try:
+                counts = self.inventory.available([(offers[i].hotel_id, offers[i].room_type) for i in indices], check_in_date, check_out_date)
+            except ValueError:
+                continue  # unparseable dates: keep the supplier's figure
+            free.update(zip(indices, counts))
+        # Offers are shared between callers (single-flight, cache), so adjust copies
+        available = []
+        for i, offer in enumerate(offers):
+            rooms = free.get(i)
+            if rooms is None:
+                available.append(offer)
+            elif rooms > 0:
+                available.append(replace(offer, available_rooms=rooms) if rooms != offer.available_rooms else offer)
+        return available
+    
+    def _search_hotels(
+        self,
+        city_code: str,
+        check_in_date: str,
+        check_out_date: str,
+        adults: int,
+        children: int = 0,
+        max_results: int = 10
+    ) -> List[HotelOffer]:
         try:
             if not self.circuit_breaker.is_available():
                 logger.warning(f"Circuit breaker OPEN for hotel search in {city_code}")
@@ -116,15 +192,26 @@ class HotelBookingService:
             
             logger.info(f"Searching hotels in {city_code} for {check_in_date} to {check_out_date}")
             
-            # Simulate Amadeus Hotel Search API call
-            # In production: call real Amadeus API: /v2/shopping/hotel-offers
-            offers = self._mock_amadeus_hotel_search(
-                city_code, check_in_date, check_out_date, adults, children
-            )
+            if self.live:
+                # Search runs in a worker thread; hop onto the event loop for the pooled client.
+                # The hop does not carry context variables, so the deadline goes along explicitly
+                raw = from_thread.run(
+                    self._fetch_hotel_offers, city_code, check_in_date, check_out_date, adults, children, max_results,
+                    current_deadline()
+                )
+                offers = [offer for item in raw for offer in self._parse_hotel_offers(item)]
+            else:
+                offers = self._mock_amadeus_hotel_search(
+                    city_code, check_in_date, check_out_date, adults, children
+                )
             
             self.circuit_breaker.record_success()
             return offers[:max_results]
             
+        except ValueError as e:
+            # Bad input or a conflict on the caller's side, not a service fault: leave the breaker alone
+            logger.warning(f"Hotel search rejected: {str(e)}")
+            raise
         except Exception as e:
             self.circuit_breaker.record_failure()
             logger.error(f"Hotel search failed: {str(e)}")
@@ -155,20 +242,22 @@ class HotelBookingService:
             if not self.circuit_breaker.is_available():
                 logger.warning(f"Circuit breaker OPEN for room hold {hotel_id}")
                 raise Exception("Hotel service unavailable")
+            if not isinstance(ttl_minutes, (int, float)) or ttl_minutes <= 0:
+                raise ValueError("ttl_minutes must be a positive number")
             
-            hold_id = f"HOLD_{hotel_id}_{int(datetime.now().timestamp())}"
-            expiration = datetime.now() + timedelta(minutes=ttl_minutes)
-            
-            self.held_rooms[hold_id] = {
-                "hotel_id": hotel_id,
-                "room_type": room_type,
-                "check_in_date": check_in_date,
-                "check_out_date": check_out_date,
-                "number_of_rooms": number_of_rooms,
-                "expiration": expiration.isoformat()
-            }
+            hold = RoomHold(
+                hold_id=f"HOLD_{hotel_id}_{int(datetime.now().timestamp())}_{uuid.uuid4().hex[:6]}",
+                hotel_id=hotel_id,
+                room_type=room_type,
+                check_in_date=check_in_date,
+                check_out_date=check_out_date,
+                number_of_rooms=number_of_rooms,
+                expires_at=time.time() + ttl_minutes * 60,
+            )
+            self.holds.add(hold)
+            hold_id, expiration = hold.hold_id, hold.expiration
             
-            logger.info(f"Room hold created: {hold_id}, expires at {expiration.isoformat()}")
+            logger.info(f"Room hold created: {hold_id}, expires at {expiration}")
             self.circuit_breaker.record_success()
             
             return {
@@ -176,10 +265,13 @@ class HotelBookingService:
                 "hotel_id": hotel_id,
                 "room_type": room_type,
                 "number_of_rooms": number_of_rooms,
-                "expiration_time": expiration.isoformat(),
+                "expiration_time": expiration,
                 "status": "HELD"
             }
             
+        except ValueError as e:
+            logger.warning(f"Room hold rejected: {str(e)}")
+            raise
         except Exception as e:
             self.circuit_breaker.record_failure()
             logger.error(f"Room hold failed: {str(e)}")
@@ -211,51 +303,71 @@ class HotelBookingService:
                 logger.warning(f"Circuit breaker OPEN for booking creation")
                 raise Exception("Hotel service unavailable")
             
-            if hold_id not in self.held_rooms:
+            # Claimed atomically, so one hold can back at most one booking
+            hold = self.holds.claim(hold_id)
+            if hold is None:
                 raise ValueError(f"Hold ID {hold_id} not found or expired")
             
-            hold = self.held_rooms[hold_id]
-            
             # In production: POST to /v1/booking/hotel-bookings
-            reservation_id = f"RES_{hold['hotel_id']}_{int(datetime.now().timestamp())}"
+            reservation_id = f"RES_{hold.hotel_id}_{int(datetime.now().timestamp())}_{uuid.uuid4().hex[:6]}"
             confirmation_code = f"HOT{int(datetime.now().timestamp()) % 1000000:06d}"
             
-            booking = HotelBooking(
-                reservation_id=reservation_id,
-                hotel_id=hold["hotel_id"],
-                hotel_name=f"Luxury Hotel {hold['hotel_id'][-3:].upper()}",
-                guest_name=guest_name,
-                email=email,
-                phone=phone,
-                check_in_date=hold["check_in_date"],
-                check_out_date=hold["check_out_date"],
-                room_type=hold["room_type"],
-                number_of_rooms=hold["number_of_rooms"],
-                number_of_guests=number_of_guests,
-                price_per_night=250.00,
-                total_price=250.00 * ((datetime.fromisoformat(hold["check_out_date"]) - 
-                                      datetime.fromisoformat(hold["check_in_date"])).days),
-                currency="USD",
-                status=HotelBookingState.BOOKING_CONFIRMED.value,
-                confirmation_code=confirmation_code,
-                check_in_instructions="Check-in available from 2:00 PM. Please present photo ID and booking confirmation.",
-                hotel_contact="+1-555-HOTEL-01",
-                created_at=datetime.now().isoformat()
-            )
+            try:
+                booking = self._confirm_hold(hold, reservation_id, confirmation_code, guest_name, email, phone, number_of_guests)
+            except Exception:
+                # Give the rooms back to the guest's hold so the booking can be retried
+                self.holds.restore(hold)
+                raise
             
-            # Clean up hold
-            del self.held_rooms[hold_id]
+            # The rooms stay taken by the reservation until it is cancelled
+            self.state.create(RESERVATIONS, reservation_id, asdict(hold))
             
             logger.info(f"Hotel booking confirmed: {reservation_id}, confirmation: {confirmation_code}")
             self.circuit_breaker.record_success()
             
             return booking
             
+        except ValueError as e:
+            logger.warning(f"Booking creation rejected: {str(e)}")
+            raise
         except Exception as e:
             self.circuit_breaker.record_failure()
             logger.error(f"Booking creation failed: {str(e)}")
             raise
     
+    def _confirm_hold(
+        self,
+        hold: RoomHold,
+        reservation_id: str,
+        confirmation_code: str,
+        guest_name: str,
+        email: str,
+        phone: str,
+        number_of_guests: int
+    ) -> HotelBooking:
+        return HotelBooking(
+            reservation_id=reservation_id,
+            hotel_id=hold.hotel_id,
+            hotel_name=f"Luxury Hotel {hold.hotel_id[-3:].upper()}",
+            guest_name=guest_name,
+            email=email,
+            phone=phone,
+            check_in_date=hold.check_in_date,
+            check_out_date=hold.check_out_date,
+            room_type=hold.room_type,
+            number_of_rooms=hold.number_of_rooms,
+            number_of_guests=number_of_guests,
+            price_per_night=250.00,
+            total_price=250.00 * ((datetime.fromisoformat(hold.check_out_date) - 
+                                  datetime.fromisoformat(hold.check_in_date)).days),
+            currency="USD",
+            status=HotelBookingState.BOOKING_CONFIRMED.value,
+            confirmation_code=confirmation_code,
+            check_in_instructions="Check-in available from 2:00 PM. Please present photo ID and booking confirmation.",
+            hotel_contact="+1-555-HOTEL-01",
+            created_at=datetime.now().isoformat()
+        )
+    
     def cancel_reservation(
         self,
         reservation_id: str,
@@ -274,6 +386,19 @@ class HotelBookingService:
                 logger.warning(f"Circuit breaker OPEN for cancellation {reservation_id}")
                 raise Exception("Hotel service unavailable")
             
+            # Deleted atomically, so a reservation is refunded (and its rooms released) once
+            record = self.state.get(RESERVATIONS, reservation_id)
+            if record is None or not self.state.delete(RESERVATIONS, reservation_id, record.version):
+                raise ValueError(f"Reservation {reservation_id} not found")
+            reservation = record.value
+            self.inventory.release(
+                reservation["hotel_id"],
+                reservation["room_type"],
+                reservation["check_in_date"],
+                reservation["check_out_date"],
+                reservation["number_of_rooms"],
+            )
+            
             # In production: DELETE /v1/booking/hotel-bookings/{reservationId}
             refund_amount = 250.00 * 2  # Mock calculation
             
@@ -290,11 +415,80 @@ class HotelBookingService:
                 "reason": reason or "Guest requested"
             }
             
+        except ValueError as e:
+            logger.warning(f"Cancellation rejected: {str(e)}")
+            raise
         except Exception as e:
             self.circuit_breaker.record_failure()
             logger.error(f"Cancellation failed: {str(e)}")
             raise
     
+    @property
+    def live(self) -> bool:
+        return bool(self.amadeus_api_key) or using_stand_in()
+
+    async def _fetch_hotel_offers(
+        self,
+        city_code: str,
+        check_in_date: str,
+        check_out_date: str,
+        adults: int,
+        children: int,
+        max_results: int,
+        deadline: Optional[Deadline] = None
+    ) -> List[Dict[str, Any]]:
+        """Call the Amadeus Hotel Search API (v3 hotel-offers) within the caller's deadline"""
+        params = {
+            "cityCode": city_code,
+            "checkInDate": check_in_date,
+            "checkOutDate": check_out_date,
+            "adults": adults + children,
+            "max": max_results,
+        }
+        with use_deadline(deadline):
+            response = await self.http.request(
+                "GET",
+                f"{self.config.AMADEUS_BASE_URL}/v3/shopping/hotel-offers",
+                provider="amadeus",
+                params=params,
+                headers=await self.token_manager.auth_headers(),
+            )
+        return response.json().get("data", [])
+
+    def _parse_hotel_offers(self, item: Dict[str, Any]) -> List[HotelOffer]:
+        """Map one Amadeus hotel-offers entry onto HotelOffer records"""
+        hotel = item.get("hotel", {})
+        offers = []
+        for offer in item.get("offers", []):
+            check_in = offer.get("checkInDate") or ""
+            check_out = offer.get("checkOutDate") or ""
+            try:
+                nights = max(1, (datetime.fromisoformat(check_out) - datetime.fromisoformat(check_in)).days)
+            except ValueError:
+                nights = 1
+            total = float(offer.get("price", {}).get("total", 0))
+            cancellations = offer.get("policies", {}).get("cancellations") or [{}]
+            offers.append(HotelOffer(
+                hotel_id=hotel.get("hotelId", ""),
+                hotel_name=hotel.get("name", ""),
+                city=hotel.get("cityCode", ""),
+                country=hotel.get("countryCode", ""),
+                rating=float(hotel.get("rating", 0)),
+                address=", ".join(hotel.get("address", {}).get("lines", [])),
+                latitude=float(hotel.get("latitude", 0)),
+                longitude=float(hotel.get("longitude", 0)),
+                check_in_date=check_in,
+                check_out_date=check_out,
+                room_type=offer.get("room", {}).get("typeEstimated", {}).get("category", "DOUBLE"),
+                price_per_night=round(total / nights, 2),
+                currency=offer.get("price", {}).get("currency", "USD"),
+                total_price=total,
+                available_rooms=int(offer.get("roomQuantity", 1)),
+                amenities=hotel.get("amenities", []),
+                cancellation_policy=cancellations[0].get("type", "NON_REFUNDABLE"),
+            ))
+        return offers
+
     def _mock_amadeus_hotel_search(
         self,
         city_code: str,
@@ -0,0 +1,88 @@
+"""
+Per-property booking calendar.
+A property's bookings never overlap, so kept sorted by check-in their
+check-outs are sorted too: the only booking that can overlap a requested
+stay is the last one starting before the stay ends, found by bisection in
+O(log n). Calendars round-trip through the shared state backend as plain
+records, so a check-and-reserve runs inside one compare-and-set and two
+workers can never book the same nights. Records keep the columns in sorted
+order, so loading one is a copy rather than a sort.
+"""
+
+from bisect import bisect_left, bisect_right, insort
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class DatesUnavailable(ValueError):
+    """The requested nights overlap an existing booking"""
+
+
+def _day(value: str) -> int:
+    if not isinstance(value, str):
+        raise ValueError(f"Expected an ISO date, got {value!r}")
+    return date.fromisoformat(value[:10]).toordinal()
+
+
+def stay_days(check_in_date: str, check_out_date: str) -> Tuple[int, int]:
+    """Half-open [check-in, check-out) day range of a stay"""
+    start, end = _day(check_in_date), _day(check_out_date)
+    if end <= start:
+        raise ValueError(f"Check-out {check_out_date} must be after check-in {check_in_date}")
+    return start, end
+
+
+class IntervalIndex:
+    """Sorted, non-overlapping [start, end) day intervals keyed by booking id"""
+
+    def __init__(self, intervals: Optional[List[Tuple[int, int, str]]] = None):
+        intervals = sorted(intervals or [])
+        self.starts = [start for start, _, _ in intervals]
+        self.ends = [end for _, end, _ in intervals]
+        self.booking_ids = [booking_id for _, _, booking_id in intervals]
+
+    @classmethod
+    def _sorted(cls, starts: List[int], ends: List[int], booking_ids: List[str]) -> "IntervalIndex":
+        """Adopt columns that are already sorted by start (no re-sort)"""
+        index = cls()
+        index.starts, index.ends, index.booking_ids = starts, ends, booking_ids
+        return index
+
+    def conflict(self, start: int, end: int) -> Optional[str]:
+        """Booking id overlapping [start, end), if any"""
+        i = bisect_left(self.starts, end)
+        if i and self.ends[i - 1] > start:
+            return self.booking_ids[i - 1]
+        return None
+
+    def reserve(self, start: int, end: int, booking_id: str) -> None:
+        """Insert a booking, or raise DatesUnavailable if the nights are taken"""
+        taken_by = self.conflict(start, end)
+        if taken_by is not None:
+            raise DatesUnavailable(f"Dates overlap booking {taken_by}")
+        i = bisect_right(self.starts, start)
+        insort(self.starts, start)
+        self.ends.insert(i, end)
+        self.booking_ids.insert(i, booking_id)
+
+    def release(self, booking_id: str) -> bool:
+        try:
+            i = self.booking_ids.index(booking_id)
+        except ValueError:
+            return False
+        del self.starts[i], self.ends[i], self.booking_ids[i]
+        return True
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def to_record(self) -> Dict[str, Any]:
+        return {"starts": list(self.starts), "ends": list(self.ends), "booking_ids": list(self.booking_ids)}
+
+    @classmethod
+    def from_record(cls, record: Optional[Dict[str, Any]]) -> "IntervalIndex":
+        record = record or {}
+        if "starts" in record:
+            return cls._sorted(list(record["starts"]), list(record["ends"]), list(record["booking_ids"]))
+        # Calendars written before the columnar layout are sorted once, on load
+        return cls([tuple(interval) for interval in record.get("intervals", [])])
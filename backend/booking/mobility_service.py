@@ -1,17 +1,39 @@
 import logging
 from typing import Dict, List
 
+from backend.utils.http_client import get_http_client, using_stand_in
+from backend.utils.singleflight import get_singleflight, request_key
+
 class MobilityService:
     """Mobility service for buses and local transport (Treepz/Travu integration)"""
     
     def __init__(self, treepz_config: Dict):
         self.treepz_config = treepz_config
+        self.http = get_http_client()
+        self.singleflight = get_singleflight()
         self.logger = logging.getLogger(__name__)
 
+    @property
+    def live(self) -> bool:
+        return bool(getattr(self.treepz_config, "TREEPZ_API_KEY", None)) or using_stand_in()
+
     async def search_buses(self, params: Dict) -> Dict:
-        """Search available bus routes and seats"""
+        """Search available bus routes and seats (concurrent identical searches share one upstream call)"""
+        key = request_key("booking_buses", params)
+        return await self.singleflight.do(key, lambda: self._search_buses(params))
+
+    async def _search_buses(self, params: Dict) -> Dict:
         try:
             self.logger.info(f"Bus search: {params['origin']} -> {params['destination']}")
+            if self.live:
+                response = await self.http.request(
+                    "GET",
+                    f"{self.treepz_config.TREEPZ_BASE_URL}/v1/bus-search",
+                    provider="treepz",
+                    params=params,
+                    headers={"Authorization": f"Bearer {self.treepz_config.TREEPZ_API_KEY}"},
+                )
+                return {"data": response.json().get("data", [])}
             return {
                 "data": [
                     {
@@ -0,0 +1,192 @@
+"""
+Hotel room inventory.
+Each (hotel, room type) is one record in the shared state backend holding
+two int16 arrays indexed by night: the rooms the supplier reported
+(seeded from the first search snapshot that covers a night, -1 until then)
+and the rooms taken by our holds and bookings. Records are independent
+and small (a few hundred bytes per year of nights), so tens of thousands of
+hotels cost nothing until searched, and writes to different hotels never
+contend. A hold takes rooms on every night of the stay in one
+compare-and-set: either all nights have the rooms or nothing changes.
+Availability for a whole page of search results is one bulk read and one
+vectorized min over the stay's nights.
+"""
+
+import base64
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backend.booking.interval_index import stay_days
+from backend.utils.state_backend import StateBackend, get_state_backend
+
+INVENTORY = "hotel_inventory"
+UNKNOWN = -1  # no snapshot has reported this night yet
+
+
+class InsufficientInventory(ValueError):
+    """Some night of the stay has fewer free rooms than requested"""
+
+
+def _encode(array: np.ndarray) -> str:
+    return base64.b64encode(array.astype("<i2").tobytes()).decode()
+
+
+def _decode(data: str) -> np.ndarray:
+    return np.frombuffer(base64.b64decode(data), dtype="<i2").astype(np.int32)
+
+
+class _Row:
+    """Decoded record: per-night capacity and taken counts from `base`"""
+
+    def __init__(self, record: Optional[Dict[str, Any]] = None):
+        if record:
+            self.base = record["base"]
+            self.capacity = _decode(record["capacity"])
+            self.taken = _decode(record["taken"])
+        else:
+            self.base = 0
+            self.capacity = np.empty(0, dtype=np.int32)
+            self.taken = np.empty(0, dtype=np.int32)
+
+    def cover(self, start: int, end: int, today: int, horizon: int) -> Tuple[int, int]:
+        """Grow (and trim past nights from) the arrays so [start, end) is addressable"""
+        if end <= today:
+            raise ValueError(f"Check-out {date.fromordinal(end).isoformat()} must be after today")
+        if end - today > horizon:
+            raise ValueError(f"Stay ends more than {horizon} nights ahead")
+        if not len(self.capacity):
+            self.base = start
+        first = max(min(self.base, start), today)
+        last = max(self.base + len(self.capacity), end)
+        if first != self.base or last != self.base + len(self.capacity):
+            capacity = np.full(last - first, UNKNOWN, dtype=np.int32)
+            taken = np.zeros(last - first, dtype=np.int32)
+            # Copy the part of the old window that survives the trim
+            lo, hi = max(first, self.base), min(last, self.base + len(self.capacity))
+            if hi > lo:
+                capacity[lo - first:hi - first] = self.capacity[lo - self.base:hi - self.base]
+                taken[lo - first:hi - first] = self.taken[lo - self.base:hi - self.base]
+            self.base, self.capacity, self.taken = first, capacity, taken
+        return max(start, self.base) - self.base, end - self.base
+
+    def window(self, start: int, end: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Capacity and taken over [start, end), padded as unknown / free outside the arrays"""
+        capacity = np.full(end - start, UNKNOWN, dtype=np.int32)
+        taken = np.zeros(end - start, dtype=np.int32)
+        lo, hi = max(start, self.base), min(end, self.base + len(self.capacity))
+        if hi > lo:
+            capacity[lo - start:hi - start] = self.capacity[lo - self.base:hi - self.base]
+            taken[lo - start:hi - start] = self.taken[lo - self.base:hi - self.base]
+        return capacity, taken
+
+    def to_record(self) -> Optional[Dict[str, Any]]:
+        if not len(self.capacity):
+            return None
+        return {"base": self.base, "capacity": _encode(self.capacity), "taken": _encode(self.taken)}
+
+
+class RoomInventory:
+    """Per-night room counts per (hotel, room type) with all-or-nothing multi-night holds"""
+
+    def __init__(self, backend: Optional[StateBackend] = None, horizon_days: int = 730):
+        """
+        Initialize RoomInventory
+        Args:
+            backend: Shared state backend (defaults to get_state_backend())
+            horizon_days: How far ahead nights are tracked
+        """
+        self.state = backend or get_state_backend()
+        self.horizon_days = horizon_days
+
+    @staticmethod
+    def _key(hotel_id: str, room_type: str) -> str:
+        return f"{hotel_id}|{room_type}"
+
+    def _update(self, hotel_id: str, room_type: str, start: int, end: int, change) -> None:
+        today = date.today().toordinal()
+
+        def apply(record: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+            row = _Row(record)
+            lo, hi = row.cover(start, end, today, self.horizon_days)
+            change(row, lo, hi)
+            return row.to_record()
+
+        self.state.update(INVENTORY, self._key(hotel_id, room_type), apply)
+
+    def observe(self, offers: Sequence[Any]) -> None:
+        """Seed capacity for nights no snapshot has reported yet from search results"""
+        today = date.today().toordinal()
+        stays = []
+        for offer in offers:
+            try:
+                start, end = stay_days(offer.check_in_date, offer.check_out_date)
+            except ValueError:
+                continue  # malformed snapshot; nothing to seed
+            if start >= today and end - today <= self.horizon_days:
+                stays.append((offer, start, end))
+        records = self.state.get_many(INVENTORY, [self._key(offer.hotel_id, offer.room_type) for offer, _, _ in stays])
+        for offer, start, end in stays:
+            record = records.get(self._key(offer.hotel_id, offer.room_type))
+            capacity, _ = _Row(record.value if record else None).window(start, end)
+            if not (capacity == UNKNOWN).any():
+                continue  # already seeded; later snapshots never overwrite our own counts
+
+            def seed(row: _Row, lo: int, hi: int, rooms: int = offer.available_rooms) -> None:
+                nights = row.capacity[lo:hi]
+                nights[nights == UNKNOWN] = rooms
+
+            self._update(offer.hotel_id, offer.room_type, start, end, seed)
+
+    def available(self, hotel_room_types: Sequence[Tuple[str, str]], check_in_date: str, check_out_date: str) -> List[Optional[int]]:
+        """
+        Free rooms on the tightest night of a stay, for many (hotel, room type) pairs at once
+        Returns:
+            One count per pair; None where no night of the stay is tracked
+        """
+        if not hotel_room_types:
+            return []
+        start, end = stay_days(check_in_date, check_out_date)
+        records = self.state.get_many(INVENTORY, [self._key(*pair) for pair in hotel_room_types])
+        capacity = np.empty((len(hotel_room_types), end - start), dtype=np.int32)
+        taken = np.empty_like(capacity)
+        for i, pair in enumerate(hotel_room_types):
+            record = records.get(self._key(*pair))
+            capacity[i], taken[i] = _Row(record.value if record else None).window(start, end)
+        known = capacity != UNKNOWN
+        free = np.where(known, capacity - taken, np.iinfo(np.int32).max).min(axis=1)
+        tracked = known.any(axis=1)
+        return [int(max(0, f)) if t else None for f, t in zip(free.tolist(), tracked.tolist())]
+
+    def reserve(self, hotel_id: str, room_type: str, check_in_date: str, check_out_date: str, rooms: int) -> None:
+        """
+        Take rooms on every night of a stay, all or nothing
+        Raises:
+            InsufficientInventory: A tracked night has fewer than `rooms` free
+        """
+        if not isinstance(rooms, int) or rooms < 1:
+            raise ValueError("number_of_rooms must be at least 1")
+        start, end = stay_days(check_in_date, check_out_date)
+
+        def take(row: _Row, lo: int, hi: int) -> None:
+            capacity, taken = row.capacity[lo:hi], row.taken[lo:hi]
+            # Nights no snapshot has reported are not limited; the supplier confirms those
+            short = (capacity != UNKNOWN) & (capacity - taken < rooms)
+            if short.any():
+                night = date.fromordinal(row.base + lo + int(np.argmax(short))).isoformat()
+                raise InsufficientInventory(f"Only {int((capacity - taken)[short].min())} {room_type} room(s) left at {hotel_id} on {night}")
+            taken += rooms
+
+        self._update(hotel_id, room_type, start, end, take)
+
+    def release(self, hotel_id: str, room_type: str, check_in_date: str, check_out_date: str, rooms: int) -> None:
+        """Give back rooms taken by reserve() (expired or released hold, cancelled booking)"""
+        start, end = stay_days(check_in_date, check_out_date)
+        if end <= date.today().toordinal():
+            return  # the stay is over; its nights have been trimmed
+
+        def give_back(row: _Row, lo: int, hi: int) -> None:
+            np.maximum(row.taken[lo:hi] - rooms, 0, out=row.taken[lo:hi])
+
+        self._update(hotel_id, room_type, start, end, give_back)
@@ -1,15 +1,23 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
+from starlette.concurrency import run_in_threadpool
+from backend.booking.capacity_ledger import CapacityExceeded
 from backend.booking.flight_service import FlightBookingService
 from backend.booking.car_service import CarRentalService
 from backend.booking.mobility_service import MobilityService
 from backend.booking.hotel_service import HotelBookingService
+from backend.booking.interval_index import DatesUnavailable
+from backend.booking.room_inventory import InsufficientInventory
 from backend.booking.shortlet_service import ShortletService
 from backend.booking.visa_service import VisaService
 from backend.booking.tours_service import ToursService
 from backend.config import Config
+from backend.utils.deadline import with_deadline
 
 router = APIRouter()
 
+# Rejections that clash with existing holds or bookings; any other ValueError is bad input
+CONFLICTS = (InsufficientInventory, DatesUnavailable, CapacityExceeded)
+
 # Initialize services with test credentials
 flight_service = FlightBookingService(Config)
 car_service = CarRentalService(Config)
@@ -19,7 +27,17 @@ shortlet_service = ShortletService(Config)
 visa_service = VisaService(Config)
 tours_service = ToursService(Config)
 
+async def _run_booking_call(func, **kwargs):
+    """Run a blocking booking call in the threadpool; conflicts map to 409, rejected input to 400"""
+    try:
+        return await run_in_threadpool(func, **kwargs)
+    except CONFLICTS as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.post("/flights/search")
+@with_deadline(Config.BOOKING_SEARCH_DEADLINE)
 async def search_flights(payload: dict):
     return await flight_service.search_flights(payload)
 
@@ -32,6 +50,7 @@ async def issue_ticket(payload: dict):
     return await flight_service.issue_ticket(payload.get("orderId"))
 
 @router.post("/cars/search")
+@with_deadline(Config.BOOKING_SEARCH_DEADLINE)
 async def search_cars(payload: dict):
     return await car_service.search_cars(payload)
 
@@ -44,6 +63,7 @@ async def book_car(payload: dict):
     return await car_service.create_booking(payload.get("rentalId"), payload.get("driverInfo", {}))
 
 @router.post("/mobility/buses/search")
+@with_deadline(Config.BOOKING_SEARCH_DEADLINE)
 async def search_buses(payload: dict):
     return await mobility_service.search_buses(payload)
 
@@ -57,8 +77,11 @@ async def book_journey(payload: dict):
 
 # Hotel endpoints
 @router.post("/hotels/search")
+@with_deadline(Config.BOOKING_SEARCH_DEADLINE)
 async def search_hotels(payload: dict):
-    return hotel_service.search_hotels(
+    # Blocking search runs in the threadpool so identical concurrent searches can coalesce
+    return await _run_booking_call(
+        hotel_service.search_hotels,
         city_code=payload.get("cityCode"),
         check_in_date=payload.get("checkInDate"),
         check_out_date=payload.get("checkOutDate"),
@@ -67,9 +90,13 @@ async def search_hotels(payload: dict):
         max_results=payload.get("maxResults", 10)
     )
 
+# Holds, bookings, cancellations and the other stateful calls below make blocking
+# SQLite/Redis round trips (and may back off between CAS retries) on the shared
+# state backend, so they run in the threadpool like the searches
 @router.post("/hotels/hold")
 async def hold_room(payload: dict):
-    return hotel_service.hold_room(
+    return await _run_booking_call(
+        hotel_service.hold_room,
         hotel_id=payload.get("hotelId"),
         room_type=payload.get("roomType"),
         check_in_date=payload.get("checkInDate"),
@@ -80,7 +107,8 @@ async def hold_room(payload: dict):
 
 @router.post("/hotels/book")
 async def book_hotel(payload: dict):
-    return hotel_service.create_booking(
+    return await _run_booking_call(
+        hotel_service.create_booking,
         hold_id=payload.get("holdId"),
         guest_name=payload.get("guestName"),
         email=payload.get("email"),
@@ -91,7 +119,8 @@ async def book_hotel(payload: dict):
 
 @router.post("/hotels/cancel")
 async def cancel_hotel(payload: dict):
-    return hotel_service.cancel_reservation(
+    return await _run_booking_call(
+        hotel_service.cancel_reservation,
         reservation_id=payload.get("reservationId"),
         reason=payload.get("reason")
     )
@@ -99,7 +128,8 @@ async def cancel_hotel(payload: dict):
 # Shortlet endpoints
 @router.post("/shortlets/search")
 async def search_shortlets(payload: dict):
-    return shortlet_service.search_shortlets(
+    return await _run_booking_call(
+        shortlet_service.search_shortlets,
         city=payload.get("city"),
         check_in_date=payload.get("checkInDate"),
         check_out_date=payload.get("checkOutDate"),
@@ -112,13 +142,15 @@ async def search_shortlets(payload: dict):
 
 @router.post("/shortlets/verify")
 async def verify_property(payload: dict):
-    return shortlet_service.verify_property(
+    return await _run_booking_call(
+        shortlet_service.verify_property,
         property_id=payload.get("propertyId")
     )
 
 @router.post("/shortlets/instant-book")
 async def instant_book_shortlet(payload: dict):
-    return shortlet_service.instant_booking(
+    return await _run_booking_call(
+        shortlet_service.instant_booking,
         property_id=payload.get("propertyId"),
         guest_name=payload.get("guestName"),
         guest_email=payload.get("email"),
@@ -131,7 +163,8 @@ async def instant_book_shortlet(payload: dict):
 
 @router.post("/shortlets/availability")
 async def check_shortlet_availability(payload: dict):
-    return shortlet_service.check_availability(
+    return await _run_booking_call(
+        shortlet_service.check_availability,
         property_id=payload.get("propertyId"),
         check_in_date=payload.get("checkInDate"),
         check_out_date=payload.get("checkOutDate")
@@ -139,7 +172,8 @@ async def check_shortlet_availability(payload: dict):
 
 @router.post("/shortlets/cancel")
 async def cancel_shortlet(payload: dict):
-    return shortlet_service.instant_cancellation(
+    return await _run_booking_call(
+        shortlet_service.instant_cancellation,
         booking_id=payload.get("bookingId"),
         reason=payload.get("reason")
     )
@@ -153,16 +187,42 @@ async def check_visa_eligibility(payload: dict):
         passport_number=payload.get("passportNumber")
     )
 
+@router.post("/visas/eligibility/batch")
+async def check_visa_eligibility_batch(payload: dict):
+    """Eligibility for a group with mixed nationalities; each traveler may override the destination"""
+    return visa_service.batch_eligibility_check(
+        travelers=[
+            {
+                "citizen_country": t.get("citizenCountry"),
+                "destination_country": t.get("destinationCountry"),
+            }
+            for t in payload.get("travelers", [])
+        ],
+        destination_country=payload.get("destinationCountry")
+    )
+
+@router.get("/visas/matrix")
+async def visa_matrix_info():
+    return visa_service.matrix.stats()
+
+@router.post("/visas/matrix/reload")
+async def reload_visa_matrix():
+    """Reload this worker now; other workers pick the change up on their next poll"""
+    changed = await run_in_threadpool(visa_service.matrix.reload_if_changed)
+    return {"reloaded": changed, **visa_service.matrix.stats()}
+
 @router.post("/visas/verify-documents")
 async def verify_visa_documents(payload: dict):
-    return visa_service.document_verification(
+    return await _run_booking_call(
+        visa_service.document_verification,
         application_id=payload.get("applicationId"),
         documents=payload.get("documents", {})
     )
 
 @router.post("/visas/apply")
 async def apply_visa(payload: dict):
-    return visa_service.apply_visa(
+    return await _run_booking_call(
+        visa_service.apply_visa,
         applicant_name=payload.get("applicantName"),
         passport_number=payload.get("passportNumber"),
         citizen_country=payload.get("citizenCountry"),
@@ -174,7 +234,8 @@ async def apply_visa(payload: dict):
 
 @router.post("/visas/track-status")
 async def track_visa_status(payload: dict):
-    return visa_service.track_status(
+    return await _run_booking_call(
+        visa_service.track_status,
         application_id=payload.get("applicationId"),
         reference_number=payload.get("referenceNumber")
     )
@@ -182,7 +243,8 @@ async def track_visa_status(payload: dict):
 # Tours endpoints
 @router.post("/tours/search")
 async def search_tours(payload: dict):
-    return tours_service.search_tours(
+    return await _run_booking_call(
+        tours_service.search_tours,
         destination=payload.get("destination"),
         category=payload.get("category"),
         min_price=payload.get("minPrice", 0),
@@ -194,15 +256,25 @@ async def search_tours(payload: dict):
 
 @router.post("/tours/availability")
 async def check_tour_availability(payload: dict):
-    return tours_service.check_availability(
+    return await _run_booking_call(
+        tours_service.check_availability,
         tour_id=payload.get("tourId"),
         tour_date=payload.get("tourDate"),
         participants=payload.get("participants", 1)
     )
 
+@router.post("/tours/availability/calendar")
+async def tour_availability_calendar(payload: dict):
+    return await _run_booking_call(
+        tours_service.availability_calendar,
+        tour_id=payload.get("tourId"),
+        month=payload.get("month")
+    )
+
 @router.post("/tours/book")
 async def book_tour(payload: dict):
-    return tours_service.book_tour(
+    return await _run_booking_call(
+        tours_service.book_tour,
         tour_id=payload.get("tourId"),
         customer_name=payload.get("customerName"),
         customer_email=payload.get("email"),
@@ -213,14 +285,16 @@ async def book_tour(payload: dict):
 
 @router.post("/tours/cancel")
 async def cancel_tour(payload: dict):
-    return tours_service.cancel_tour(
+    return await _run_booking_call(
+        tours_service.cancel_tour,
         booking_id=payload.get("bookingId"),
         reason=payload.get("reason")
     )
 
 @router.post("/tours/rate")
 async def rate_tour(payload: dict):
-    return tours_service.rate_tour(
+    return await _run_booking_call(
+        tours_service.rate_tour,
         booking_id=payload.get("bookingId"),
         rating=payload.get("rating"),
         review=payload.get("review")
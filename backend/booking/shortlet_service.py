@@ -9,11 +9,20 @@ from typing import Dict, List, Optional, Any
 from dataclasses import dataclass
 from enum import Enum
 import logging
+import uuid
 
-from circuit_breaker import CircuitBreaker
+from backend.booking.circuit_breaker import CircuitBreaker
+from backend.booking.interval_index import DatesUnavailable, IntervalIndex, stay_days
+from backend.utils.singleflight import get_singleflight, request_key
+from backend.utils.state_backend import get_state_backend
 
 logger = logging.getLogger(__name__)
 
+# State backend namespaces
+BOOKINGS = "shortlet_bookings"
+VERIFIED_PROPERTIES = "shortlet_verified_properties"
+CALENDARS = "shortlet_calendars"  # property_id -> IntervalIndex record
+
 
 class ShortletBookingState(Enum):
     """Shortlet booking state machine"""
@@ -92,8 +101,9 @@ class ShortletService:
         """
         self.config = config
         self.circuit_breaker = CircuitBreaker(failure_threshold=5, timeout=60)
-        self.verified_properties: Dict[str, bool] = {}
-        self.bookings: Dict[str, Dict] = {}
+        self.singleflight = get_singleflight()
+        # Verifications and bookings are shared by every worker
+        self.state = get_state_backend()
         logger.info("ShortletService initialized")
     
     def search_shortlets(
@@ -121,6 +131,29 @@ class ShortletService:
         Returns:
             List of ShortletProperty objects
         """
+        key = request_key("booking_shortlets", {
+            "city": city,
+            "check_in_date": check_in_date,
+            "check_out_date": check_out_date,
+            "guests": guests,
+            "property_type": property_type,
+            "min_price": min_price,
+            "max_price": max_price,
+            "max_results": max_results,
+        })
+        return self.singleflight.do_sync(key, lambda: self._search_shortlets(city, check_in_date, check_out_date, guests, property_type, min_price, max_price, max_results))
+    
+    def _search_shortlets(
+        self,
+        city: str,
+        check_in_date: str,
+        check_out_date: str,
+        guests: int,
+        property_type: Optional[str] = None,
+        min_price: float = 0,
+        max_price: float = 10000,
+        max_results: int = 15
+    ) -> List[ShortletProperty]:
         try:
             if not self.circuit_breaker.is_available():
                 logger.warning(f"Circuit breaker OPEN for shortlet search in {city}")
@@ -136,6 +169,10 @@ class ShortletService:
             self.circuit_breaker.record_success()
             return properties[:max_results]
             
+        except ValueError as e:
+            # Bad input or a conflict on the caller's side, not a service fault: leave the breaker alone
+            logger.warning(f"Shortlet search rejected: {str(e)}")
+            raise
         except Exception as e:
             self.circuit_breaker.record_failure()
             logger.error(f"Shortlet search failed: {str(e)}")
@@ -171,12 +208,15 @@ class ShortletService:
                 "risk_score": 0.05  # Low risk
             }
             
-            self.verified_properties[property_id] = True
+            self.state.update(VERIFIED_PROPERTIES, property_id, lambda _: True)
             logger.info(f"Property {property_id} verified successfully")
             self.circuit_breaker.record_success()
             
             return verification_data
             
+        except ValueError as e:
+            logger.warning(f"Property verification rejected: {str(e)}")
+            raise
         except Exception as e:
             self.circuit_breaker.record_failure()
             logger.error(f"Property verification failed: {str(e)}")
@@ -212,14 +252,25 @@ class ShortletService:
                 logger.warning(f"Circuit breaker OPEN for instant booking {property_id}")
                 raise Exception("Shortlet service unavailable")
             
-            if property_id not in self.verified_properties:
+            if self.state.get(VERIFIED_PROPERTIES, property_id) is None:
                 raise ValueError(f"Property {property_id} not verified")
             
-            booking_id = f"SLT_{property_id}_{int(datetime.now().timestamp())}"
+            booking_id = f"SLT_{property_id}_{int(datetime.now().timestamp())}_{uuid.uuid4().hex[:6]}"
             confirmation_code = f"SHT{int(datetime.now().timestamp()) % 1000000:06d}"
             
-            num_nights = (datetime.fromisoformat(check_out_date) - 
-                         datetime.fromisoformat(check_in_date)).days
+            start, end = stay_days(check_in_date, check_out_date)
+            num_nights = end - start
+            
+            # Check and reserve in one compare-and-set on the property's calendar
+            def reserve(record: Optional[Dict]) -> Dict:
+                calendar = IntervalIndex.from_record(record)
+                try:
+                    calendar.reserve(start, end, booking_id)
+                except DatesUnavailable:
+                    raise DatesUnavailable(f"Property {property_id} is not available from {check_in_date} to {check_out_date}")
+                return calendar.to_record()
+            
+            self.state.update(CALENDARS, property_id, reserve)
             
             booking = ShortletBooking(
                 booking_id=booking_id,
@@ -244,18 +295,21 @@ class ShortletService:
                 created_at=datetime.now().isoformat()
             )
             
-            self.bookings[booking_id] = {
+            self.state.create(BOOKINGS, booking_id, {
                 "guest": guest_name,
                 "property_id": property_id,
                 "dates": (check_in_date, check_out_date),
                 "status": ShortletBookingState.INSTANT_BOOKING_CONFIRMED.value
-            }
+            })
             
             logger.info(f"Instant booking confirmed: {booking_id}, confirmation: {confirmation_code}")
             self.circuit_breaker.record_success()
             
             return booking
             
+        except ValueError as e:
+            logger.warning(f"Instant booking rejected: {str(e)}")
+            raise
         except Exception as e:
             self.circuit_breaker.record_failure()
             logger.error(f"Instant booking failed: {str(e)}")
@@ -281,15 +335,10 @@ class ShortletService:
                 logger.warning(f"Circuit breaker OPEN for availability check {property_id}")
                 raise Exception("Shortlet service unavailable")
             
-            # Check against booking calendar
-            available = True
-            for booking_id, booking in self.bookings.items():
-                if booking["property_id"] == property_id:
-                    booked_in, booked_out = booking["dates"]
-                    # Check for overlap
-                    if not (check_out_date <= booked_in or check_in_date >= booked_out):
-                        available = False
-                        break
+            # Check against the property's booking calendar
+            record = self.state.get(CALENDARS, property_id)
+            calendar = IntervalIndex.from_record(record.value if record else None)
+            available = calendar.conflict(*stay_days(check_in_date, check_out_date)) is None
             
             logger.info(f"Property {property_id} availability: {available}")
             self.circuit_breaker.record_success()
@@ -302,6 +351,9 @@ class ShortletService:
                 "checked_at": datetime.now().isoformat()
             }
             
+        except ValueError as e:
+            logger.warning(f"Availability check rejected: {str(e)}")
+            raise
         except Exception as e:
             self.circuit_breaker.record_failure()
             logger.error(f"Availability check failed: {str(e)}")
@@ -325,15 +377,16 @@ class ShortletService:
                 logger.warning(f"Circuit breaker OPEN for cancellation {booking_id}")
                 raise Exception("Shortlet service unavailable")
             
-            if booking_id not in self.bookings:
+            # Deleted atomically, so a booking is refunded at most once across workers
+            record = self.state.get(BOOKINGS, booking_id)
+            if record is None or not self.state.delete(BOOKINGS, booking_id, record.version):
                 raise ValueError(f"Booking {booking_id} not found")
+            self.state.update(CALENDARS, record.value["property_id"], self._release_dates(booking_id))
             
             # Calculate refund based on cancellation policy
             refund_percentage = 100  # Instant booking allows full refund within 48 hours
             refund_amount = 150.00 * 3 * (refund_percentage / 100)
             
-            del self.bookings[booking_id]
-            
             logger.info(f"Booking {booking_id} cancelled. Refund: ${refund_amount:.2f}")
             self.circuit_breaker.record_success()
             
@@ -347,11 +400,22 @@ class ShortletService:
                 "reason": reason or "Guest requested"
             }
             
+        except ValueError as e:
+            logger.warning(f"Cancellation rejected: {str(e)}")
+            raise
         except Exception as e:
             self.circuit_breaker.record_failure()
             logger.error(f"Cancellation failed: {str(e)}")
             raise
     
+    @staticmethod
+    def _release_dates(booking_id: str):
+        def release(record: Optional[Dict]) -> Optional[Dict]:
+            calendar = IntervalIndex.from_record(record)
+            calendar.release(booking_id)
+            return calendar.to_record() if len(calendar) else None
+        return release
+    
     def _mock_shortlet_search(
         self,
         city: str,
@@ -9,11 +9,19 @@ from typing import Dict, List, Optional, Any
 from dataclasses import dataclass
 from enum import Enum
 import logging
+import uuid
 
-from circuit_breaker import CircuitBreaker
+from backend.booking.capacity_ledger import CapacityLedger
+from backend.booking.circuit_breaker import CircuitBreaker
+from backend.utils.singleflight import get_singleflight, request_key
+from backend.utils.state_backend import get_state_backend
 
 logger = logging.getLogger(__name__)
 
+# State backend namespaces
+BOOKINGS = "tour_bookings"
+RATINGS = "tour_ratings"
+
 
 class TourBookingState(Enum):
     """Tour booking state machine"""
@@ -86,8 +94,10 @@ class ToursService:
         self.config = config
         self.viator_api_key = getattr(config, 'VIATOR_API_KEY', 'VIATOR_SANDBOX_KEY')
         self.circuit_breaker = CircuitBreaker(failure_threshold=5, timeout=60)
-        self.bookings: Dict[str, Dict] = {}
-        self.ratings: Dict[str, List[Dict]] = {}
+        self.singleflight = get_singleflight()
+        # Bookings, ratings and per-departure capacity are shared by every worker
+        self.state = get_state_backend()
+        self.capacity = CapacityLedger(self.state)
         logger.info("ToursService initialized")
     
     def search_tours(
@@ -113,6 +123,27 @@ class ToursService:
         Returns:
             List of TourActivity objects
         """
+        key = request_key("booking_tours", {
+            "destination": destination,
+            "category": category,
+            "min_price": min_price,
+            "max_price": max_price,
+            "duration_min": duration_min,
+            "duration_max": duration_max,
+            "max_results": max_results,
+        })
+        return self.singleflight.do_sync(key, lambda: self._search_tours(destination, category, min_price, max_price, duration_min, duration_max, max_results))
+    
+    def _search_tours(
+        self,
+        destination: str,
+        category: Optional[str] = None,
+        min_price: float = 0,
+        max_price: float = 10000,
+        duration_min: int = 0,
+        duration_max: int = 24,
+        max_results: int = 20
+    ) -> List[TourActivity]:
         try:
             if not self.circuit_breaker.is_available():
                 logger.warning(f"Circuit breaker OPEN for tour search in {destination}")
@@ -126,6 +157,10 @@ class ToursService:
             self.circuit_breaker.record_success()
             return tours[:max_results]
             
+        except ValueError as e:
+            # Bad input or a conflict on the caller's side, not a service fault: leave the breaker alone
+            logger.warning(f"Tour search rejected: {str(e)}")
+            raise
         except Exception as e:
             self.circuit_breaker.record_failure()
             logger.error(f"Tour search failed: {str(e)}")
@@ -152,14 +187,10 @@ class ToursService:
                 raise Exception("Tours service unavailable")
             
             # In production: Check against real tour schedule
-            available = True
-            spots_available = 15
-            
-            # Check if tour date is booked out
-            for booking_id, booking in self.bookings.items():
-                if (booking["tour_id"] == tour_id and 
-                    booking["tour_date"] == tour_date):
-                    spots_available -= booking["number_of_participants"]
+            if not isinstance(participants, int) or participants < 1:
+                raise ValueError("participants must be at least 1")
+            capacity = self._get_tour_details(tour_id)["max_participants"]
+            spots_available = self.capacity.remaining(tour_id, tour_date, capacity)
             
             available = spots_available >= participants
             
@@ -174,6 +205,9 @@ class ToursService:
                 "checked_at": datetime.now().isoformat()
             }
             
+        except ValueError as e:
+            logger.warning(f"Availability check rejected: {str(e)}")
+            raise
         except Exception as e:
             self.circuit_breaker.record_failure()
             logger.error(f"Availability check failed: {str(e)}")
@@ -205,17 +239,15 @@ class ToursService:
                 logger.warning(f"Circuit breaker OPEN for tour booking {tour_id}")
                 raise Exception("Tours service unavailable")
             
-            # Check availability first
-            availability = self.check_availability(tour_id, tour_date, number_of_participants)
-            if not availability["available"]:
-                raise ValueError(f"Not enough spots available for {tour_id} on {tour_date}")
-            
-            booking_id = f"TOUR_{tour_id}_{int(datetime.now().timestamp())}"
-            confirmation_code = f"TUR{int(datetime.now().timestamp()) % 1000000:06d}"
-            
             # Mock tour details
             tour_details = self._get_tour_details(tour_id)
             
+            # Check and take the spots in one step; raises CapacityExceeded when the departure is full
+            self.capacity.reserve(tour_id, tour_date, number_of_participants, tour_details["max_participants"])
+            
+            booking_id = f"TOUR_{tour_id}_{int(datetime.now().timestamp())}_{uuid.uuid4().hex[:6]}"
+            confirmation_code = f"TUR{int(datetime.now().timestamp()) % 1000000:06d}"
+            
             booking = TourBooking(
                 booking_id=booking_id,
                 tour_id=tour_id,
@@ -237,20 +269,25 @@ class ToursService:
                 created_at=datetime.now().isoformat()
             )
             
-            self.bookings[booking_id] = {
+            if not self.state.create(BOOKINGS, booking_id, {
                 "tour_id": tour_id,
                 "customer": customer_name,
                 "tour_date": tour_date,
                 "participants": number_of_participants,
                 "status": TourBookingState.BOOKING_CONFIRMED.value,
                 "booking_time": datetime.now().isoformat()
-            }
+            }):
+                self.capacity.release(tour_id, tour_date, number_of_participants)
+                raise ValueError(f"Booking {booking_id} already exists")
             
             logger.info(f"Tour booking confirmed: {booking_id}, confirmation: {confirmation_code}")
             self.circuit_breaker.record_success()
             
             return booking
             
+        except ValueError as e:
+            logger.warning(f"Tour booking rejected: {str(e)}")
+            raise
         except Exception as e:
             self.circuit_breaker.record_failure()
             logger.error(f"Tour booking failed: {str(e)}")
@@ -274,10 +311,11 @@ class ToursService:
                 logger.warning(f"Circuit breaker OPEN for tour cancellation {booking_id}")
                 raise Exception("Tours service unavailable")
             
-            if booking_id not in self.bookings:
+            record = self.state.get(BOOKINGS, booking_id)
+            if record is None:
                 raise ValueError(f"Booking {booking_id} not found")
             
-            booking = self.bookings[booking_id]
+            booking = record.value
             
             # Calculate refund based on days to tour
             tour_date = datetime.fromisoformat(booking["tour_date"])
@@ -295,7 +333,10 @@ class ToursService:
             tour_details = self._get_tour_details(booking["tour_id"])
             refund_amount = tour_details["price"] * booking["participants"] * (refund_percentage / 100)
             
-            del self.bookings[booking_id]
+            # Only the cancellation that removes this exact version is refunded
+            if not self.state.delete(BOOKINGS, booking_id, record.version):
+                raise ValueError(f"Booking {booking_id} not found")
+            self.capacity.release(booking["tour_id"], booking["tour_date"], booking["participants"])
             
             logger.info(f"Tour booking {booking_id} cancelled. Refund: ${refund_amount:.2f} ({refund_percentage}%)")
             self.circuit_breaker.record_success()
@@ -310,6 +351,9 @@ class ToursService:
                 "reason": reason or "Guest requested"
             }
             
+        except ValueError as e:
+            logger.warning(f"Tour cancellation rejected: {str(e)}")
+            raise
         except Exception as e:
             self.circuit_breaker.record_failure()
             logger.error(f"Tour cancellation failed: {str(e)}")
@@ -338,26 +382,25 @@ class ToursService:
             if rating < 1 or rating > 5:
                 raise ValueError("Rating must be between 1 and 5")
             
-            if booking_id not in self.bookings:
+            record = self.state.get(BOOKINGS, booking_id)
+            if record is None:
                 raise ValueError(f"Booking {booking_id} not found")
             
-            booking = self.bookings[booking_id]
+            booking = record.value
             tour_id = booking["tour_id"]
             
             # Store rating
-            if tour_id not in self.ratings:
-                self.ratings[tour_id] = []
-            
-            self.ratings[tour_id].append({
+            entry = {
                 "booking_id": booking_id,
                 "rating": rating,
                 "review": review,
                 "reviewer": booking["customer"],
                 "created_at": datetime.now().isoformat()
-            })
+            }
+            self.state.update(RATINGS, tour_id, lambda ratings: (ratings or []) + [entry])
             
-            # Update booking status
-            self.bookings[booking_id]["status"] = TourBookingState.TOUR_RATED.value
+            # Update booking status (unless it was cancelled meanwhile)
+            self.state.update(BOOKINGS, booking_id, lambda current: {**current, "status": TourBookingState.TOUR_RATED.value} if current else None)
             
             logger.info(f"Tour rating submitted: {booking_id}, rating: {rating}/5")
             self.circuit_breaker.record_success()
@@ -370,11 +413,57 @@ class ToursService:
                 "submitted_at": datetime.now().isoformat()
             }
             
+        except ValueError as e:
+            logger.warning(f"Tour rating rejected: {str(e)}")
+            raise
         except Exception as e:
             self.circuit_breaker.record_failure()
             logger.error(f"Tour rating failed: {str(e)}")
             raise
     
+    def availability_calendar(
+        self,
+        tour_id: str,
+        month: str
+    ) -> Dict[str, Any]:
+        """
+        Remaining capacity for every day of a month
+        Args:
+            tour_id: Tour ID
+            month: Month in YYYY-MM format
+        Returns:
+            Capacity and per-day booked / available spots
+        """
+        try:
+            if not self.circuit_breaker.is_available():
+                logger.warning(f"Circuit breaker OPEN for availability calendar {tour_id}")
+                raise Exception("Tours service unavailable")
+            
+            try:
+                year, month_number = (int(part) for part in month.split("-"))
+            except (AttributeError, ValueError):
+                raise ValueError(f"Month must be YYYY-MM, got {month!r}")
+            capacity = self._get_tour_details(tour_id)["max_participants"]
+            days = self.capacity.month(tour_id, year, month_number, capacity)
+            
+            self.circuit_breaker.record_success()
+            
+            return {
+                "tour_id": tour_id,
+                "month": f"{year:04d}-{month_number:02d}",
+                "capacity": capacity,
+                "days": days,
+                "checked_at": datetime.now().isoformat()
+            }
+            
+        except ValueError as e:
+            logger.warning(f"Availability calendar rejected: {str(e)}")
+            raise
+        except Exception as e:
+            self.circuit_breaker.record_failure()
+            logger.error(f"Availability calendar failed: {str(e)}")
+            raise
+    
     def _mock_viator_search(
         self,
         destination: str,
@@ -471,18 +560,21 @@ class ToursService:
             "VIATOR_001": {
                 "name": "City Highlights Walking Tour",
                 "price": 49.99,
+                "max_participants": 20,
                 "meeting_location": "Central Park, Main Gate",
                 "itinerary": "1. Start at Central Park (8:00 AM)\n2. Visit City Hall (8:45 AM)\n3. Tour Cathedral (9:30 AM)\n4. End at Market Square (11:00 AM)"
             },
             "VIATOR_002": {
                 "name": "Adventure Hiking & Nature Trail",
                 "price": 79.99,
+                "max_participants": 15,
                 "meeting_location": "Mountain Ridge Trail Head",
                 "itinerary": "1. Meet at trailhead (8:00 AM)\n2. Begin hiking (8:15 AM)\n3. Lunch break at scenic overlook (11:00 AM)\n4. Return to trailhead (1:00 PM)"
             },
             "VIATOR_003": {
                 "name": "Local Cuisine Food Tour",
                 "price": 89.99,
+                "max_participants": 10,
                 "meeting_location": "Downtown Food Market",
                 "itinerary": "1. Market tour (10:00 AM)\n2. First restaurant (11:00 AM)\n3. Second restaurant (12:30 PM)\n4. Third restaurant & dessert (2:00 PM)"
             }
@@ -491,6 +583,7 @@ class ToursService:
         return tours_db.get(tour_id, {
             "name": "Custom Tour",
             "price": 99.99,
+            "max_participants": 15,
             "meeting_location": "Tour operator office",
             "itinerary": "To be confirmed"
         })
@@ -0,0 +1,234 @@
+"""
+Precomputed visa requirement matrix.
+A versioned JSON source (citizen:destination pairs -> named rules) is compiled
+once into a dense citizen x destination uint16 array of rule indices. The
+array lives in a memory-mapped file, so every worker on the host shares one
+copy through the page cache, and lookups are a single array index. The source
+is watched and the matrix swapped in place when it changes.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backend.config import Config
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOURCE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "visa_requirements.json")
+DEFAULT_RULE_INDEX = 0
+# Compiled files are pruned only once this much older than the one just loaded,
+# so a worker that compiled a different version moments ago can still map it
+PRUNE_GRACE = 300.0
+
+
+@dataclass(frozen=True)
+class MatrixSnapshot:
+    """One compiled version of the requirements data"""
+    version: str
+    digest: str
+    countries: Tuple[str, ...]
+    index: Dict[str, int]
+    rules: Tuple[Dict[str, Any], ...]
+    rule_ids: Tuple[str, ...]
+    matrix: np.ndarray  # read-only memmap, uint16 rule index per (citizen, destination)
+
+    def rule_indices(self, citizens: Sequence[str], destinations: Sequence[str]) -> np.ndarray:
+        """Vectorized lookup; countries outside the matrix resolve to the default rule"""
+        unknown = len(self.countries)
+        rows = np.fromiter((self.index.get((c or "").upper(), unknown) for c in citizens), dtype=np.intp, count=len(citizens))
+        cols = np.fromiter((self.index.get((d or "").upper(), unknown) for d in destinations), dtype=np.intp, count=len(destinations))
+        known = (rows < unknown) & (cols < unknown)
+        result = np.full(len(rows), DEFAULT_RULE_INDEX, dtype=np.uint16)
+        result[known] = self.matrix[rows[known], cols[known]]
+        return result
+
+
+def _compile(source: Dict[str, Any], digest: str, out_dir: str) -> Tuple[str, Dict[str, Any]]:
+    """Write the dense matrix and its metadata for one source version (idempotent)"""
+    rule_ids = [source["default_rule"]] + sorted(r for r in source["rules"] if r != source["default_rule"])
+    rule_index = {rule_id: i for i, rule_id in enumerate(rule_ids)}
+    pair_countries = {c for pair in source.get("pairs", {}) for c in pair.split(":")}
+    countries = sorted(set(source.get("countries", [])) | pair_countries)
+    country_index = {c: i for i, c in enumerate(countries)}
+
+    matrix = np.full((len(countries), len(countries)), rule_index[source["default_rule"]], dtype=np.uint16)
+    for pair, rule_id in source.get("pairs", {}).items():
+        citizen, destination = pair.split(":")
+        matrix[country_index[citizen], country_index[destination]] = rule_index[rule_id]
+
+    base = os.path.join(out_dir, f"visa_matrix_{source['version']}_{digest[:12]}")
+    metadata = {
+        "version": source["version"],
+        "digest": digest,
+        "countries": countries,
+        "rule_ids": rule_ids,
+        "rules": [source["rules"][r] for r in rule_ids],
+        "shape": list(matrix.shape),
+    }
+    if not os.path.exists(base + ".bin"):
+        os.makedirs(out_dir, exist_ok=True)
+        # Write-then-rename so workers compiling concurrently never see a partial file
+        for suffix, payload in ((".json", json.dumps(metadata).encode()), (".bin", matrix.tobytes())):
+            fd, tmp_path = tempfile.mkstemp(dir=out_dir, prefix=".visa_matrix_")
+            with os.fdopen(fd, "wb") as f:
+                f.write(payload)
+            os.replace(tmp_path, base + suffix)
+        logger.info(f"Compiled visa matrix {source['version']} ({len(countries)} countries, {len(rule_ids)} rules)")
+    else:
+        # Reusing an older compile: mark it current so pruning by age keeps it
+        for suffix in (".json", ".bin"):
+            try:
+                os.utime(base + suffix)
+            except OSError:
+                pass
+    return base, metadata
+
+
+class VisaMatrix:
+    """Loads, serves and hot-reloads the compiled visa requirement matrix"""
+
+    def __init__(self, source_path: str = DEFAULT_SOURCE, compiled_dir: Optional[str] = None, reload_interval: float = 60.0):
+        """
+        Initialize VisaMatrix
+        Args:
+            source_path: Versioned JSON requirements file
+            compiled_dir: Where compiled matrices are written (shared by all workers)
+            reload_interval: Seconds between checks of the source for changes
+        """
+        self.source_path = source_path
+        self.compiled_dir = compiled_dir or os.path.join(tempfile.gettempdir(), "traveease_visa_matrix")
+        self.reload_interval = reload_interval
+        self._snapshot: Optional[MatrixSnapshot] = None
+        self._source_mtime: Optional[int] = None
+        self._watcher: Optional[asyncio.Task] = None
+
+    def current(self) -> MatrixSnapshot:
+        if self._snapshot is None:
+            self.reload()
+        return self._snapshot
+
+    def reload(self) -> MatrixSnapshot:
+        """(Re)compile if needed and swap in the matrix for the current source file"""
+        mtime = os.stat(self.source_path).st_mtime_ns
+        with open(self.source_path, "rb") as f:
+            raw = f.read()
+        digest = hashlib.sha256(raw).hexdigest()
+        if self._snapshot is not None and self._snapshot.digest == digest:
+            self._source_mtime = mtime
+            return self._snapshot
+
+        source = json.loads(raw)
+        for attempt in range(3):
+            base, metadata = _compile(source, digest, self.compiled_dir)
+            try:
+                matrix = np.memmap(base + ".bin", dtype=np.uint16, mode="r", shape=tuple(metadata["shape"]))
+                break
+            except FileNotFoundError:
+                # Pruned by another worker between compile and map; compile it again
+                if attempt == 2:
+                    raise
+        countries = tuple(metadata["countries"])
+        # Readers holding the old snapshot keep a valid mapping until they drop it
+        self._snapshot = MatrixSnapshot(
+            version=metadata["version"],
+            digest=digest,
+            countries=countries,
+            index={c: i for i, c in enumerate(countries)},
+            rules=tuple(metadata["rules"]),
+            rule_ids=tuple(metadata["rule_ids"]),
+            matrix=matrix,
+        )
+        self._source_mtime = mtime
+        logger.info(f"Visa matrix {metadata['version']} loaded from {base}.bin")
+        self._prune(base)
+        return self._snapshot
+
+    def _prune(self, keep: str) -> None:
+        # Unlinking is safe for workers that still map an older file; files
+        # newer than (or close in age to) ours may belong to another worker
+        prefix = os.path.basename(keep)
+        try:
+            cutoff = os.stat(keep + ".bin").st_mtime - PRUNE_GRACE
+        except OSError:
+            return
+        for name in os.listdir(self.compiled_dir):
+            if name.startswith("visa_matrix_") and not name.startswith(prefix):
+                path = os.path.join(self.compiled_dir, name)
+                try:
+                    if os.stat(path).st_mtime < cutoff:
+                        os.remove(path)
+                except OSError:
+                    pass
+
+    def reload_if_changed(self) -> bool:
+        try:
+            mtime = os.stat(self.source_path).st_mtime_ns
+        except OSError as e:
+            logger.error(f"Visa requirements source unavailable: {str(e)}")
+            return False
+        if mtime == self._source_mtime:
+            return False
+        previous = self._snapshot.digest if self._snapshot else None
+        return self.reload().digest != previous
+
+    def lookup(self, citizen_country: str, destination_country: str) -> Dict[str, Any]:
+        snapshot = self.current()
+        return snapshot.rules[int(snapshot.rule_indices([citizen_country], [destination_country])[0])]
+
+    def lookup_many(self, citizen_countries: Sequence[str], destination_countries: Sequence[str]) -> List[Dict[str, Any]]:
+        """Rules for many (citizen, destination) pairs in one vectorized pass"""
+        snapshot = self.current()
+        return [snapshot.rules[i] for i in snapshot.rule_indices(citizen_countries, destination_countries).tolist()]
+
+    async def start(self) -> None:
+        """Load now and watch the source for changes (call at startup)"""
+        await asyncio.to_thread(self.current)
+        if self._watcher is None or self._watcher.done():
+            self._watcher = asyncio.get_running_loop().create_task(self._watch())
+
+    async def stop(self) -> None:
+        if self._watcher and not self._watcher.done():
+            self._watcher.cancel()
+        self._watcher = None
+
+    async def _watch(self) -> None:
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            try:
+                await asyncio.to_thread(self.reload_if_changed)
+            except Exception as e:
+                # Keep serving the last good matrix
+                logger.error(f"Visa matrix reload failed: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        snapshot = self.current()
+        return {
+            "version": snapshot.version,
+            "digest": snapshot.digest[:12],
+            "countries": len(snapshot.countries),
+            "rules": len(snapshot.rules),
+            "matrix_bytes": int(snapshot.matrix.nbytes),
+        }
+
+
+_visa_matrix: Optional[VisaMatrix] = None
+
+
+def get_visa_matrix() -> VisaMatrix:
+    """Process-wide visa matrix"""
+    global _visa_matrix
+    if _visa_matrix is None:
+        _visa_matrix = VisaMatrix(
+            source_path=Config.VISA_REQUIREMENTS_FILE or DEFAULT_SOURCE,
+            compiled_dir=Config.VISA_MATRIX_DIR or None,
+            reload_interval=Config.VISA_MATRIX_RELOAD_SECONDS,
+        )
+    return _visa_matrix
@@ -10,11 +10,17 @@ from dataclasses import dataclass
 from enum import Enum
 import logging
 import hashlib
+import uuid
 
-from circuit_breaker import CircuitBreaker
+from backend.booking.circuit_breaker import CircuitBreaker
+from backend.booking.visa_matrix import get_visa_matrix
+from backend.utils.state_backend import get_state_backend
 
 logger = logging.getLogger(__name__)
 
+# State backend namespace
+APPLICATIONS = "visa_applications"
+
 
 class VisaStatus(Enum):
     """Visa application status"""
@@ -75,7 +81,9 @@ class VisaService:
         """
         self.config = config
         self.circuit_breaker = CircuitBreaker(failure_threshold=5, timeout=60)
-        self.applications: Dict[str, Dict] = {}
+        self.matrix = get_visa_matrix()
+        # Applications are shared by every worker
+        self.state = get_state_backend()
         self.approved_visas: Dict[str, Dict] = {}
         logger.info("VisaService initialized")
     
@@ -112,16 +120,71 @@ class VisaService:
             logger.info(f"Checking visa eligibility: {citizen_country} -> {destination_country}")
             
             # In production: Check real visa database (e.g., IND database, Timatic)
-            eligibility = self._mock_visa_eligibility(citizen_country, destination_country)
+            eligibility = self._to_eligibility(
+                citizen_country,
+                destination_country,
+                self.matrix.lookup(citizen_country, destination_country)
+            )
             
             self.circuit_breaker.record_success()
             return eligibility
             
+        except ValueError as e:
+            # Bad input or a conflict on the caller's side, not a service fault: leave the breaker alone
+            logger.warning(f"Eligibility check rejected: {str(e)}")
+            raise
         except Exception as e:
             self.circuit_breaker.record_failure()
             logger.error(f"Eligibility check failed: {str(e)}")
             raise
     
+    def batch_eligibility_check(
+        self,
+        travelers: List[Dict[str, Any]],
+        destination_country: Optional[str] = None
+    ) -> List[VisaEligibility]:
+        """
+        Check visa eligibility for a group of travelers with mixed nationalities
+        Args:
+            travelers: Dicts with citizen_country and optionally destination_country
+            destination_country: Destination used for travelers that do not set their own
+        Returns:
+            One VisaEligibility per traveler, in order
+        """
+        try:
+            citizens = [t.get("citizen_country") for t in travelers]
+            destinations = [t.get("destination_country") or destination_country for t in travelers]
+            if not self.circuit_breaker.is_available():
+                logger.warning(f"Circuit breaker OPEN for batch eligibility check ({len(travelers)} travelers)")
+                return [
+                    VisaEligibility(
+                        citizen_country=c,
+                        destination_country=d,
+                        eligible=False,
+                        visa_type="UNKNOWN",
+                        processing_time_days=0,
+                        visa_fee=0,
+                        currency="USD",
+                        requirements=[],
+                        exemptions=[]
+                    )
+                    for c, d in zip(citizens, destinations)
+                ]
+            
+            logger.info(f"Checking visa eligibility for {len(travelers)} travelers")
+            rules = self.matrix.lookup_many(citizens, destinations)
+            
+            self.circuit_breaker.record_success()
+            return [self._to_eligibility(c, d, rule) for c, d, rule in zip(citizens, destinations, rules)]
+            
+        except ValueError as e:
+            logger.warning(f"Batch eligibility check rejected: {str(e)}")
+            raise
+        except Exception as e:
+            self.circuit_breaker.record_failure()
+            logger.error(f"Batch eligibility check failed: {str(e)}")
+            raise
+    
     def document_verification(
         self,
         application_id: str,
@@ -140,7 +203,7 @@ class VisaService:
                 logger.warning(f"Circuit breaker OPEN for document verification {application_id}")
                 raise Exception("Visa service unavailable")
             
-            if application_id not in self.applications:
+            if self.state.get(APPLICATIONS, application_id) is None:
                 raise ValueError(f"Application {application_id} not found")
             
             # Simulate document verification (OCR, compliance check)
@@ -168,8 +231,11 @@ class VisaService:
             all_verified = all(doc["verified"] for doc in verification_results.values())
             
             # Update application status
-            self.applications[application_id]["status"] = VisaStatus.DOCUMENTS_VERIFIED.value
-            self.applications[application_id]["documents_submitted"] = list(documents.keys())
+            self.state.update(APPLICATIONS, application_id, lambda app: {
+                **app,
+                "status": VisaStatus.DOCUMENTS_VERIFIED.value,
+                "documents_submitted": list(documents.keys()),
+            } if app else None)
             
             logger.info(f"Documents verified for application {application_id}: {all_verified}")
             self.circuit_breaker.record_success()
@@ -182,6 +248,9 @@ class VisaService:
                 "verified_at": datetime.now().isoformat()
             }
             
+        except ValueError as e:
+            logger.warning(f"Document verification rejected: {str(e)}")
+            raise
         except Exception as e:
             self.circuit_breaker.record_failure()
             logger.error(f"Document verification failed: {str(e)}")
@@ -215,7 +284,7 @@ class VisaService:
                 logger.warning(f"Circuit breaker OPEN for visa application {applicant_name}")
                 raise Exception("Visa service unavailable")
             
-            application_id = f"VISA_{citizen_country}_{int(datetime.now().timestamp())}"
+            application_id = f"VISA_{citizen_country}_{int(datetime.now().timestamp())}_{uuid.uuid4().hex[:6]}"
             reference_number = f"REF{hashlib.md5(f'{applicant_name}{datetime.now().isoformat()}'.encode()).hexdigest()[:10].upper()}"
             
             # Calculate processing time
@@ -247,19 +316,23 @@ class VisaService:
                 created_at=datetime.now().isoformat()
             )
             
-            self.applications[application_id] = {
+            # Shared storage only ever sees the masked passport number
+            self.state.create(APPLICATIONS, application_id, {
                 "applicant": applicant_name,
-                "passport": passport_number,
+                "passport": masked_passport,
                 "destination": destination_country,
                 "status": VisaStatus.APPLICATION_INITIATED.value,
                 "travel_dates": (travel_start_date, travel_end_date)
-            }
+            })
             
             logger.info(f"Visa application submitted: {application_id}, reference: {reference_number}")
             self.circuit_breaker.record_success()
             
             return application
             
+        except ValueError as e:
+            logger.warning(f"Visa application rejected: {str(e)}")
+            raise
         except Exception as e:
             self.circuit_breaker.record_failure()
             logger.error(f"Visa application failed: {str(e)}")
@@ -283,11 +356,6 @@ class VisaService:
                 logger.warning(f"Circuit breaker OPEN for status tracking {application_id}")
                 raise Exception("Visa service unavailable")
             
-            if application_id not in self.applications:
-                raise ValueError(f"Application {application_id} not found")
-            
-            app = self.applications[application_id]
-            
             # Simulate status progression
             status_progression = [
                 VisaStatus.APPLICATION_INITIATED.value,
@@ -299,12 +367,19 @@ class VisaService:
                 VisaStatus.VISA_APPROVED.value
             ]
             
-            current_status = app.get("status", VisaStatus.APPLICATION_INITIATED.value)
-            status_index = status_progression.index(current_status)
+            def advance(app: Optional[Dict]) -> Optional[Dict]:
+                if app is None:
+                    return None
+                current_status = app.get("status", VisaStatus.APPLICATION_INITIATED.value)
+                status_index = status_progression.index(current_status)
+                # For demo: simulate progression
+                app["status"] = status_progression[min(status_index + 1, len(status_progression) - 1)]
+                return app
             
-            # For demo: simulate progression
-            next_index = min(status_index + 1, len(status_progression) - 1)
-            app["status"] = status_progression[next_index]
+            app = self.state.update(APPLICATIONS, application_id, advance)
+            if app is None:
+                raise ValueError(f"Application {application_id} not found")
+            next_index = status_progression.index(app["status"])
             
             logger.info(f"Application {application_id} status: {app['status']}")
             self.circuit_breaker.record_success()
@@ -319,70 +394,21 @@ class VisaService:
                 "estimated_completion": (datetime.now() + timedelta(days=10 - next_index)).isoformat()
             }
             
+        except ValueError as e:
+            logger.warning(f"Status tracking rejected: {str(e)}")
+            raise
         except Exception as e:
             self.circuit_breaker.record_failure()
             logger.error(f"Status tracking failed: {str(e)}")
             raise
     
-    def _mock_visa_eligibility(
+    def _to_eligibility(
         self,
         citizen_country: str,
-        destination_country: str
+        destination_country: str,
+        visa_info: Dict[str, Any]
     ) -> VisaEligibility:
-        """Mock visa eligibility check"""
-        
-        # Simple mock database of visa requirements
-        visa_db = {
-            ("US", "NG"): {
-                "eligible": True,
-                "visa_type": "TOURIST_VISA",
-                "processing_time": 7,
-                "visa_fee": 160.00,
-                "requirements": [
-                    "Valid passport",
-                    "Completed visa application form",
-                    "Passport photo",
-                    "Proof of travel",
-                    "Financial proof",
-                    "Yellow fever vaccination"
-                ],
-                "exemptions": []
-            },
-            ("NG", "US"): {
-                "eligible": True,
-                "visa_type": "TOURIST_VISA",
-                "processing_time": 14,
-                "visa_fee": 140.00,
-                "requirements": [
-                    "Valid passport",
-                    "DS-160 form",
-                    "Passport photo",
-                    "Proof of ties to Nigeria",
-                    "Financial proof",
-                    "Interview at embassy"
-                ],
-                "exemptions": []
-            },
-            ("DE", "FR"): {
-                "eligible": True,
-                "visa_type": "SCHENGEN_VISA",
-                "processing_time": 3,
-                "visa_fee": 80.00,
-                "requirements": [],
-                "exemptions": ["EU Citizen - Freedom of Movement"]
-            }
-        }
-        
-        key = (citizen_country, destination_country)
-        visa_info = visa_db.get(key, {
-            "eligible": True,
-            "visa_type": "TOURIST_VISA",
-            "processing_time": 10,
-            "visa_fee": 100.00,
-            "requirements": ["Valid passport", "Travel proof", "Financial proof"],
-            "exemptions": []
-        })
-        
+        """Build a VisaEligibility from a visa matrix rule"""
         return VisaEligibility(
             citizen_country=citizen_country,
             destination_country=destination_country,
@@ -390,9 +416,9 @@ class VisaService:
             visa_type=visa_info["visa_type"],
             processing_time_days=visa_info["processing_time"],
             visa_fee=visa_info["visa_fee"],
-            currency="USD",
-            requirements=visa_info["requirements"],
-            exemptions=visa_info["exemptions"]
+            currency=visa_info.get("currency", "USD"),
+            requirements=list(visa_info["requirements"]),
+            exemptions=list(visa_info["exemptions"])
         )
     
     def _mask_passport(self, passport_number: str) -> str:
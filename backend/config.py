@@ -9,6 +9,7 @@ class Config:
     AMADEUS_API_KEY = os.getenv("AMADEUS_API_KEY", "")
     AMADEUS_API_SECRET = os.getenv("AMADEUS_API_SECRET", "")
     AMADEUS_BASE_URL = os.getenv("AMADEUS_BASE_URL", "https://test.api.amadeus.com")
+    AMADEUS_TOKEN_CACHE_PATH = os.getenv("AMADEUS_TOKEN_CACHE_PATH", "")
     
     # Viator
     VIATOR_API_KEY = os.getenv("VIATOR_API_KEY", "")
@@ -17,6 +18,8 @@ class Config:
     # Treepz/Travu
     TREEPZ_API_KEY = os.getenv("TREEPZ_API_KEY", "")
     TRAVU_API_KEY = os.getenv("TRAVU_API_KEY", "")
+    TRAVU_BASE_URL = os.getenv("TRAVU_BASE_URL", "https://api.travu.africa")
+    TREEPZ_BASE_URL = os.getenv("TREEPZ_BASE_URL", "https://api.treepz.com")
     
     # Payment Gateways
     STRIPE_SECRET_KEY = os.getenv("STRIPE_SECRET_KEY", "")
@@ -28,5 +31,74 @@ class Config:
     # Compliance
     NDPR_ENCRYPTION_KEY = os.getenv("NDPR_ENCRYPTION_KEY", "")
     
+    # Agentic orchestration (per-agent deadlines, seconds)
+    AGENTIC_LOGISTICS_TIMEOUT = float(os.getenv("AGENTIC_LOGISTICS_TIMEOUT", "8"))
+    AGENTIC_CULTURE_TIMEOUT = float(os.getenv("AGENTIC_CULTURE_TIMEOUT", "5"))
+    AGENTIC_VISA_TIMEOUT = float(os.getenv("AGENTIC_VISA_TIMEOUT", "3"))
+    # Whole-request budget; agents get whatever is left of it (0 disables)
+    AGENTIC_REQUEST_DEADLINE = float(os.getenv("AGENTIC_REQUEST_DEADLINE", "10"))
+    AGENTIC_BATCH_MAX_QUERIES = int(os.getenv("AGENTIC_BATCH_MAX_QUERIES", "100"))
+    AGENTIC_BATCH_CONCURRENCY = int(os.getenv("AGENTIC_BATCH_CONCURRENCY", "16"))
+    
+    # Booking search deadline (seconds; bookings themselves are never cut short)
+    BOOKING_SEARCH_DEADLINE = float(os.getenv("BOOKING_SEARCH_DEADLINE", "10"))
+    
+    # Admission control: worker slots shared by all routes, the last ADMISSION_CRITICAL_RESERVE
+    # kept for booking/payment traffic; queue timeouts are the queue-time SLOs (seconds)
+    ADMISSION_CONTROL_ENABLED = os.getenv("ADMISSION_CONTROL_ENABLED", "true").lower() == "true"
+    ADMISSION_MAX_CONCURRENCY = int(os.getenv("ADMISSION_MAX_CONCURRENCY", "64"))
+    ADMISSION_CRITICAL_RESERVE = int(os.getenv("ADMISSION_CRITICAL_RESERVE", "16"))
+    ADMISSION_CRITICAL_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_CRITICAL_QUEUE_TIMEOUT", "2.0"))
+    ADMISSION_CRITICAL_LATENCY_TARGET = float(os.getenv("ADMISSION_CRITICAL_LATENCY_TARGET", "2.0"))
+    ADMISSION_STANDARD_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_STANDARD_QUEUE_TIMEOUT", "1.0"))
+    ADMISSION_AGENTIC_CONCURRENCY = int(os.getenv("ADMISSION_AGENTIC_CONCURRENCY", "24"))
+    ADMISSION_AGENTIC_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_AGENTIC_QUEUE_TIMEOUT", "0.5"))
+    ADMISSION_AGENTIC_MAX_QUEUE = int(os.getenv("ADMISSION_AGENTIC_MAX_QUEUE", "32"))
+    
+    # Semantic cache for natural-language agentic queries
+    SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() == "true"
+    SEMANTIC_CACHE_TTL_SECONDS = float(os.getenv("SEMANTIC_CACHE_TTL_SECONDS", "600"))
+    SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "2000"))
+    SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.8"))
+    
+    # Provider search cache
+    SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "10000"))
+    SEARCH_CACHE_MAX_MB = int(os.getenv("SEARCH_CACHE_MAX_MB", "64"))
+    
+    # Upstream request hedging (idempotent searches only)
+    UPSTREAM_HEDGING_ENABLED = os.getenv("UPSTREAM_HEDGING_ENABLED", "false").lower() == "true"
+    UPSTREAM_HEDGE_QUANTILE = float(os.getenv("UPSTREAM_HEDGE_QUANTILE", "0.95"))
+    UPSTREAM_HEDGE_BUDGET = float(os.getenv("UPSTREAM_HEDGE_BUDGET", "0.1"))
+    
+    # Upstream simulation / record-replay (direct | simulate | record | replay)
+    UPSTREAM_MODE = os.getenv("UPSTREAM_MODE", "direct").lower()
+    UPSTREAM_SIM_PROFILE = os.getenv("UPSTREAM_SIM_PROFILE", "")
+    UPSTREAM_SIM_SEED = int(os.getenv("UPSTREAM_SIM_SEED")) if os.getenv("UPSTREAM_SIM_SEED") else None
+    UPSTREAM_CASSETTE = os.getenv("UPSTREAM_CASSETTE", "upstream_cassette.jsonl")
+    UPSTREAM_REPLAY_LATENCY = os.getenv("UPSTREAM_REPLAY_LATENCY", "true").lower() == "true"
+    
+    # Shared hold / booking state (memory | sqlite | redis)
+    STATE_BACKEND = os.getenv("STATE_BACKEND", "memory").lower()
+    STATE_SQLITE_PATH = os.getenv("STATE_SQLITE_PATH", "")
+    STATE_REDIS_URL = os.getenv("STATE_REDIS_URL", "redis://localhost:6379/0")
+    
+    # Hotel room holds / inventory
+    HOTEL_HOLD_SWEEP_SECONDS = float(os.getenv("HOTEL_HOLD_SWEEP_SECONDS", "5"))
+    HOTEL_INVENTORY_HORIZON_DAYS = int(os.getenv("HOTEL_INVENTORY_HORIZON_DAYS", "730"))
+    
+    # Visa requirement matrix
+    VISA_REQUIREMENTS_FILE = os.getenv("VISA_REQUIREMENTS_FILE", "")
+    VISA_MATRIX_DIR = os.getenv("VISA_MATRIX_DIR", "")
+    VISA_MATRIX_RELOAD_SECONDS = float(os.getenv("VISA_MATRIX_RELOAD_SECONDS", "60"))
+    
+    # Itinerary scheduling
+    ITINERARY_MAX_DAYS = int(os.getenv("ITINERARY_MAX_DAYS", "30"))
+    
+    # Pricing / FX
+    PRICING_CURRENCIES = [c.strip() for c in os.getenv("PRICING_CURRENCIES", "NGN,USD,EUR").split(",") if c.strip()]
+    FX_RATES_URL = os.getenv("FX_RATES_URL", "")
+    FX_RATES_FILE = os.getenv("FX_RATES_FILE", "")
+    FX_REFRESH_SECONDS = float(os.getenv("FX_REFRESH_SECONDS", "900"))
+    
     # Logging
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
@@ -1,15 +1,24 @@
 from fastapi import FastAPI
 
+from backend.middleware.admission_control import AdmissionControlMiddleware, get_admission_controller
 from backend.middleware.ndpr_encryption import NDPRMiddleware
 from backend.middleware.error_handler import api_timeout_handler
+from backend.agentic.fx import get_fx_rate_cache
 from backend.agentic.routes import router as agentic_router
-from backend.booking.routes import router as booking_router
+from backend.booking.routes import hotel_service, router as booking_router
+from backend.booking.visa_matrix import get_visa_matrix
+from backend.utils.amadeus_auth import get_amadeus_token_manager
+from backend.utils.http_client import get_http_client
+from backend.utils.state_backend import get_state_backend
 
 app = FastAPI()
 
 # Add NDPR-compliant encryption middleware
 app.add_middleware(NDPRMiddleware)
 
+# Outermost: priority admission control sheds agentic traffic before booking/payments
+app.add_middleware(AdmissionControlMiddleware)
+
 # Add global error handler for travel API timeouts
 app.add_exception_handler(TimeoutError, api_timeout_handler)
 
@@ -18,7 +27,44 @@ app.include_router(agentic_router, prefix="/agentic")
 app.include_router(booking_router, prefix="/booking")
 
 
+@app.on_event("startup")
+async def warm_amadeus_token():
+    # Fetch (or adopt another worker's) token up front so no request waits on auth
+    await get_amadeus_token_manager().start()
+
+
+@app.on_event("startup")
+async def start_fx_rates():
+    await get_fx_rate_cache().start()
+
+
+@app.on_event("startup")
+async def load_visa_matrix():
+    await get_visa_matrix().start()
+
+
+@app.on_event("startup")
+async def start_hold_sweeper():
+    await hotel_service.holds.start()
+
+
+@app.on_event("shutdown")
+async def close_upstream_pools():
+    await get_amadeus_token_manager().stop()
+    await get_fx_rate_cache().stop()
+    await get_visa_matrix().stop()
+    await hotel_service.holds.stop()
+    get_state_backend().close()
+    await get_http_client().aclose()
+
+
 @app.get("/health")
 def health_check():
     return {"status": "ok"}
 
+
+@app.get("/health/admission")
+def admission_stats():
+    """Worker slots, queue waits, latency against target and shed counts per traffic class"""
+    return get_admission_controller().stats()
+
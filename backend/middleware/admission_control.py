@@ -0,0 +1,335 @@
+"""
+Priority Admission Control
+Every request takes a worker slot before it reaches a router. Slots are
+shared by all routes, granted in priority order (booking/payments first,
+agentic queries last), capped per traffic class, and each class has a
+queue-time SLO after which a waiting request is shed with 503.
+
+Under overload best-effort traffic goes first: agentic requests cannot use
+the slots reserved for critical traffic, are dropped from the queue as soon
+as a critical request is waiting, and their concurrency limit is halved
+whenever critical latency drifts past its target (and grows back slowly
+once it recovers).
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from starlette.responses import JSONResponse
+
+from backend.config import Config
+from backend.middleware.prometheus_metrics import admission_in_flight, admission_queue_seconds, admission_requests_total
+
+logger = logging.getLogger(__name__)
+
+CRITICAL = 0
+STANDARD = 1
+BEST_EFFORT = 2
+
+
+@dataclass
+class TrafficClass:
+    """One priority class of requests"""
+    name: str
+    priority: int  # CRITICAL, STANDARD or BEST_EFFORT; lower is served first
+    prefixes: Tuple[str, ...]
+    max_concurrency: int
+    queue_timeout: float  # queue-time SLO in seconds
+    max_queue: int = 1000
+    latency_target: Optional[float] = None  # seconds, end to end (critical classes)
+
+
+@dataclass
+class ClassState:
+    limit: int  # current concurrency limit (may be lowered under overload)
+    in_flight: int = 0
+    admitted: int = 0
+    shed: Dict[str, int] = field(default_factory=dict)
+    waiters: Deque[asyncio.Future] = field(default_factory=deque)
+    queue_waits: Deque[float] = field(default_factory=lambda: deque(maxlen=512))
+    latencies: Deque[float] = field(default_factory=lambda: deque(maxlen=512))
+
+
+def _p95(samples) -> Optional[float]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+
+
+def default_classes() -> List[TrafficClass]:
+    return [
+        TrafficClass(
+            "critical", CRITICAL, ("/booking", "/payments", "/webhooks"),
+            max_concurrency=Config.ADMISSION_MAX_CONCURRENCY,
+            queue_timeout=Config.ADMISSION_CRITICAL_QUEUE_TIMEOUT,
+            latency_target=Config.ADMISSION_CRITICAL_LATENCY_TARGET,
+        ),
+        TrafficClass(
+            "agentic", BEST_EFFORT, ("/agentic",),
+            max_concurrency=Config.ADMISSION_AGENTIC_CONCURRENCY,
+            queue_timeout=Config.ADMISSION_AGENTIC_QUEUE_TIMEOUT,
+            max_queue=Config.ADMISSION_AGENTIC_MAX_QUEUE,
+        ),
+        TrafficClass(
+            "standard", STANDARD, ("/",),
+            max_concurrency=Config.ADMISSION_MAX_CONCURRENCY,
+            queue_timeout=Config.ADMISSION_STANDARD_QUEUE_TIMEOUT,
+        ),
+    ]
+
+
+class AdmissionController:
+    """Priority-ordered worker slots with per-class limits, queue SLOs and load shedding"""
+
+    def __init__(
+        self,
+        classes: List[TrafficClass],
+        capacity: int,
+        critical_reserve: int = 0,
+        exempt: Tuple[str, ...] = ("/health", "/metrics"),
+        adjust_every: int = 50,
+    ):
+        """
+        Initialize AdmissionController
+        Args:
+            classes: Traffic classes; a path belongs to the class with the longest matching prefix
+            capacity: Worker slots shared by every class
+            critical_reserve: Slots only CRITICAL requests may take
+            exempt: Paths that bypass admission control (probes, scraping)
+            adjust_every: Critical completions between best-effort limit adjustments
+        """
+        self.classes = sorted(classes, key=lambda c: c.priority)
+        self.capacity = capacity
+        self.critical_reserve = min(critical_reserve, max(0, capacity - 1))
+        self.exempt = exempt
+        self.adjust_every = adjust_every
+        self.state: Dict[str, ClassState] = {c.name: ClassState(limit=c.max_concurrency) for c in classes}
+        self._prefixes = sorted(((p, c) for c in classes for p in c.prefixes), key=lambda pc: len(pc[0]), reverse=True)
+        self._completions = 0
+
+    @property
+    def in_flight(self) -> int:
+        return sum(s.in_flight for s in self.state.values())
+
+    def classify(self, path: str) -> Optional[TrafficClass]:
+        if any(path == p or path.startswith(p + "/") for p in self.exempt):
+            return None
+        for prefix, traffic_class in self._prefixes:
+            if path == prefix or path.startswith(prefix.rstrip("/") + "/"):
+                return traffic_class
+        return None
+
+    def _can_start(self, traffic_class: TrafficClass) -> bool:
+        state = self.state[traffic_class.name]
+        free = self.capacity - self.in_flight
+        if traffic_class.priority != CRITICAL:
+            free -= self.critical_reserve
+        return free > 0 and state.in_flight < state.limit
+
+    def _higher_priority_waiting(self, traffic_class: TrafficClass) -> bool:
+        return any(self.state[c.name].waiters for c in self.classes if c.priority < traffic_class.priority)
+
+    def _shed(self, traffic_class: TrafficClass, reason: str) -> None:
+        state = self.state[traffic_class.name]
+        state.shed[reason] = state.shed.get(reason, 0) + 1
+        admission_requests_total.labels(traffic_class=traffic_class.name, outcome=reason).inc()
+
+    def _start(self, traffic_class: TrafficClass) -> None:
+        state = self.state[traffic_class.name]
+        state.in_flight += 1
+        state.admitted += 1
+        admission_in_flight.labels(traffic_class=traffic_class.name).set(state.in_flight)
+        admission_requests_total.labels(traffic_class=traffic_class.name, outcome="admitted").inc()
+
+    def _dispatch(self) -> None:
+        """Hand free slots to waiters, highest priority first"""
+        for traffic_class in self.classes:
+            waiters = self.state[traffic_class.name].waiters
+            while waiters and self._can_start(traffic_class):
+                waiter = waiters.popleft()
+                if not waiter.done():
+                    self._start(traffic_class)
+                    waiter.set_result(True)
+
+    def _evict_lower(self, traffic_class: TrafficClass) -> None:
+        # A critical request is queueing: lower-priority waiters will not be served in time
+        for other in self.classes:
+            if other.priority > traffic_class.priority and other.priority == BEST_EFFORT:
+                waiters = self.state[other.name].waiters
+                while waiters:
+                    waiter = waiters.popleft()
+                    if not waiter.done():
+                        waiter.set_result(False)
+
+    async def acquire(self, traffic_class: TrafficClass) -> Optional[str]:
+        """
+        Wait for a worker slot
+        Args:
+            traffic_class: Class of the incoming request
+        Returns:
+            None once admitted (call release() when done), otherwise the reason it was shed
+        """
+        state = self.state[traffic_class.name]
+        if not state.waiters and not self._higher_priority_waiting(traffic_class) and self._can_start(traffic_class):
+            self._start(traffic_class)
+            state.queue_waits.append(0.0)
+            admission_queue_seconds.labels(traffic_class=traffic_class.name).observe(0.0)
+            return None
+        if traffic_class.priority == BEST_EFFORT and self._higher_priority_waiting(traffic_class):
+            self._shed(traffic_class, "preempted")
+            return "preempted"
+        if len(state.waiters) >= traffic_class.max_queue:
+            self._shed(traffic_class, "queue_full")
+            return "queue_full"
+
+        waiter = asyncio.get_running_loop().create_future()
+        state.waiters.append(waiter)
+        if traffic_class.priority == CRITICAL:
+            self._evict_lower(traffic_class)
+        started = time.monotonic()
+        try:
+            done, _ = await asyncio.wait({waiter}, timeout=traffic_class.queue_timeout)
+        except asyncio.CancelledError:
+            # Client went away while queued; give back a slot granted in the meantime
+            if waiter.done() and waiter.result():
+                self.release(traffic_class, 0.0)
+            else:
+                self._abandon(state, waiter)
+            raise
+        waited = time.monotonic() - started
+        admission_queue_seconds.labels(traffic_class=traffic_class.name).observe(waited)
+        if not done:
+            self._abandon(state, waiter)
+            self._shed(traffic_class, "queue_timeout")
+            return "queue_timeout"
+        if not waiter.result():
+            self._shed(traffic_class, "preempted")
+            return "preempted"
+        state.queue_waits.append(waited)
+        return None
+
+    @staticmethod
+    def _abandon(state: ClassState, waiter: asyncio.Future) -> None:
+        waiter.cancel()
+        try:
+            state.waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def release(self, traffic_class: TrafficClass, elapsed: float) -> None:
+        state = self.state[traffic_class.name]
+        state.in_flight -= 1
+        state.latencies.append(elapsed)
+        admission_in_flight.labels(traffic_class=traffic_class.name).set(state.in_flight)
+        if traffic_class.priority == CRITICAL and traffic_class.latency_target:
+            self._completions += 1
+            if self._completions % self.adjust_every == 0:
+                self._adjust(traffic_class)
+        self._dispatch()
+
+    def _adjust(self, critical: TrafficClass) -> None:
+        """Halve best-effort concurrency while critical p95 misses its target; regrow by one when healthy"""
+        p95 = _p95(list(self.state[critical.name].latencies)[-self.adjust_every:])
+        for traffic_class in self.classes:
+            if traffic_class.priority != BEST_EFFORT:
+                continue
+            state = self.state[traffic_class.name]
+            if p95 > critical.latency_target:
+                limit = max(1, state.limit // 2)
+            elif p95 < 0.8 * critical.latency_target:
+                limit = min(traffic_class.max_concurrency, state.limit + 1)
+            else:
+                continue
+            if limit != state.limit:
+                log = logger.warning if limit < state.limit else logger.info
+                log(
+                    f"Admission: {traffic_class.name} limit {state.limit} -> {limit} "
+                    f"({critical.name} p95 {p95:.2f}s, target {critical.latency_target}s)"
+                )
+                state.limit = limit
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "capacity": self.capacity,
+            "critical_reserve": self.critical_reserve,
+            "in_flight": self.in_flight,
+            "classes": {
+                c.name: {
+                    "priority": c.priority,
+                    "limit": self.state[c.name].limit,
+                    "max_concurrency": c.max_concurrency,
+                    "in_flight": self.state[c.name].in_flight,
+                    "queued": sum(1 for w in self.state[c.name].waiters if not w.done()),
+                    "admitted": self.state[c.name].admitted,
+                    "shed": dict(self.state[c.name].shed),
+                    "queue_timeout_s": c.queue_timeout,
+                    "queue_wait_p95_s": _round(_p95(self.state[c.name].queue_waits)),
+                    "latency_target_s": c.latency_target,
+                    "latency_p95_s": _round(_p95(self.state[c.name].latencies)),
+                }
+                for c in self.classes
+            },
+        }
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 4) if value is not None else None
+
+
+_admission_controller: Optional[AdmissionController] = None
+
+
+def get_admission_controller() -> AdmissionController:
+    """Process-wide controller (one event loop per worker)"""
+    global _admission_controller
+    if _admission_controller is None:
+        _admission_controller = AdmissionController(
+            default_classes(),
+            capacity=Config.ADMISSION_MAX_CONCURRENCY,
+            critical_reserve=Config.ADMISSION_CRITICAL_RESERVE,
+        )
+    return _admission_controller
+
+
+class AdmissionControlMiddleware:
+    """ASGI middleware holding a worker slot for the whole request, streamed responses included"""
+
+    def __init__(self, app, controller: Optional[AdmissionController] = None):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not Config.ADMISSION_CONTROL_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        controller = self.controller or get_admission_controller()
+        traffic_class = controller.classify(scope["path"])
+        if traffic_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        arrived = time.monotonic()
+        shed = await controller.acquire(traffic_class)
+        if shed is not None:
+            response = JSONResponse(
+                status_code=503,
+                content={
+                    "error": "Service overloaded",
+                    "message": "The service is under heavy load. Please retry shortly.",
+                    "traffic_class": traffic_class.name,
+                    "reason": shed,
+                },
+                headers={"Retry-After": "1" if traffic_class.priority == CRITICAL else "5"},
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            # Queue wait included: the latency target is what the client experiences
+            controller.release(traffic_class, time.monotonic() - arrived)
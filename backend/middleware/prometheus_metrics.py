@@ -154,6 +154,39 @@ cache_misses_total = Counter(
     labelnames=['cache_key']
 )
 
+# Upstream Hedging Metrics
+upstream_calls_total = Counter(
+    'upstream_calls_total',
+    'Total hedge-eligible upstream search calls',
+    labelnames=['provider']
+)
+
+upstream_hedged_calls_total = Counter(
+    'upstream_hedged_calls_total',
+    'Upstream calls that sent a hedge request, by which attempt answered first',
+    labelnames=['provider', 'winner']
+)
+
+# Admission Control Metrics
+admission_requests_total = Counter(
+    'admission_requests_total',
+    'Requests seen by admission control, by traffic class and outcome (admitted or shed reason)',
+    labelnames=['traffic_class', 'outcome']
+)
+
+admission_queue_seconds = Histogram(
+    'admission_queue_seconds',
+    'Time requests waited for a worker slot',
+    labelnames=['traffic_class'],
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0)
+)
+
+admission_in_flight = Gauge(
+    'admission_in_flight',
+    'Requests currently holding a worker slot',
+    labelnames=['traffic_class']
+)
+
 # Error Metrics
 errors_total = Counter(
     'errors_total',
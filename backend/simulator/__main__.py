@@ -0,0 +1,32 @@
+"""
+Run the upstream simulator as a standalone server.
+
+    python -m backend.simulator --port 8900 --profile sim_profiles.json
+
+Point the backend at it with path-prefixed base URLs, e.g.
+AMADEUS_BASE_URL=http://localhost:8900/amadeus, VIATOR_BASE_URL=http://localhost:8900/viator,
+TRAVU_BASE_URL=http://localhost:8900/travu, TREEPZ_BASE_URL=http://localhost:8900/treepz and
+FX_RATES_URL=http://localhost:8900/fx/latest. Profiles can be changed at runtime with
+PATCH /__sim/profiles/<provider>; GET /__sim/state reports per-provider stats.
+"""
+
+import argparse
+
+import uvicorn
+
+from backend.simulator.server import create_app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local stand-in for upstream travel providers")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--profile", default=None, help="JSON file of per-provider profile overrides")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+    # Standalone: providers are addressed by path prefix, never by Host header
+    uvicorn.run(create_app(args.profile, seed=args.seed, hosts={}), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Record/replay of upstream HTTP traffic.
+RecordingTransport passes requests through and appends each exchange to a
+JSONL cassette; ReplayTransport answers from a cassette (optionally with the
+recorded latency) so benchmarks can be re-run offline against real payloads.
+Credentials are never written: auth headers are not recorded, secret form and
+JSON fields are dropped from the match key and access tokens are redacted.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qsl
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# How the upstream body was encoded on the wire; wrong once it has been decoded
+WIRE_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+SECRET_FIELDS = {"client_id", "client_secret", "api_key", "apikey", "password", "access_token", "refresh_token"}
+
+
+def _redact_body(content: bytes, content_type: str) -> Any:
+    if not content:
+        return None
+    if "json" in content_type:
+        try:
+            body = json.loads(content)
+        except ValueError:
+            return content.decode(errors="replace")
+        if isinstance(body, dict):
+            return {k: v for k, v in body.items() if k.lower() not in SECRET_FIELDS}
+        return body
+    if "x-www-form-urlencoded" in content_type:
+        return sorted((k, v) for k, v in parse_qsl(content.decode()) if k.lower() not in SECRET_FIELDS)
+    return hashlib.sha1(content).hexdigest()
+
+
+def exchange_key(request: httpx.Request) -> str:
+    """Identity of a request: method, host, path, sorted query and secret-free body"""
+    identity = {
+        "method": request.method,
+        "host": request.url.host,
+        "path": request.url.path,
+        "query": sorted(parse_qsl(request.url.query.decode() if isinstance(request.url.query, bytes) else request.url.query)),
+        "body": _redact_body(request.content, request.headers.get("content-type", "")),
+    }
+    return hashlib.sha1(json.dumps(identity, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _redact_response(text: str) -> str:
+    try:
+        body = json.loads(text)
+    except ValueError:
+        return text
+    if isinstance(body, dict) and "access_token" in body:
+        body = {**body, "access_token": "replayed-token"}
+        return json.dumps(body)
+    return text
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """
+    Forward to a real transport and append every exchange to a JSONL cassette.
+    The transport is shared by every pooled client, so closing one client
+    leaves it (and the inner transport) open.
+    """
+
+    def __init__(self, path: str, inner: Optional[httpx.AsyncBaseTransport] = None):
+        self.path = path
+        self.inner = inner or httpx.AsyncHTTPTransport()
+        self._lock = threading.Lock()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        response = await self.inner.handle_async_request(request)
+        content = await response.aread()
+        elapsed_ms = round((time.perf_counter() - started) * 1000, 2)
+        entry = {
+            "key": exchange_key(request),
+            "method": request.method,
+            "url": f"{request.url.scheme}://{request.url.host}{request.url.path}",
+            "status": response.status_code,
+            "headers": {k: v for k, v in response.headers.items() if k.lower() in ("content-type", "retry-after")},
+            "body": _redact_response(content.decode(errors="replace")),
+            "elapsed_ms": elapsed_ms,
+        }
+        line = json.dumps(entry) + "\n"
+        await asyncio.to_thread(self._append, line)
+        # `content` is already decoded: drop the headers describing the wire encoding
+        headers = [(k, v) for k, v in response.headers.multi_items() if k.lower() not in WIRE_HEADERS]
+        return httpx.Response(response.status_code, headers=headers, content=content, request=request)
+
+    def _append(self, line: str) -> None:
+        with self._lock, open(self.path, "a") as f:
+            f.write(line)
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """Serve responses from a cassette; repeated requests cycle through their recordings"""
+
+    def __init__(self, path: str, replay_latency: bool = True):
+        self.path = path
+        self.replay_latency = replay_latency
+        self._entries: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._cursor: Dict[str, int] = defaultdict(int)
+        self.misses = 0
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._entries[entry["key"]].append(entry)
+        logger.info(f"Loaded {sum(len(v) for v in self._entries.values())} recorded exchanges from {path}")
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        key = exchange_key(request)
+        recorded = self._entries.get(key)
+        if not recorded:
+            self.misses += 1
+            logger.warning(f"No recording for {request.method} {request.url.host}{request.url.path}")
+            return httpx.Response(404, json={"error": "request not in cassette"}, request=request)
+        entry = recorded[self._cursor[key] % len(recorded)]
+        self._cursor[key] += 1
+        if self.replay_latency:
+            await asyncio.sleep(entry["elapsed_ms"] / 1000.0)
+        return httpx.Response(entry["status"], headers=entry["headers"], content=entry["body"].encode(), request=request)
@@ -0,0 +1,159 @@
+"""
+Response bodies served by the upstream simulator.
+Shapes follow the real provider APIs closely enough for every integration's
+parsing code; content is deterministic per request so caches and
+deduplication behave as they would against the real thing.
+"""
+
+import hashlib
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List
+
+
+def _seed(*parts: Any) -> int:
+    return int(hashlib.sha1("|".join(str(p) for p in parts).encode()).hexdigest()[:8], 16)
+
+
+def _date(value: Any, default_days: int = 30) -> date:
+    try:
+        return datetime.fromisoformat(str(value)[:10]).date()
+    except ValueError:
+        return date.today() + timedelta(days=default_days)
+
+
+def amadeus_token() -> Dict[str, Any]:
+    return {"type": "amadeusOAuth2Token", "access_token": "simulated-token", "token_type": "Bearer", "expires_in": 1799, "state": "approved"}
+
+
+def flight_offers(params: Dict[str, Any], count: int) -> Dict[str, Any]:
+    origin = params.get("originLocationCode", "LOS")
+    destination = params.get("destinationLocationCode", "LHR")
+    outbound = _date(params.get("departureDate"))
+    inbound = params.get("returnDate")
+    seed = _seed(origin, destination, outbound, inbound)
+    offers = []
+    for i in range(count):
+        depart_minutes = 6 * 60 + (seed + i * 97) % (14 * 60)
+        duration = 240 + (seed // 7 + i * 53) % 480
+        departs = datetime.combine(outbound, datetime.min.time()) + timedelta(minutes=depart_minutes)
+        itineraries = [_itinerary(origin, destination, departs, duration, i)]
+        if inbound:
+            back = datetime.combine(_date(inbound), datetime.min.time()) + timedelta(minutes=depart_minutes)
+            itineraries.append(_itinerary(destination, origin, back, duration, i + 50))
+        total = f"{450 + (seed // 11 + i * 131) % 900}.{(seed + i) % 100:02d}"
+        offers.append({
+            "type": "flight-offer",
+            "id": str(i + 1),
+            "source": "GDS",
+            "oneWay": not inbound,
+            "numberOfBookableSeats": 1 + (seed + i) % 9,
+            "itineraries": itineraries,
+            "price": {"currency": "USD", "total": total, "base": total, "grandTotal": total},
+            "validatingAirlineCodes": ["BA"],
+        })
+    return {"meta": {"count": count}, "data": offers}
+
+
+def _itinerary(origin: str, destination: str, departs: datetime, minutes: int, number: int) -> Dict[str, Any]:
+    return {
+        "duration": f"PT{minutes // 60}H{minutes % 60}M",
+        "segments": [{
+            "departure": {"iataCode": origin, "at": departs.isoformat()},
+            "arrival": {"iataCode": destination, "at": (departs + timedelta(minutes=minutes)).isoformat()},
+            "carrierCode": "BA",
+            "number": str(100 + number),
+            "numberOfStops": 0,
+        }],
+    }
+
+
+CAR_MODELS = [("Economy", "Toyota", "Corolla"), ("Compact", "Kia", "Rio"), ("SUV", "Toyota", "RAV4"), ("Premium", "Mercedes", "C-Class")]
+
+
+def car_offers(params: Dict[str, Any], count: int) -> Dict[str, Any]:
+    seed = _seed(params.get("pickupLocationCode"), params.get("pickupDate"), params.get("dropoffDate"))
+    offers = []
+    for i in range(count):
+        category, make, model = CAR_MODELS[(seed + i) % len(CAR_MODELS)]
+        offers.append({
+            "id": f"CAR{i + 1}",
+            "vehicle": {"category": category, "make": make, "model": model},
+            "price": {"currency": "USD", "total": f"{120 + (seed // 3 + i * 37) % 260}.00"},
+        })
+    return {"data": offers}
+
+
+HOTEL_NAMES = ["Grand Plaza Suites", "Budget Inn Downtown", "Luxury Tower Executive", "Harbour View", "Garden Court", "Airport Lodge"]
+ROOM_TYPES = ["DOUBLE", "SINGLE", "SUITE"]
+
+
+def hotel_offers(params: Dict[str, Any], count: int) -> Dict[str, Any]:
+    city = params.get("cityCode", "NYC")
+    check_in = params.get("checkInDate")
+    check_out = params.get("checkOutDate")
+    nights = max(1, (_date(check_out, 32) - _date(check_in)).days)
+    seed = _seed(city, check_in, check_out)
+    hotels = []
+    for i in range(count):
+        nightly = 80 + (seed // 5 + i * 71) % 420
+        hotels.append({
+            "type": "hotel-offers",
+            "available": True,
+            "hotel": {
+                "hotelId": f"SIM{city}{i + 1:03d}",
+                "name": HOTEL_NAMES[(seed + i) % len(HOTEL_NAMES)],
+                "cityCode": city,
+                "countryCode": "US",
+                "rating": str(3 + (seed + i) % 3),
+                "latitude": 40.71 + i * 0.001,
+                "longitude": -74.0 - i * 0.001,
+                "address": {"lines": [f"{100 + i} Main Street"]},
+                "amenities": ["WIFI", "RESTAURANT"] + (["POOL", "GYM"] if nightly > 250 else []),
+            },
+            "offers": [{
+                "id": f"OFFER{seed % 10000}{i}",
+                "checkInDate": check_in,
+                "checkOutDate": check_out,
+                "roomQuantity": 1 + (seed + i) % 6,
+                "room": {"typeEstimated": {"category": ROOM_TYPES[i % len(ROOM_TYPES)]}},
+                "price": {"currency": "USD", "base": f"{nightly * nights}.00", "total": f"{nightly * nights}.00"},
+                "policies": {"cancellations": [{"type": "FULL_STAY" if nightly < 120 else "FREE_CANCELLATION"}]},
+            }],
+        })
+    return {"data": hotels}
+
+
+def viator_products(body: Dict[str, Any], count: int) -> Dict[str, Any]:
+    destination = body.get("destination") or body.get("destinationLocationCode") or "LHR"
+    seed = _seed(destination)
+    products = []
+    for i in range(count):
+        products.append({
+            "productCode": f"SIM{seed % 1000:03d}P{i + 1}",
+            "title": f"Experience {i + 1} in {destination}",
+            "duration": {"fixedDurationInMinutes": 60 * (1 + (seed + i) % 5)},
+            "reviews": {"combinedAverageRating": round(3.5 + ((seed + i) % 15) / 10, 1), "totalReviews": 10 + (seed + i) % 500},
+            "pricing": {"summary": {"fromPrice": round(25 + (seed // 7 + i * 19) % 150 + 0.99, 2)}, "currency": "USD"},
+        })
+    return {"products": products, "totalCount": count}
+
+
+BUS_OPERATORS = ["ABC Transport", "GIGM", "Danfo Express", "Peace Mass Transit", "Chisco"]
+
+
+def bus_departures(params: Dict[str, Any], count: int) -> Dict[str, Any]:
+    seed = _seed(params.get("origin") or params.get("originLocationCode"), params.get("destination") or params.get("destinationLocationCode"), params.get("departureDate"))
+    buses: List[Dict[str, Any]] = []
+    for i in range(count):
+        departs = 6 * 60 + (seed + i * 83) % (12 * 60)
+        arrives = departs + 300 + (seed + i) % 180
+        buses.append({
+            "id": f"BUS{i + 1:03d}",
+            "operator": BUS_OPERATORS[(seed + i) % len(BUS_OPERATORS)],
+            "departureTime": f"{departs // 60:02d}:{departs % 60:02d}",
+            "arrivalTime": f"{(arrives // 60) % 24:02d}:{arrives % 60:02d}",
+            "availableSeats": 1 + (seed + i) % 14,
+            "pricePerSeat": f"{9000 + (seed // 13 + i * 700) % 9000}.00",
+            "currency": "NGN",
+        })
+    return {"data": buses}
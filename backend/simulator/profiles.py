@@ -0,0 +1,119 @@
+"""
+Behaviour profiles for the local upstream simulator.
+Each provider gets a latency distribution, an error rate, random and
+rate-limit driven 429 throttling, and optional stalls, so throughput, retry
+and circuit breaker behaviour can be measured without real upstreams.
+"""
+
+import json
+import math
+import random
+import time
+from dataclasses import asdict, dataclass, field, fields
+from typing import Any, Dict, Optional
+
+
+@dataclass
+class LatencyProfile:
+    """Response time distribution, in milliseconds"""
+    dist: str = "lognormal"  # fixed | uniform | normal | lognormal | exponential
+    median_ms: float = 150.0  # fixed value, lognormal median, normal/exponential mean
+    sigma: float = 0.5  # lognormal shape
+    std_ms: float = 30.0  # normal spread
+    min_ms: float = 0.0  # uniform lower bound and overall floor
+    max_ms: float = 10000.0  # uniform upper bound and overall cap
+    spike_rate: float = 0.0  # fraction of responses delayed by spike_ms on top
+    spike_ms: float = 0.0
+
+    def sample(self, rng: random.Random) -> float:
+        """One latency draw, in seconds"""
+        if self.dist == "fixed":
+            ms = self.median_ms
+        elif self.dist == "uniform":
+            ms = rng.uniform(self.min_ms, self.max_ms)
+        elif self.dist == "normal":
+            ms = rng.gauss(self.median_ms, self.std_ms)
+        elif self.dist == "exponential":
+            ms = rng.expovariate(1.0 / self.median_ms) if self.median_ms > 0 else 0.0
+        else:
+            ms = self.median_ms * math.exp(rng.gauss(0.0, self.sigma))
+        if self.spike_rate and rng.random() < self.spike_rate:
+            ms += self.spike_ms
+        return min(self.max_ms, max(self.min_ms, ms)) / 1000.0
+
+
+@dataclass
+class ThrottleProfile:
+    """429 behaviour: a token bucket plus an optional random 429 fraction"""
+    rate_per_second: float = 0.0  # 0 disables the bucket
+    burst: int = 20
+    random_rate: float = 0.0
+    retry_after: float = 1.0  # seconds sent in the Retry-After header
+
+
+@dataclass
+class ProviderProfile:
+    """Everything the simulator does for one provider"""
+    latency: LatencyProfile = field(default_factory=LatencyProfile)
+    throttle: ThrottleProfile = field(default_factory=ThrottleProfile)
+    error_rate: float = 0.0
+    error_status: int = 503
+    stall_rate: float = 0.0  # fraction of requests that hang for stall_ms (timeouts)
+    stall_ms: float = 30000.0
+    results: int = 5  # offers per search response
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ProviderProfile":
+        data = dict(data)
+        latency = LatencyProfile(**data.pop("latency", {}))
+        throttle = ThrottleProfile(**data.pop("throttle", {}))
+        known = {f.name for f in fields(cls)}
+        return cls(latency=latency, throttle=throttle, **{k: v for k, v in data.items() if k in known})
+
+    def merged(self, changes: Dict[str, Any]) -> "ProviderProfile":
+        current = asdict(self)
+        for key, value in changes.items():
+            if isinstance(value, dict) and isinstance(current.get(key), dict):
+                current[key] = {**current[key], **value}
+            else:
+                current[key] = value
+        return ProviderProfile.from_dict(current)
+
+
+DEFAULT_PROFILES: Dict[str, Dict[str, Any]] = {
+    "amadeus": {"latency": {"median_ms": 180, "sigma": 0.6, "spike_rate": 0.02, "spike_ms": 1500}},
+    "viator": {"latency": {"median_ms": 250, "sigma": 0.7, "spike_rate": 0.03, "spike_ms": 2000}},
+    "travu": {"latency": {"median_ms": 120, "sigma": 0.4}},
+    "treepz": {"latency": {"median_ms": 120, "sigma": 0.4}},
+    "fx": {"latency": {"dist": "fixed", "median_ms": 40}},
+}
+
+
+def load_profiles(path: Optional[str] = None) -> Dict[str, ProviderProfile]:
+    """Default profiles, overridden per provider by an optional JSON file"""
+    overrides: Dict[str, Any] = {}
+    if path:
+        with open(path) as f:
+            overrides = json.load(f)
+    profiles = {}
+    for provider in set(DEFAULT_PROFILES) | set(overrides):
+        base = ProviderProfile.from_dict(DEFAULT_PROFILES.get(provider, {}))
+        profiles[provider] = base.merged(overrides.get(provider, {}))
+    return profiles
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = float(max(1, burst))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def take(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        return False
@@ -0,0 +1,281 @@
+"""
+Local Redis-protocol stand-in for the shared state backend.
+
+    python -m backend.simulator.redis_server --port 6390
+
+then STATE_BACKEND=redis STATE_REDIS_URL=redis://localhost:6390/0. Speaks
+RESP2 and implements the commands RedisStateBackend uses (string GET/SET
+with NX/PX, DEL, MGET, SCAN, WATCH/MULTI/EXEC) plus the handshake redis-py
+sends on connect. Commands run one at a time on a single event loop, so
+every command and every EXEC is atomic, as on a real server. Not a
+general-purpose Redis: no persistence, data types or pub/sub.
+"""
+
+import argparse
+import asyncio
+import fnmatch
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ProtocolError(Exception):
+    pass
+
+
+class CommandError(Exception):
+    pass
+
+
+class RedisStandIn:
+    """In-memory keyspace plus the per-key write counters WATCH compares"""
+
+    def __init__(self):
+        self._data: Dict[bytes, Tuple[bytes, Optional[float]]] = {}
+        self._writes: Dict[bytes, int] = {}
+        self.commands = 0
+
+    def _live(self, key: bytes) -> Optional[bytes]:
+        record = self._data.get(key)
+        if record is None:
+            return None
+        if record[1] is not None and record[1] <= time.time():
+            self._delete(key)
+            return None
+        return record[0]
+
+    def _delete(self, key: bytes) -> bool:
+        if self._data.pop(key, None) is None:
+            return False
+        self._touch(key)
+        return True
+
+    def _touch(self, key: bytes) -> None:
+        self._writes[key] = self._writes.get(key, 0) + 1
+
+    def write_count(self, key: bytes) -> int:
+        self._live(key)  # an expiry counts as a write for WATCH
+        return self._writes.get(key, 0)
+
+    def execute(self, args: List[bytes]) -> Any:
+        if not args:
+            raise CommandError("ERR empty command")
+        self.commands += 1
+        name = args[0].decode().upper()
+        handler = getattr(self, f"cmd_{name.lower()}", None)
+        if handler is None:
+            raise CommandError(f"ERR unknown command '{name}'")
+        return handler(*args[1:])
+
+    def cmd_ping(self, message: bytes = None) -> Any:
+        return message if message is not None else "PONG"
+
+    def cmd_echo(self, message: bytes) -> bytes:
+        return message
+
+    def cmd_select(self, db: bytes) -> str:
+        return "OK"
+
+    def cmd_client(self, *args: bytes) -> str:
+        return "OK"
+
+    def cmd_get(self, key: bytes) -> Optional[bytes]:
+        return self._live(key)
+
+    def cmd_mget(self, *keys: bytes) -> List[Optional[bytes]]:
+        return [self._live(key) for key in keys]
+
+    def cmd_set(self, key: bytes, value: bytes, *options: bytes) -> Optional[str]:
+        expires_at, nx, xx = None, False, False
+        opts = [o.decode().upper() for o in options]
+        i = 0
+        while i < len(opts):
+            if opts[i] == "NX":
+                nx = True
+            elif opts[i] == "XX":
+                xx = True
+            elif opts[i] in ("PX", "EX") and i + 1 < len(opts):
+                amount = int(opts[i + 1])
+                expires_at = time.time() + (amount / 1000 if opts[i] == "PX" else amount)
+                i += 1
+            else:
+                raise CommandError("ERR syntax error")
+            i += 1
+        exists = self._live(key) is not None
+        if (nx and exists) or (xx and not exists):
+            return None
+        self._data[key] = (value, expires_at)
+        self._touch(key)
+        return "OK"
+
+    def cmd_del(self, *keys: bytes) -> int:
+        return sum(self._live(key) is not None and self._delete(key) for key in keys)
+
+    def cmd_exists(self, *keys: bytes) -> int:
+        return sum(self._live(key) is not None for key in keys)
+
+    def cmd_pttl(self, key: bytes) -> int:
+        if self._live(key) is None:
+            return -2
+        expires_at = self._data[key][1]
+        return -1 if expires_at is None else int((expires_at - time.time()) * 1000)
+
+    def cmd_scan(self, cursor: bytes, *options: bytes) -> List[Any]:
+        opts = [o.decode() for o in options]
+        pattern = opts[opts.index("MATCH") + 1] if "MATCH" in opts else "*"
+        count = int(opts[opts.index("COUNT") + 1]) if "COUNT" in opts else 10
+        keys = sorted(self._data)
+        start = int(cursor)
+        page = keys[start:start + count]
+        matched = [k for k in page if self._live(k) is not None and fnmatch.fnmatchcase(k.decode(), pattern)]
+        next_cursor = start + count if start + count < len(keys) else 0
+        return [str(next_cursor).encode(), matched]
+
+    def cmd_dbsize(self) -> int:
+        return sum(self._live(key) is not None for key in list(self._data))
+
+    def cmd_flushdb(self, *args: bytes) -> str:
+        for key in list(self._data):
+            self._delete(key)
+        return "OK"
+
+
+class Session:
+    """One client connection: MULTI queue and WATCHed keys"""
+
+    def __init__(self, store: RedisStandIn):
+        self.store = store
+        self.queue: Optional[List[List[bytes]]] = None
+        self.watched: Dict[bytes, int] = {}
+
+    def handle(self, args: List[bytes]) -> Any:
+        name = args[0].decode().upper() if args else ""
+        if name == "MULTI":
+            if self.queue is not None:
+                raise CommandError("ERR MULTI calls can not be nested")
+            self.queue = []
+            return "OK"
+        if name == "EXEC":
+            if self.queue is None:
+                raise CommandError("ERR EXEC without MULTI")
+            queue, self.queue = self.queue, None
+            dirty = any(self.store.write_count(key) != count for key, count in self.watched.items())
+            self.watched = {}
+            if dirty:
+                return NullArray
+            results = []
+            for command in queue:
+                try:
+                    results.append(self.store.execute(command))
+                except CommandError as e:
+                    results.append(e)
+            return results
+        if name == "DISCARD":
+            if self.queue is None:
+                raise CommandError("ERR DISCARD without MULTI")
+            self.queue, self.watched = None, {}
+            return "OK"
+        if name == "WATCH":
+            if self.queue is not None:
+                raise CommandError("ERR WATCH inside MULTI is not allowed")
+            for key in args[1:]:
+                self.watched.setdefault(key, self.store.write_count(key))
+            return "OK"
+        if name == "UNWATCH":
+            self.watched = {}
+            return "OK"
+        if self.queue is not None:
+            self.queue.append(args)
+            return "QUEUED"
+        return self.store.execute(args)
+
+
+class _NullArray:
+    pass
+
+
+NullArray = _NullArray()
+
+
+def encode(value: Any) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    if value is NullArray:
+        return b"*-1\r\n"
+    if isinstance(value, CommandError):
+        return f"-{value}\r\n".encode()
+    if isinstance(value, str):
+        return f"+{value}\r\n".encode()
+    if isinstance(value, bool) or isinstance(value, int):
+        return f":{int(value)}\r\n".encode()
+    if isinstance(value, bytes):
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+    if isinstance(value, list):
+        return b"*%d\r\n" % len(value) + b"".join(encode(item) for item in value)
+    raise TypeError(f"Cannot encode {type(value).__name__}")
+
+
+async def read_command(reader: asyncio.StreamReader) -> Optional[List[bytes]]:
+    line = await reader.readline()
+    if not line:
+        return None
+    if not line.startswith(b"*"):
+        # Inline command (e.g. typed into telnet)
+        return line.strip().split()
+    args = []
+    for _ in range(int(line[1:])):
+        header = await reader.readline()
+        if not header.startswith(b"$"):
+            raise ProtocolError("expected bulk string")
+        args.append((await reader.readexactly(int(header[1:]) + 2))[:-2])
+    return args
+
+
+async def serve(host: str = "127.0.0.1", port: int = 6390, store: Optional[RedisStandIn] = None) -> asyncio.AbstractServer:
+    store = store or RedisStandIn()
+
+    async def client(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        session = Session(store)
+        try:
+            while True:
+                args = await read_command(reader)
+                if args is None:
+                    break
+                if not args:
+                    continue
+                try:
+                    reply = session.handle(args)
+                except CommandError as e:
+                    reply = e
+                except (TypeError, ValueError, IndexError):
+                    reply = CommandError(f"ERR wrong arguments for '{args[0].decode()}' command")
+                writer.write(encode(reply))
+                await writer.drain()
+        except (ProtocolError, ConnectionError, asyncio.IncompleteReadError) as e:
+            logger.debug(f"Redis stand-in client dropped: {str(e)}")
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(client, host, port)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local Redis-protocol stand-in for the state backend")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6390)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    async def run() -> None:
+        server = await serve(args.host, args.port)
+        logger.info(f"Redis stand-in listening on {args.host}:{args.port}")
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
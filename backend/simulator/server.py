@@ -0,0 +1,206 @@
+"""
+Local stand-in for the upstream travel providers.
+Serves Amadeus, Viator, Travu/Treepz and FX endpoints with realistic payloads,
+applying each provider's latency distribution, error rate, 429 throttling and
+stalls from its profile. Requests are routed to a provider by Host header
+(in-process use, where the real base URLs are kept) or by a "/<provider>"
+path prefix (standalone server, where base URLs point at the simulator).
+"""
+
+import asyncio
+import json
+import logging
+import random
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+from fastapi import APIRouter, FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from backend.agentic.fx import DEFAULT_RATES_FILE
+from backend.config import Config
+from backend.simulator import fixtures
+from backend.simulator.profiles import ProviderProfile, TokenBucket, load_profiles
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ProviderStats:
+    requests: int = 0
+    ok: int = 0
+    errors: int = 0
+    throttled: int = 0
+    stalled: int = 0
+    latency_ms_total: float = 0.0
+
+
+class UpstreamSimulator:
+    """Applies provider profiles to simulated requests and keeps per-provider stats"""
+
+    def __init__(self, profiles: Optional[Dict[str, ProviderProfile]] = None, seed: Optional[int] = None):
+        self.profiles = profiles or load_profiles()
+        self.rng = random.Random(seed)
+        self.stats: Dict[str, ProviderStats] = {}
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    def profile(self, provider: str) -> ProviderProfile:
+        return self.profiles.setdefault(provider, ProviderProfile())
+
+    def update(self, provider: str, changes: Dict[str, Any]) -> ProviderProfile:
+        self.profiles[provider] = self.profile(provider).merged(changes)
+        self._buckets.pop(provider, None)
+        return self.profiles[provider]
+
+    def reset_stats(self) -> None:
+        self.stats.clear()
+
+    async def gate(self, provider: str) -> Optional[JSONResponse]:
+        """Delay the request per profile; return an error response when one should be simulated"""
+        profile = self.profile(provider)
+        stats = self.stats.setdefault(provider, ProviderStats())
+        stats.requests += 1
+
+        throttle = profile.throttle
+        if throttle.rate_per_second > 0:
+            bucket = self._buckets.get(provider)
+            if bucket is None:
+                bucket = self._buckets[provider] = TokenBucket(throttle.rate_per_second, throttle.burst)
+            limited = not bucket.take()
+        else:
+            limited = False
+        if limited or (throttle.random_rate and self.rng.random() < throttle.random_rate):
+            stats.throttled += 1
+            # Rejections are cheap for the provider, so they come back fast
+            await asyncio.sleep(profile.latency.sample(self.rng) * 0.1)
+            return JSONResponse(
+                {"errors": [{"status": 429, "title": "Too many requests"}]},
+                status_code=429,
+                headers={"Retry-After": f"{throttle.retry_after:g}"},
+            )
+
+        if profile.stall_rate and self.rng.random() < profile.stall_rate:
+            stats.stalled += 1
+            await asyncio.sleep(profile.stall_ms / 1000.0)
+
+        delay = profile.latency.sample(self.rng)
+        stats.latency_ms_total += delay * 1000
+        await asyncio.sleep(delay)
+
+        if profile.error_rate and self.rng.random() < profile.error_rate:
+            stats.errors += 1
+            return JSONResponse(
+                {"errors": [{"status": profile.error_status, "title": "Simulated upstream error"}]},
+                status_code=profile.error_status,
+            )
+        stats.ok += 1
+        return None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "profiles": {name: asdict(p) for name, p in self.profiles.items()},
+            "stats": {
+                name: {**asdict(s), "mean_latency_ms": round(s.latency_ms_total / max(1, s.requests - s.throttled), 1)}
+                for name, s in self.stats.items()
+            },
+        }
+
+
+def _provider_router(sim: UpstreamSimulator) -> Dict[str, APIRouter]:
+    amadeus, viator, travu, treepz, fx = (APIRouter() for _ in range(5))
+
+    @amadeus.post("/v1/security/oauth2/token")
+    async def amadeus_token():
+        return await sim.gate("amadeus") or fixtures.amadeus_token()
+
+    @amadeus.get("/v2/shopping/flight-offers")
+    async def flight_offers(request: Request):
+        return await sim.gate("amadeus") or fixtures.flight_offers(dict(request.query_params), sim.profile("amadeus").results)
+
+    @amadeus.get("/v1/shopping/availability/car-rental")
+    async def car_offers(request: Request):
+        return await sim.gate("amadeus") or fixtures.car_offers(dict(request.query_params), sim.profile("amadeus").results)
+
+    @amadeus.get("/v3/shopping/hotel-offers")
+    async def hotel_offers(request: Request):
+        return await sim.gate("amadeus") or fixtures.hotel_offers(dict(request.query_params), sim.profile("amadeus").results)
+
+    @viator.post("/partner/products/search")
+    async def viator_search(request: Request):
+        body = await request.body()
+        return await sim.gate("viator") or fixtures.viator_products(json.loads(body or b"{}"), sim.profile("viator").results)
+
+    @travu.get("/v1/bus-search")
+    async def travu_buses(request: Request):
+        return await sim.gate("travu") or fixtures.bus_departures(dict(request.query_params), sim.profile("travu").results)
+
+    @treepz.get("/v1/bus-search")
+    async def treepz_buses(request: Request):
+        return await sim.gate("treepz") or fixtures.bus_departures(dict(request.query_params), sim.profile("treepz").results)
+
+    @fx.get("/{path:path}")
+    async def fx_rates(path: str):
+        blocked = await sim.gate("fx")
+        if blocked is not None:
+            return blocked
+        with open(DEFAULT_RATES_FILE) as f:
+            return json.load(f)
+
+    return {"amadeus": amadeus, "viator": viator, "travu": travu, "treepz": treepz, "fx": fx}
+
+
+def default_hosts() -> Dict[str, str]:
+    """Host -> provider for the configured base URLs, used when running in-process"""
+    urls = {
+        "amadeus": Config.AMADEUS_BASE_URL,
+        "viator": Config.VIATOR_BASE_URL,
+        "travu": Config.TRAVU_BASE_URL,
+        "treepz": Config.TREEPZ_BASE_URL,
+        "fx": Config.FX_RATES_URL,
+    }
+    hosts: Dict[str, str] = {}
+    for provider, url in urls.items():
+        if url:
+            host = urlsplit(url).netloc
+            # A host shared by several providers (standalone simulator) is routed by path prefix
+            hosts[host] = provider if host not in hosts else ""
+    return {host: provider for host, provider in hosts.items() if provider}
+
+
+class SimulatorApp:
+    """ASGI entry point: rewrites host-addressed requests onto the provider's path prefix"""
+
+    def __init__(self, simulator: UpstreamSimulator, hosts: Optional[Dict[str, str]] = None):
+        self.simulator = simulator
+        self.hosts = default_hosts() if hosts is None else hosts
+        self.app = FastAPI(title="Traveease upstream simulator")
+        for provider, router in _provider_router(simulator).items():
+            self.app.include_router(router, prefix=f"/{provider}")
+
+        @self.app.get("/__sim/state")
+        async def state():
+            return simulator.snapshot()
+
+        @self.app.patch("/__sim/profiles/{provider}")
+        async def update_profile(provider: str, changes: dict):
+            return asdict(simulator.update(provider, changes))
+
+        @self.app.post("/__sim/reset")
+        async def reset():
+            simulator.reset_stats()
+            return {"reset": True}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            headers = dict(scope.get("headers") or [])
+            provider = self.hosts.get(headers.get(b"host", b"").decode())
+            # Base URLs may carry a path (e.g. FX_RATES_URL); only the host picks the provider
+            if provider and not scope["path"].startswith(f"/{provider}/"):
+                path = f"/{provider}{scope['path']}"
+                scope = {**scope, "path": path, "raw_path": path.encode()}
+        await self.app(scope, receive, send)
+
+
+def create_app(profile_path: Optional[str] = None, seed: Optional[int] = None, hosts: Optional[Dict[str, str]] = None) -> SimulatorApp:
+    return SimulatorApp(UpstreamSimulator(load_profiles(profile_path), seed=seed), hosts=hosts)
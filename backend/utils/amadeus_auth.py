@@ -0,0 +1,210 @@
+"""
+Amadeus OAuth2 token manager shared by every Amadeus caller in the process.
+Tokens are refreshed in the background before they expire and persisted to a
+file cache so other workers on the host reuse them instead of re-authenticating.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from typing import Dict, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows dev machines: no cross-worker file lock
+    fcntl = None
+
+from backend.config import Config
+from backend.utils.http_client import ProviderHTTPClient, UpstreamError, get_http_client
+
+logger = logging.getLogger(__name__)
+
+
+class AmadeusTokenManager:
+    """Client-credentials token cache with proactive background refresh"""
+
+    def __init__(
+        self,
+        api_key: str,
+        api_secret: str,
+        base_url: str,
+        cache_path: Optional[str] = None,
+        refresh_margin: float = 300.0,
+        http_client: Optional[ProviderHTTPClient] = None,
+    ):
+        """
+        Initialize AmadeusTokenManager
+        Args:
+            api_key: Amadeus client id
+            api_secret: Amadeus client secret
+            base_url: Amadeus API base URL
+            cache_path: File shared by workers (defaults to a per-key temp file)
+            refresh_margin: Seconds before expiry at which the token is renewed
+            http_client: Shared provider HTTP client
+        """
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.base_url = base_url.rstrip("/")
+        key_hash = hashlib.sha256(f"{api_key}@{self.base_url}".encode()).hexdigest()[:12]
+        self.cache_path = cache_path or os.path.join(tempfile.gettempdir(), f"traveease_amadeus_token_{key_hash}.json")
+        self.refresh_margin = refresh_margin
+        self.http = http_client or get_http_client()
+        self._access_token: Optional[str] = None
+        self._expires_at = 0.0
+        self._lock: Optional[Tuple[asyncio.AbstractEventLoop, asyncio.Lock]] = None
+        self._refresher: Optional[asyncio.Task] = None
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.api_key and self.api_secret)
+
+    def peek_token(self) -> Optional[str]:
+        """Return a valid cached token without any network I/O (safe from sync code)"""
+        if self._expires_at - time.time() > 0:
+            return self._access_token
+        if self._load_file_cache():
+            return self._access_token
+        return None
+
+    async def get_token(self) -> str:
+        """Return a valid access token, fetching one only if nothing usable is cached"""
+        self._ensure_refresher()
+        token = self.peek_token()
+        if token:
+            return token
+        async with self._get_lock():
+            token = self.peek_token()
+            if token:
+                return token
+            await self._refresh()
+            return self._access_token
+
+    async def auth_headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {await self.get_token()}"}
+
+    async def start(self, timeout: float = 10.0) -> None:
+        """
+        Warm the token and start the background refresher (call at startup)
+        Args:
+            timeout: Seconds to wait for the first token before giving up on warming
+        """
+        if not self.configured:
+            return
+        try:
+            await asyncio.wait_for(self.get_token(), timeout)
+        except Exception as e:
+            # Auth being down must not keep the API from starting; the refresher
+            # (or the first Amadeus request) fetches the token once it is back
+            logger.warning(f"Amadeus token warm-up failed, continuing without a token: {str(e) or type(e).__name__}")
+            self._ensure_refresher()
+
+    async def stop(self) -> None:
+        if self._refresher and not self._refresher.done():
+            self._refresher.cancel()
+        self._refresher = None
+
+    def _get_lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock[0] is not loop:
+            self._lock = (loop, asyncio.Lock())
+        return self._lock[1]
+
+    def _ensure_refresher(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._refresher is None or self._refresher.done() or self._refresher.get_loop() is not loop:
+            self._refresher = loop.create_task(self._refresh_loop())
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            wait = self._expires_at - self.refresh_margin - time.time()
+            await asyncio.sleep(max(wait, 1.0))
+            if self._expires_at - self.refresh_margin - time.time() > 0:
+                continue
+            try:
+                async with self._get_lock():
+                    # Another worker may already have renewed it
+                    if not (self._load_file_cache() and self._expires_at - self.refresh_margin > time.time()):
+                        await self._refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Amadeus token refresh failed: {str(e)}")
+                await asyncio.sleep(5.0)
+
+    async def _refresh(self) -> None:
+        """Fetch a new token, holding the cross-worker file lock while doing so"""
+        lock_file = open(f"{self.cache_path}.lock", "a")
+        try:
+            if fcntl is not None:
+                await asyncio.to_thread(fcntl.flock, lock_file.fileno(), fcntl.LOCK_EX)
+            # A worker that held the lock before us may have just written a fresh token
+            if self._load_file_cache() and self._expires_at - self.refresh_margin > time.time():
+                return
+            response = await self.http.request(
+                "POST",
+                f"{self.base_url}/v1/security/oauth2/token",
+                provider="amadeus-auth",
+                data={
+                    "grant_type": "client_credentials",
+                    "client_id": self.api_key,
+                    "client_secret": self.api_secret,
+                },
+            )
+            body = response.json()
+            if "access_token" not in body:
+                raise UpstreamError("amadeus-auth", "token response missing access_token")
+            self._access_token = body["access_token"]
+            self._expires_at = time.time() + float(body.get("expires_in", 1799))
+            self._write_file_cache()
+            logger.info(f"Amadeus access token refreshed, valid for {int(self._expires_at - time.time())}s")
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            lock_file.close()
+
+    def _load_file_cache(self) -> bool:
+        try:
+            with open(self.cache_path) as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if cached.get("expires_at", 0) - time.time() <= 0 or not cached.get("access_token"):
+            return False
+        if cached["expires_at"] > self._expires_at:
+            self._access_token = cached["access_token"]
+            self._expires_at = cached["expires_at"]
+        return True
+
+    def _write_file_cache(self) -> None:
+        tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            json.dump({"access_token": self._access_token, "expires_at": self._expires_at}, f)
+        os.replace(tmp_path, self.cache_path)
+
+
+_managers: Dict[Tuple[str, str], AmadeusTokenManager] = {}
+
+
+def get_amadeus_token_manager(
+    api_key: Optional[str] = None,
+    api_secret: Optional[str] = None,
+    base_url: Optional[str] = None,
+) -> AmadeusTokenManager:
+    """Process-wide token manager per (credentials, environment)"""
+    api_key = api_key if api_key is not None else Config.AMADEUS_API_KEY
+    api_secret = api_secret if api_secret is not None else Config.AMADEUS_API_SECRET
+    base_url = base_url or Config.AMADEUS_BASE_URL
+    key = (api_key, base_url)
+    if key not in _managers:
+        _managers[key] = AmadeusTokenManager(
+            api_key,
+            api_secret,
+            base_url,
+            cache_path=Config.AMADEUS_TOKEN_CACHE_PATH or None,
+        )
+    return _managers[key]
@@ -0,0 +1,124 @@
+"""
+Request-scoped deadline budgets.
+A route starts a budget with @with_deadline; it lives in a context variable,
+so it follows the request through the orchestrator, agents, booking services,
+worker threads (asyncio.to_thread / run_in_threadpool copy the context) and
+the shared HTTP client, each of which uses the time remaining as its timeout.
+When the budget is spent the route's outstanding work is cancelled and the
+request fails with DeadlineExceeded, which the app maps to a 504. Work shared
+between requests (coalesced searches, cache refreshes) runs with no budget,
+so one impatient caller cannot fail it for the others.
+"""
+
+import asyncio
+import functools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Iterator, Optional
+
+
+class DeadlineExceeded(TimeoutError):
+    """The request's deadline budget ran out before the work finished"""
+
+
+@dataclass(frozen=True)
+class Deadline:
+    budget: float  # seconds granted when the scope started
+    expires_at: float  # time.monotonic() value
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+
+_deadline: ContextVar[Optional[Deadline]] = ContextVar("request_deadline", default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _deadline.get()
+
+
+def remaining_timeout(timeout: Optional[float] = None) -> Optional[float]:
+    """
+    The tighter of a call's own timeout and the time left in the request budget
+    Args:
+        timeout: The call's own timeout in seconds (None for unbounded)
+    Returns:
+        Seconds the call may take, or None when neither bound applies
+    """
+    deadline = _deadline.get()
+    if deadline is None:
+        return timeout
+    left = deadline.remaining()
+    return left if timeout is None else min(timeout, left)
+
+
+@contextmanager
+def deadline_scope(seconds: Optional[float]) -> Iterator[Optional[Deadline]]:
+    """Run a block under a budget of `seconds`; a nested scope can only shorten an outer one"""
+    outer = _deadline.get()
+    if seconds is None or seconds <= 0:
+        yield outer
+        return
+    expires_at = time.monotonic() + seconds
+    if outer is not None:
+        expires_at = min(expires_at, outer.expires_at)
+    token = _deadline.set(Deadline(budget=seconds, expires_at=expires_at))
+    try:
+        yield _deadline.get()
+    finally:
+        _deadline.reset(token)
+
+
+@contextmanager
+def use_deadline(deadline: Optional[Deadline]) -> Iterator[Optional[Deadline]]:
+    """Run a block under exactly `deadline` (None for no budget), e.g. one captured on another thread"""
+    token = _deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _deadline.reset(token)
+
+
+async def without_deadline(fn: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    Run work shared by several requests (coalesced calls, background refreshes)
+    free of the budget of whichever request happened to start it. Each waiter
+    still gives up at its own deadline; the shared work is bounded by the
+    upstream timeouts. Use it as the body of a new task.
+    """
+    with use_deadline(None):
+        return await fn()
+
+
+def call_without_deadline(fn: Callable[[], Any]) -> Any:
+    """Blocking counterpart of without_deadline()"""
+    with use_deadline(None):
+        return fn()
+
+
+def with_deadline(seconds: float, grace: float = 0.25):
+    """
+    Route decorator giving each request a deadline budget.
+    Agents and upstream calls see the budget through remaining_timeout() and
+    degrade on their own when it runs out; `grace` is the extra time allowed
+    for composing the (possibly partial) response before the handler is
+    cancelled outright and DeadlineExceeded raised.
+    """
+    def decorator(func: Callable[..., Awaitable[Any]]):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with deadline_scope(seconds) as deadline:
+                if deadline is None:
+                    return await func(*args, **kwargs)
+                try:
+                    return await asyncio.wait_for(func(*args, **kwargs), deadline.remaining() + grace)
+                except asyncio.TimeoutError:
+                    raise DeadlineExceeded(f"{func.__name__} exceeded its {seconds}s deadline")
+        return wrapper
+    return decorator
@@ -0,0 +1,160 @@
+"""
+Hedged requests for idempotent upstream searches.
+If a call has not answered by the provider's running latency quantile (p95 by
+default), a second identical call is sent and whichever answers first wins.
+A per-provider budget caps hedges to a fraction of calls so a slow provider
+never sees its traffic doubled.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from backend.config import Config
+from backend.middleware.prometheus_metrics import upstream_calls_total, upstream_hedged_calls_total
+
+logger = logging.getLogger(__name__)
+
+
+class HedgePolicy:
+    """Latency tracking, hedge delay and hedge budget for one provider"""
+
+    def __init__(
+        self,
+        provider: str,
+        quantile: float = 0.95,
+        budget: float = 0.1,
+        window: int = 256,
+        min_samples: int = 20,
+        min_delay: float = 0.02,
+        enabled: bool = True,
+    ):
+        """
+        Initialize HedgePolicy
+        Args:
+            provider: Provider name (metrics label)
+            quantile: Latency quantile after which a hedge is sent
+            budget: Maximum fraction of calls that may be hedged
+            window: Number of recent latencies the quantile is computed over
+            min_samples: Calls observed before hedging starts
+            min_delay: Lower bound on the hedge delay, in seconds
+            enabled: When False calls pass straight through (latencies are still tracked)
+        """
+        self.provider = provider
+        self.quantile = quantile
+        self.budget = budget
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.enabled = enabled
+        self._latencies: deque = deque(maxlen=window)
+        # Token bucket: every call earns `budget` tokens, every hedge spends one
+        self._tokens = 0.0
+        self._max_tokens = max(1.0, budget * window / 10)
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds to wait before hedging, or None while there are too few samples"""
+        if len(self._latencies) < self.min_samples:
+            return None
+        ordered = sorted(self._latencies)
+        return max(self.min_delay, ordered[min(len(ordered) - 1, int(self.quantile * len(ordered)))])
+
+    def observe(self, seconds: float) -> None:
+        self._latencies.append(seconds)
+
+    def _take_token(self) -> bool:
+        if self._tokens >= 1.0 - 1e-9:
+            self._tokens -= 1.0
+            return True
+        return False
+
+    async def run(self, call: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run an idempotent call, hedging it if it outlives the provider's quantile
+        Args:
+            call: Zero-argument coroutine factory; invoked once or twice
+        Returns:
+            The first successful result (or the last error if both attempts fail)
+        """
+        self.calls += 1
+        upstream_calls_total.labels(provider=self.provider).inc()
+        self._tokens = min(self._max_tokens, self._tokens + self.budget)
+
+        started = time.perf_counter()
+        primary = asyncio.ensure_future(call())
+        delay = self.hedge_delay() if self.enabled else None
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait({primary}, timeout=delay)
+                if not done and self._take_token():
+                    return await self._race(primary, started, call)
+            result = await primary
+        except asyncio.CancelledError:
+            primary.cancel()
+            raise
+        self.observe(time.perf_counter() - started)
+        return result
+
+    async def _race(self, primary: asyncio.Future, started: float, call: Callable[[], Awaitable[Any]]) -> Any:
+        self.hedged += 1
+        logger.debug(f"Hedging {self.provider} call after {(time.perf_counter() - started) * 1000:.0f}ms")
+        hedge_started = time.perf_counter()
+        hedge = asyncio.ensure_future(call())
+        attempts = {primary: ("primary", started), hedge: ("hedge", hedge_started)}
+        pending = set(attempts)
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        error = task.exception()
+                        continue
+                    winner, began = attempts[task]
+                    self.observe(time.perf_counter() - began)
+                    if winner == "hedge":
+                        self.hedge_wins += 1
+                    upstream_hedged_calls_total.labels(provider=self.provider, winner=winner).inc()
+                    return task.result()
+            upstream_hedged_calls_total.labels(provider=self.provider, winner="none").inc()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        delay = self.hedge_delay()
+        return {
+            "enabled": self.enabled,
+            "calls": self.calls,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "hedge_rate": round(self.hedged / self.calls, 4) if self.calls else 0.0,
+            "hedge_delay_ms": round(delay * 1000, 1) if delay is not None else None,
+            "budget": self.budget,
+        }
+
+
+_policies: Dict[str, HedgePolicy] = {}
+
+
+def get_hedge_policy(provider: str) -> HedgePolicy:
+    """Process-wide hedge policy per provider, configured from Config"""
+    policy = _policies.get(provider)
+    if policy is None:
+        policy = HedgePolicy(
+            provider,
+            quantile=Config.UPSTREAM_HEDGE_QUANTILE,
+            budget=Config.UPSTREAM_HEDGE_BUDGET,
+            enabled=Config.UPSTREAM_HEDGING_ENABLED,
+        )
+        _policies[provider] = policy
+    return policy
+
+
+def hedge_stats() -> Dict[str, Any]:
+    return {provider: policy.stats() for provider, policy in _policies.items()}
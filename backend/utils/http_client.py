@@ -0,0 +1,283 @@
+"""
+Shared async HTTP client for upstream travel providers.
+Keeps one keep-alive connection pool per host, retries with exponential
+backoff and full jitter (honouring Retry-After), and tracks pool/retry stats.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+from backend.utils.deadline import remaining_timeout
+
+logger = logging.getLogger(__name__)
+
+
+class UpstreamError(Exception):
+    """Raised when an upstream call fails after all retry attempts"""
+
+    def __init__(self, provider: str, message: str, status_code: Optional[int] = None):
+        super().__init__(f"{provider}: {message}")
+        self.provider = provider
+        self.status_code = status_code
+
+
+@dataclass
+class RetryPolicy:
+    """Retry/backoff settings for upstream calls"""
+    max_attempts: int = 3
+    base_delay: float = 0.25  # seconds
+    max_delay: float = 4.0
+    max_retry_after: float = 10.0  # cap on server-requested waits
+    retry_statuses: Tuple[int, ...] = (429, 500, 502, 503, 504)
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for the given (0-based) attempt"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+@dataclass
+class HostStats:
+    """Per-host pool and retry counters"""
+    requests: int = 0
+    attempts: int = 0
+    retries: int = 0
+    retry_after_honored: int = 0
+    failures: int = 0
+    in_flight: int = 0
+    peak_in_flight: int = 0
+    status_counts: Dict[int, int] = field(default_factory=dict)
+
+
+class ProviderHTTPClient:
+    """Async HTTP client with a persistent connection pool per upstream host"""
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        timeout: float = 10.0,
+        retry_policy: Optional[RetryPolicy] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        """
+        Initialize ProviderHTTPClient
+        Args:
+            max_connections: Maximum open connections per host
+            max_keepalive_connections: Idle connections kept alive per host
+            keepalive_expiry: Seconds an idle connection stays in the pool
+            timeout: Default request timeout in seconds
+            retry_policy: Backoff settings (defaults to RetryPolicy())
+            transport: Optional httpx transport override (e.g. for local stand-ins)
+        """
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = timeout
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.transport = transport
+        # host -> (event loop, client); pools are bound to the loop that opened them
+        self._clients: Dict[str, Tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]] = {}
+        self._stats: Dict[str, HostStats] = {}
+
+    def _client_for(self, host: str) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        entry = self._clients.get(host)
+        if entry is None or entry[0] is not loop:
+            client = httpx.AsyncClient(
+                base_url=host,
+                limits=self.limits,
+                timeout=self.timeout,
+                transport=self.transport,
+                headers={"Connection": "keep-alive"},
+            )
+            self._clients[host] = (loop, client)
+            logger.info(f"Opened connection pool for {host}")
+            return client
+        return entry[1]
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        provider: str,
+        *,
+        params: Optional[Dict[str, Any]] = None,
+        json: Optional[Any] = None,
+        data: Optional[Any] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+    ) -> httpx.Response:
+        """
+        Send a request through the pool for the URL's host, retrying transient failures
+        Args:
+            method: HTTP method
+            url: Absolute URL
+            provider: Provider name used in logs and errors
+            params: Query parameters
+            json: JSON body
+            data: Form body
+            headers: Extra request headers
+            timeout: Per-request timeout override in seconds (capped by the request deadline)
+        Returns:
+            The successful httpx.Response
+        Raises:
+            UpstreamError: when every attempt failed, a non-retryable error status came back
+                or the request deadline ran out
+        """
+        parts = urlsplit(url)
+        host = f"{parts.scheme}://{parts.netloc}"
+        client = self._client_for(host)
+        stats = self._stats.setdefault(host, HostStats())
+        policy = self.retry_policy
+
+        stats.requests += 1
+        stats.in_flight += 1
+        stats.peak_in_flight = max(stats.peak_in_flight, stats.in_flight)
+        try:
+            last_error = "no attempt made"
+            last_status = None
+            for attempt in range(policy.max_attempts):
+                # Each attempt gets at most what is left of the caller's request deadline
+                attempt_timeout = remaining_timeout(timeout if timeout is not None else self.timeout)
+                if attempt_timeout <= 0:
+                    stats.failures += 1
+                    raise UpstreamError(provider, f"request deadline exceeded ({last_error})", last_status)
+                stats.attempts += 1
+                delay = policy.backoff(attempt)
+                try:
+                    response = await client.request(
+                        method,
+                        url,
+                        params=params,
+                        json=json,
+                        data=data,
+                        headers=headers,
+                        timeout=attempt_timeout,
+                    )
+                    stats.status_counts[response.status_code] = stats.status_counts.get(response.status_code, 0) + 1
+                    if response.status_code not in policy.retry_statuses:
+                        if response.is_error:
+                            stats.failures += 1
+                            raise UpstreamError(provider, f"HTTP {response.status_code}", response.status_code)
+                        return response
+                    last_error = f"HTTP {response.status_code}"
+                    last_status = response.status_code
+                    retry_after = _parse_retry_after(response.headers.get("Retry-After"))
+                    if retry_after is not None:
+                        stats.retry_after_honored += 1
+                        delay = min(retry_after, policy.max_retry_after)
+                except httpx.TransportError as e:
+                    last_error = f"{type(e).__name__}: {str(e)}"
+                    last_status = None
+
+                if attempt + 1 < policy.max_attempts:
+                    left = remaining_timeout()
+                    if left is not None and left <= delay:
+                        # No time left to wait out the backoff and try again
+                        break
+                    stats.retries += 1
+                    logger.warning(f"{provider} attempt {attempt + 1} failed ({last_error}); retrying in {delay:.2f}s")
+                    await asyncio.sleep(delay)
+
+            stats.failures += 1
+            raise UpstreamError(provider, f"unavailable after {attempt + 1} attempts ({last_error})", last_status)
+        finally:
+            stats.in_flight -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool and retry statistics per host"""
+        return {
+            "limits": {
+                "max_connections": self.limits.max_connections,
+                "max_keepalive_connections": self.limits.max_keepalive_connections,
+                "keepalive_expiry": self.limits.keepalive_expiry,
+            },
+            "hosts": {
+                host: {
+                    "pool_open": host in self._clients and not self._clients[host][1].is_closed,
+                    "requests": s.requests,
+                    "attempts": s.attempts,
+                    "retries": s.retries,
+                    "retry_after_honored": s.retry_after_honored,
+                    "failures": s.failures,
+                    "in_flight": s.in_flight,
+                    "peak_in_flight": s.peak_in_flight,
+                    "status_counts": dict(s.status_counts),
+                }
+                for host, s in self._stats.items()
+            },
+        }
+
+    async def aclose(self) -> None:
+        """Close every pooled client owned by the running loop"""
+        loop = asyncio.get_running_loop()
+        for host, (owner, client) in list(self._clients.items()):
+            if owner is loop:
+                await client.aclose()
+                del self._clients[host]
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given as delta-seconds or an HTTP date"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+_shared_client: Optional[ProviderHTTPClient] = None
+
+
+def using_stand_in() -> bool:
+    """True when upstream calls are answered locally (simulator or cassette replay)"""
+    from backend.config import Config
+
+    return Config.UPSTREAM_MODE in ("simulate", "replay")
+
+
+def _upstream_transport() -> Optional[httpx.AsyncBaseTransport]:
+    """Transport for the configured UPSTREAM_MODE; None means real network calls"""
+    from backend.config import Config
+
+    mode = Config.UPSTREAM_MODE
+    if mode == "simulate":
+        from backend.simulator.server import create_app
+
+        logger.info("Upstream calls are served by the in-process simulator")
+        return httpx.ASGITransport(app=create_app(Config.UPSTREAM_SIM_PROFILE or None, seed=Config.UPSTREAM_SIM_SEED))
+    if mode == "record":
+        from backend.simulator.cassette import RecordingTransport
+
+        logger.info(f"Recording upstream traffic to {Config.UPSTREAM_CASSETTE}")
+        return RecordingTransport(Config.UPSTREAM_CASSETTE)
+    if mode == "replay":
+        from backend.simulator.cassette import ReplayTransport
+
+        logger.info(f"Replaying upstream traffic from {Config.UPSTREAM_CASSETTE}")
+        return ReplayTransport(Config.UPSTREAM_CASSETTE, replay_latency=Config.UPSTREAM_REPLAY_LATENCY)
+    return None
+
+
+def get_http_client() -> ProviderHTTPClient:
+    """Process-wide client shared by all provider integrations"""
+    global _shared_client
+    if _shared_client is None:
+        _shared_client = ProviderHTTPClient(transport=_upstream_transport())
+    return _shared_client
@@ -1,25 +1,82 @@
 import logging
+import re
+from functools import lru_cache
+from typing import Any, Optional
+
+# Key words (camelCase, snake_case or kebab-case segments, case-insensitive)
+# whose values never reach the logs
+PII_KEYS = ('passport', 'card', 'email', 'surname')
+# "name" is only PII for a person: a bare "name" or one qualified by these
+# (guestName, first_name), not cityName or hotelName
+PERSON_KEYS = (
+    'first', 'last', 'middle', 'full', 'given', 'family', 'guest', 'customer',
+    'applicant', 'traveler', 'traveller', 'passenger', 'holder', 'driver', 'contact', 'user',
+)
+MASK = '***MASKED***'
+
+_SEGMENT = re.compile(r'[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+')
+
+
+@lru_cache(maxsize=4096)
+def _is_pii(key: Any) -> bool:
+    segments = [segment.lower() for segment in _SEGMENT.findall(str(key))]
+    if any(segment in PII_KEYS for segment in segments):
+        return True
+    return any(
+        segment == 'name' and (i == 0 or segments[i - 1] in PERSON_KEYS)
+        for i, segment in enumerate(segments)
+    )
+
+
+def _mask(data: Any) -> Any:
+    if isinstance(data, dict):
+        return {k: MASK if _is_pii(k) else _mask(v) for k, v in data.items()}
+    if isinstance(data, (list, tuple)):
+        return [_mask(item) for item in data]
+    return data
+
+
+class MaskedPayload:
+    """
+    Deferred, PII-masked view of a payload for use as a logging argument:
+
+        logger.info("search params: %s", MaskedPayload(params))
+
+    Nothing is copied or stringified unless a handler actually formats the
+    record; the masked text is then built once and shared by every handler
+    that emits the record. Which keys are PII is decided once per key name.
+    """
+
+    __slots__ = ('data', '_text')
+
+    def __init__(self, data: Any):
+        self.data = data
+        self._text: Optional[str] = None
+
+    def __str__(self) -> str:
+        if self._text is None:
+            self._text = str(_mask(self.data))
+        return self._text
+
+    __repr__ = __str__
+
 
 # Configure NDPR-compliant logging
 class NDPRLogger:
     @staticmethod
     def mask_pii(data: dict) -> dict:
-        masked = {}
-        for k, v in data.items():
-            if k in ['passport', 'name', 'card', 'credit_card', 'email']:
-                masked[k] = '***MASKED***'
-            else:
-                masked[k] = v
-        return masked
+        return _mask(data)
 
     @staticmethod
     def info(msg, data=None):
         if data:
-            msg += f" | {NDPRLogger.mask_pii(data)}"
-        logging.info(msg)
+            logging.info("%s | %s", msg, MaskedPayload(data))
+        else:
+            logging.info(msg)
 
     @staticmethod
     def error(msg, data=None):
         if data:
-            msg += f" | {NDPRLogger.mask_pii(data)}"
-        logging.error(msg)
+            logging.error("%s | %s", msg, MaskedPayload(data))
+        else:
+            logging.error(msg)
@@ -0,0 +1,202 @@
+"""
+TTL search-result cache for upstream provider calls.
+Entries are keyed on normalized search parameters, expire per provider, are
+served stale while a background refresh runs, and are evicted by LRU order
+and total memory footprint. Concurrent misses for the same key are coalesced
+into one upstream call.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from backend.config import Config
+from backend.middleware.prometheus_metrics import cache_hits_total, cache_misses_total
+from backend.utils.deadline import without_deadline
+from backend.utils.singleflight import SingleFlight, current_batch, get_singleflight, request_key
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CachePolicy:
+    """Freshness settings for one provider"""
+    ttl: float  # seconds an entry is served as fresh
+    stale_ttl: float  # extra seconds it may be served stale while refreshing
+
+
+DEFAULT_POLICIES: Dict[str, CachePolicy] = {
+    "amadeus_flights": CachePolicy(ttl=300, stale_ttl=600),
+    "amadeus_cars": CachePolicy(ttl=900, stale_ttl=1800),
+    "viator_activities": CachePolicy(ttl=3600, stale_ttl=7200),
+    "travu_buses": CachePolicy(ttl=300, stale_ttl=600),
+}
+
+
+@dataclass
+class _Entry:
+    value: Any
+    stored_at: float
+    size: int
+
+
+def _is_cacheable(result: Any) -> bool:
+    return not (isinstance(result, dict) and "error" in result)
+
+
+class SearchCache:
+    """In-process LRU + size bounded cache with stale-while-revalidate"""
+
+    def __init__(
+        self,
+        policies: Optional[Dict[str, CachePolicy]] = None,
+        max_entries: int = 10000,
+        max_bytes: int = 64 * 1024 * 1024,
+        singleflight: Optional[SingleFlight] = None,
+    ):
+        """
+        Initialize SearchCache
+        Args:
+            policies: Per-provider TTLs (merged over DEFAULT_POLICIES)
+            max_entries: LRU entry limit
+            max_bytes: Approximate memory budget for cached payloads
+            singleflight: Coalescing group for misses (defaults to the shared one)
+        """
+        self.policies = {**DEFAULT_POLICIES, **(policies or {})}
+        self.singleflight = singleflight or get_singleflight()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._refreshing: Set[str] = set()
+        self._background: Set[asyncio.Task] = set()
+
+    @staticmethod
+    def make_key(provider: str, params: Any) -> str:
+        """Stable key for a provider search, insensitive to case, spacing, key order and empty fields"""
+        return request_key(provider, params)
+
+    async def get_or_fetch(
+        self,
+        provider: str,
+        params: Any,
+        fetch: Callable[[], Awaitable[Any]],
+        cacheable: Callable[[Any], bool] = _is_cacheable,
+    ) -> Any:
+        """
+        Return a cached result for the search or fetch and store it
+        Args:
+            provider: Provider/policy name (also the metrics label)
+            params: Search parameters
+            fetch: Zero-argument coroutine factory that performs the upstream call
+            cacheable: Predicate deciding whether a fetched result may be stored
+        Returns:
+            Cached or freshly fetched result
+        """
+        key = self.make_key(provider, params)
+        batch = current_batch()
+        if batch is not None:
+            # Inside a batch every distinct search is resolved once, hit or miss
+            return await batch.share(key, lambda: self._lookup(provider, key, fetch, cacheable))
+        return await self._lookup(provider, key, fetch, cacheable)
+
+    async def _lookup(
+        self,
+        provider: str,
+        key: str,
+        fetch: Callable[[], Awaitable[Any]],
+        cacheable: Callable[[Any], bool],
+    ) -> Any:
+        policy = self.policies.get(provider)
+        if policy is None:
+            return await self.singleflight.do(key, fetch)
+
+        entry = self._entries.get(key)
+        now = time.time()
+        if entry is not None:
+            age = now - entry.stored_at
+            if age <= policy.ttl:
+                self._entries.move_to_end(key)
+                cache_hits_total.labels(cache_key=provider).inc()
+                return entry.value
+            if age <= policy.ttl + policy.stale_ttl:
+                self._entries.move_to_end(key)
+                cache_hits_total.labels(cache_key=provider).inc()
+                self._schedule_refresh(key, fetch, cacheable)
+                return entry.value
+            self._remove(key)
+
+        cache_misses_total.labels(cache_key=provider).inc()
+        return await self.singleflight.do(key, lambda: self._fetch_and_store(key, fetch, cacheable))
+
+    async def _fetch_and_store(self, key: str, fetch: Callable[[], Awaitable[Any]], cacheable: Callable[[Any], bool]) -> Any:
+        result = await fetch()
+        if cacheable(result):
+            self._store(key, result)
+        return result
+
+    def _schedule_refresh(self, key: str, fetch: Callable[[], Awaitable[Any]], cacheable: Callable[[Any], bool]) -> None:
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+
+        async def refresh() -> None:
+            try:
+                await self.singleflight.do(key, lambda: self._fetch_and_store(key, fetch, cacheable))
+            except Exception as e:
+                logger.warning(f"Background refresh failed for {key}: {str(e)}")
+            finally:
+                self._refreshing.discard(key)
+
+        # Serves future requests, so the request that noticed the stale entry does not bound it
+        task = asyncio.get_running_loop().create_task(without_deadline(refresh))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    def _store(self, key: str, value: Any) -> None:
+        size = len(json.dumps(value, default=str))
+        if size > self.max_bytes:
+            return
+        self._remove(key)
+        self._entries[key] = _Entry(value=value, stored_at=time.time(), size=size)
+        self._bytes += size
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def invalidate(self, provider: Optional[str] = None) -> None:
+        """Drop every entry, or only those of one provider"""
+        for key in [k for k in self._entries if provider is None or k.startswith(f"{provider}:")]:
+            self._remove(key)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "refreshing": len(self._refreshing),
+        }
+
+
+_search_cache: Optional[SearchCache] = None
+
+
+def get_search_cache() -> SearchCache:
+    """Process-wide search cache shared by the provider integrations"""
+    global _search_cache
+    if _search_cache is None:
+        _search_cache = SearchCache(
+            max_entries=Config.SEARCH_CACHE_MAX_ENTRIES,
+            max_bytes=Config.SEARCH_CACHE_MAX_MB * 1024 * 1024,
+        )
+    return _search_cache
@@ -0,0 +1,165 @@
+"""
+Single-flight request coalescing.
+Concurrent identical calls share one in-flight upstream execution and all
+receive its result (or its exception). A batch scope additionally keeps
+results for the whole batch so later identical calls reuse them.
+"""
+
+import asyncio
+import contextvars
+import hashlib
+import json
+import threading
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional, Tuple
+
+from backend.utils.deadline import call_without_deadline, without_deadline
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return value.strip().casefold()
+    if isinstance(value, dict):
+        return {str(k).strip().casefold(): _normalize(v) for k, v in value.items() if v not in (None, "", [], {})}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def request_key(namespace: str, params: Any) -> str:
+    """Stable key for a search, insensitive to case, spacing, key order and empty fields"""
+    canonical = json.dumps(_normalize(params), sort_keys=True, default=str)
+    return f"{namespace}:{hashlib.sha1(canonical.encode()).hexdigest()}"
+
+
+class _SyncCall:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class BatchMemo:
+    """Every keyed call made inside one batch, shared for the batch's lifetime"""
+
+    def __init__(self):
+        self.results: Dict[str, asyncio.Future] = {}
+        self.calls = 0
+        self.shared = 0
+
+    async def share(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run ``fn`` once per key for the whole batch; later callers get the same result"""
+        self.calls += 1
+        shared = self.results.get(key)
+        if shared is None:
+            # Shared by every query of the batch, so not bound by the first one's deadline
+            shared = asyncio.ensure_future(without_deadline(fn))
+            self.results[key] = shared
+        else:
+            self.shared += 1
+        return await asyncio.shield(shared)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "searches": self.calls,
+            "distinct_searches": len(self.results),
+            "shared_searches": self.shared,
+        }
+
+
+_batch_memo: "contextvars.ContextVar[Optional[BatchMemo]]" = contextvars.ContextVar("singleflight_batch", default=None)
+
+
+def current_batch() -> Optional[BatchMemo]:
+    return _batch_memo.get()
+
+
+@contextmanager
+def batch_scope() -> Iterator[BatchMemo]:
+    """Deduplicate keyed upstream calls across everything run (or spawned) inside the block"""
+    memo = BatchMemo()
+    token = _batch_memo.set(memo)
+    try:
+        yield memo
+    finally:
+        _batch_memo.reset(token)
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into a single execution"""
+
+    def __init__(self):
+        self._tasks: Dict[Tuple[asyncio.AbstractEventLoop, str], asyncio.Future] = {}
+        self._sync_calls: Dict[str, _SyncCall] = {}
+        self._sync_lock = threading.Lock()
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run ``fn`` once for all concurrent callers of ``key``
+        Args:
+            key: Identity of the upstream call
+            fn: Zero-argument coroutine factory
+        Returns:
+            The shared result
+        """
+        self.calls += 1
+        slot = (asyncio.get_running_loop(), key)
+        task = self._tasks.get(slot)
+        if task is None:
+            # Followers join with deadlines of their own; the call runs under none of them
+            task = asyncio.ensure_future(without_deadline(fn))
+            self._tasks[slot] = task
+            task.add_done_callback(lambda _: self._tasks.pop(slot, None))
+        else:
+            self.coalesced += 1
+        # Shield so one caller giving up does not cancel the call for the others
+        return await asyncio.shield(task)
+
+    def do_sync(self, key: str, fn: Callable[[], Any]) -> Any:
+        """Thread-based variant for blocking service methods run in a threadpool"""
+        with self._sync_lock:
+            self.calls += 1
+            call = self._sync_calls.get(key)
+            leader = call is None
+            if leader:
+                call = _SyncCall()
+                self._sync_calls[key] = call
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = call_without_deadline(fn)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._sync_lock:
+                self._sync_calls.pop(key, None)
+            call.done.set()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._tasks) + len(self._sync_calls),
+        }
+
+
+_singleflight: Optional[SingleFlight] = None
+
+
+def get_singleflight() -> SingleFlight:
+    """Process-wide coalescing group shared by provider integrations and booking searches"""
+    global _singleflight
+    if _singleflight is None:
+        _singleflight = SingleFlight()
+    return _singleflight
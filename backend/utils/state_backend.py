@@ -0,0 +1,401 @@
+"""
+Shared state for holds, bookings and applications.
+Booking services keep their records in a StateBackend instead of process
+memory, so a hold placed on one worker can be claimed on another. Every
+record carries an opaque version that changes on each write; updates go
+through compare-and-set, so concurrent writers on different workers or hosts
+never overwrite each other. Backends:
+
+    memory  - process-local (single worker, development)
+    sqlite  - one database file shared by the workers on a host (WAL mode)
+    redis   - any Redis-protocol server, shared across hosts
+
+Values are JSON documents (tuples come back as lists) and may carry a TTL,
+after which they read as absent.
+"""
+
+import copy
+import json
+import logging
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+try:
+    import redis
+except ImportError:  # only needed for STATE_BACKEND=redis
+    redis = None
+
+from backend.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class StateConflict(Exception):
+    """A read-modify-write kept losing compare-and-set races to other writers"""
+
+
+@dataclass(frozen=True)
+class Versioned:
+    value: Any
+    version: str
+
+
+def _new_version() -> str:
+    # Random rather than a counter, so a key deleted and re-created never reuses a version
+    return uuid.uuid4().hex
+
+
+def _expiry(ttl: Optional[float]) -> Optional[float]:
+    return time.time() + ttl if ttl is not None else None
+
+
+class StateBackend(ABC):
+    """Namespaced, versioned key-value records with compare-and-set"""
+
+    name = "base"
+
+    @abstractmethod
+    def get(self, namespace: str, key: str) -> Optional[Versioned]:
+        ...
+
+    @abstractmethod
+    def create(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        """Store a record only if the key is absent (or expired)"""
+
+    @abstractmethod
+    def compare_and_set(self, namespace: str, key: str, value: Any, version: str, ttl: Optional[float] = None) -> bool:
+        """Replace a record only if it is still at `version`"""
+
+    @abstractmethod
+    def delete(self, namespace: str, key: str, version: Optional[str] = None) -> bool:
+        """Remove a record (only if still at `version`, when given)"""
+
+    def get_many(self, namespace: str, keys: List[str]) -> Dict[str, Versioned]:
+        """Records for the keys that exist, in as few round trips as the backend allows"""
+        records = {}
+        for key in keys:
+            record = self.get(namespace, key)
+            if record is not None:
+                records[key] = record
+        return records
+
+    @abstractmethod
+    def items(self, namespace: str) -> List[Tuple[str, Any]]:
+        ...
+
+    def close(self) -> None:
+        pass
+
+    def update(
+        self,
+        namespace: str,
+        key: str,
+        fn: Callable[[Optional[Any]], Optional[Any]],
+        ttl: Union[None, float, Callable[[Any], Optional[float]]] = None,
+        attempts: int = 32,
+    ) -> Optional[Any]:
+        """
+        Read-modify-write a record under compare-and-set, retrying lost races
+        Args:
+            namespace: Record namespace
+            key: Record key
+            fn: Gets a copy of the current value (None if absent) and returns the
+                new value, or None to delete; exceptions abort the update
+            ttl: TTL for the written record, or a function of the new value giving it
+            attempts: Races lost before giving up
+        Returns:
+            The value written (None if the record was deleted or stays absent)
+        """
+        for attempt in range(attempts):
+            if attempt:
+                # Lost a race: back off a little so hot keys do not livelock
+                time.sleep(random.uniform(0, min(0.05, 0.001 * 2 ** attempt)))
+            current = self.get(namespace, key)
+            value = fn(copy.deepcopy(current.value) if current else None)
+            value_ttl = ttl(value) if callable(ttl) and value is not None else ttl
+            if current is None:
+                if value is None or self.create(namespace, key, value, value_ttl):
+                    return value
+            elif value is None:
+                if self.delete(namespace, key, current.version):
+                    return None
+            elif self.compare_and_set(namespace, key, value, current.version, value_ttl):
+                return value
+        raise StateConflict(f"Update of {namespace}/{key} lost {attempts} races")
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name}
+
+
+class MemoryStateBackend(StateBackend):
+    """Process-local backend; state is not shared between workers"""
+
+    name = "memory"
+
+    def __init__(self):
+        self._records: Dict[Tuple[str, str], Tuple[str, str, Optional[float]]] = {}
+        self._lock = threading.Lock()
+
+    def _live(self, namespace: str, key: str) -> Optional[Tuple[str, str, Optional[float]]]:
+        record = self._records.get((namespace, key))
+        if record is not None and record[2] is not None and record[2] <= time.time():
+            del self._records[(namespace, key)]
+            return None
+        return record
+
+    def get(self, namespace: str, key: str) -> Optional[Versioned]:
+        with self._lock:
+            record = self._live(namespace, key)
+        # Stored serialized, so callers never share (or mutate) the stored object
+        return Versioned(json.loads(record[0]), record[1]) if record else None
+
+    def create(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        data = json.dumps(value)
+        with self._lock:
+            if self._live(namespace, key) is not None:
+                return False
+            self._records[(namespace, key)] = (data, _new_version(), _expiry(ttl))
+            return True
+
+    def compare_and_set(self, namespace: str, key: str, value: Any, version: str, ttl: Optional[float] = None) -> bool:
+        data = json.dumps(value)
+        with self._lock:
+            record = self._live(namespace, key)
+            if record is None or record[1] != version:
+                return False
+            self._records[(namespace, key)] = (data, _new_version(), _expiry(ttl))
+            return True
+
+    def delete(self, namespace: str, key: str, version: Optional[str] = None) -> bool:
+        with self._lock:
+            record = self._live(namespace, key)
+            if record is None or (version is not None and record[1] != version):
+                return False
+            del self._records[(namespace, key)]
+            return True
+
+    def items(self, namespace: str) -> List[Tuple[str, Any]]:
+        with self._lock:
+            live = [(key, self._live(ns, key)) for ns, key in list(self._records) if ns == namespace]
+        return [(key, json.loads(record[0])) for key, record in live if record]
+
+
+class SQLiteStateBackend(StateBackend):
+    """Single-file backend shared by every worker on the host"""
+
+    name = "sqlite"
+
+    def __init__(self, path: str, busy_timeout: float = 5.0):
+        """
+        Initialize SQLiteStateBackend
+        Args:
+            path: Database file (created if missing)
+            busy_timeout: Seconds a writer waits for another worker's write lock
+        """
+        self.path = path
+        self.busy_timeout = busy_timeout
+        # sqlite3 connections belong to the thread that opened them
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS state ("
+                " namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,"
+                " version TEXT NOT NULL, expires_at REAL, PRIMARY KEY (namespace, key))"
+            )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, namespace: str, key: str) -> Optional[Versioned]:
+        row = self._conn().execute(
+            "SELECT value, version FROM state WHERE namespace = ? AND key = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (namespace, key, time.time()),
+        ).fetchone()
+        return Versioned(json.loads(row[0]), row[1]) if row else None
+
+    def create(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        # An expired row is taken over in place; a live one leaves the upsert a no-op
+        cursor = self._conn().execute(
+            "INSERT INTO state (namespace, key, value, version, expires_at) VALUES (?, ?, ?, ?, ?)"
+            " ON CONFLICT (namespace, key) DO UPDATE SET value = excluded.value, version = excluded.version,"
+            " expires_at = excluded.expires_at WHERE state.expires_at IS NOT NULL AND state.expires_at <= ?",
+            (namespace, key, json.dumps(value), _new_version(), _expiry(ttl), time.time()),
+        )
+        return cursor.rowcount == 1
+
+    def compare_and_set(self, namespace: str, key: str, value: Any, version: str, ttl: Optional[float] = None) -> bool:
+        cursor = self._conn().execute(
+            "UPDATE state SET value = ?, version = ?, expires_at = ?"
+            " WHERE namespace = ? AND key = ? AND version = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (json.dumps(value), _new_version(), _expiry(ttl), namespace, key, version, time.time()),
+        )
+        return cursor.rowcount == 1
+
+    def delete(self, namespace: str, key: str, version: Optional[str] = None) -> bool:
+        cursor = self._conn().execute(
+            "DELETE FROM state WHERE namespace = ? AND key = ? AND (? IS NULL OR version = ?)"
+            " AND (expires_at IS NULL OR expires_at > ?)",
+            (namespace, key, version, version, time.time()),
+        )
+        return cursor.rowcount == 1
+
+    def get_many(self, namespace: str, keys: List[str]) -> Dict[str, Versioned]:
+        records = {}
+        for offset in range(0, len(keys), 500):
+            chunk = keys[offset:offset + 500]
+            rows = self._conn().execute(
+                f"SELECT key, value, version FROM state WHERE namespace = ? AND key IN ({', '.join('?' * len(chunk))})"
+                " AND (expires_at IS NULL OR expires_at > ?)",
+                (namespace, *chunk, time.time()),
+            ).fetchall()
+            records.update({key: Versioned(json.loads(value), version) for key, value, version in rows})
+        return records
+
+    def items(self, namespace: str) -> List[Tuple[str, Any]]:
+        conn = self._conn()
+        now = time.time()
+        conn.execute("DELETE FROM state WHERE namespace = ? AND expires_at <= ?", (namespace, now))
+        rows = conn.execute("SELECT key, value FROM state WHERE namespace = ?", (namespace,)).fetchall()
+        return [(key, json.loads(value)) for key, value in rows]
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name, "path": self.path}
+
+
+class RedisStateBackend(StateBackend):
+    """
+    Backend on any Redis-protocol server. Compare-and-set uses WATCH/MULTI/EXEC
+    rather than Lua, so it also runs against the local stand-in in
+    backend.simulator.redis_server.
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str, prefix: str = "traveease:state"):
+        """
+        Initialize RedisStateBackend
+        Args:
+            url: Server URL, e.g. redis://localhost:6379/0
+            prefix: Key prefix for every record
+        """
+        if redis is None:
+            raise RuntimeError("STATE_BACKEND=redis requires the redis package")
+        self.url = url
+        self.prefix = prefix
+        # RESP2 keeps the handshake to what every server (and the stand-in) speaks
+        self.client = redis.Redis.from_url(url, protocol=2)
+
+    def _key(self, namespace: str, key: str) -> str:
+        return f"{self.prefix}:{namespace}:{key}"
+
+    @staticmethod
+    def _encode(value: Any, version: str) -> str:
+        return json.dumps({"version": version, "value": value})
+
+    @staticmethod
+    def _px(ttl: Optional[float]) -> Optional[int]:
+        return max(1, int(ttl * 1000)) if ttl is not None else None
+
+    def get(self, namespace: str, key: str) -> Optional[Versioned]:
+        raw = self.client.get(self._key(namespace, key))
+        if raw is None:
+            return None
+        record = json.loads(raw)
+        return Versioned(record["value"], record["version"])
+
+    def create(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        return bool(self.client.set(self._key(namespace, key), self._encode(value, _new_version()), nx=True, px=self._px(ttl)))
+
+    def _guarded(self, namespace: str, key: str, version: Optional[str], write: Callable[[Any, str], None]) -> bool:
+        name = self._key(namespace, key)
+        with self.client.pipeline() as pipe:
+            try:
+                pipe.watch(name)
+                raw = pipe.get(name)
+                if raw is None or (version is not None and json.loads(raw)["version"] != version):
+                    pipe.unwatch()
+                    return False
+                pipe.multi()
+                write(pipe, name)
+                pipe.execute()
+                return True
+            except redis.WatchError:
+                # Another writer got in between our read and EXEC
+                return False
+
+    def compare_and_set(self, namespace: str, key: str, value: Any, version: str, ttl: Optional[float] = None) -> bool:
+        data = self._encode(value, _new_version())
+        return self._guarded(namespace, key, version, lambda pipe, name: pipe.set(name, data, px=self._px(ttl)))
+
+    def delete(self, namespace: str, key: str, version: Optional[str] = None) -> bool:
+        if version is None:
+            return bool(self.client.delete(self._key(namespace, key)))
+        return self._guarded(namespace, key, version, lambda pipe, name: pipe.delete(name))
+
+    def get_many(self, namespace: str, keys: List[str]) -> Dict[str, Versioned]:
+        records = {}
+        for offset in range(0, len(keys), 500):
+            chunk = keys[offset:offset + 500]
+            for key, raw in zip(chunk, self.client.mget([self._key(namespace, key) for key in chunk])):
+                if raw is not None:
+                    record = json.loads(raw)
+                    records[key] = Versioned(record["value"], record["version"])
+        return records
+
+    def items(self, namespace: str) -> List[Tuple[str, Any]]:
+        start = len(self._key(namespace, ""))
+        names = list(self.client.scan_iter(match=self._key(namespace, "*"), count=500))
+        items = []
+        for offset in range(0, len(names), 500):
+            chunk = names[offset:offset + 500]
+            for name, raw in zip(chunk, self.client.mget(chunk)):
+                if raw is not None:  # expired between SCAN and MGET
+                    items.append((name.decode()[start:], json.loads(raw)["value"]))
+        return items
+
+    def close(self) -> None:
+        self.client.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name, "url": self.url.split("@")[-1]}
+
+
+_state_backend: Optional[StateBackend] = None
+
+
+def get_state_backend() -> StateBackend:
+    """Process-wide state backend selected by Config.STATE_BACKEND"""
+    global _state_backend
+    if _state_backend is None:
+        kind = Config.STATE_BACKEND
+        if kind == "sqlite":
+            path = Config.STATE_SQLITE_PATH or os.path.join(tempfile.gettempdir(), "traveease_state.db")
+            _state_backend = SQLiteStateBackend(path)
+        elif kind == "redis":
+            _state_backend = RedisStateBackend(Config.STATE_REDIS_URL)
+        else:
+            if kind != "memory":
+                logger.warning(f"Unknown STATE_BACKEND {kind!r}; using process memory")
+            _state_backend = MemoryStateBackend()
+        logger.info(f"State backend: {_state_backend.name}")
+    return _state_backend